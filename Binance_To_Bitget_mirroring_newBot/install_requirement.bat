@@ -1,4 +0,0 @@
-@echo off
-REM Batch file to install Python requirements from requirements.txt
-pip install -r requirements.txt
-pause
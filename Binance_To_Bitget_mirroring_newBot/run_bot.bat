@@ -1,4 +0,0 @@
-@echo off
-REM Batch file to run main.py using the default Python interpreter
-python main.py
-pause
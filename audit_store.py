@@ -0,0 +1,152 @@
+import os,sys,time,queue,sqlite3,threading,argparse,datetime
+from dotenv import load_dotenv
+from clock_sync import clock
+
+load_dotenv()
+
+AUDIT_DB_FILE = os.getenv("AUDIT_DB_FILE", "trade_audit.sqlite3")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_MS = float(os.getenv("AUDIT_FLUSH_MS", "200"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leader_fills (
+    id INTEGER PRIMARY KEY,
+    ts_ms INTEGER NOT NULL,      -- Binance trade time
+    ref TEXT NOT NULL,           -- clientOid of the first follower leg, joins follower_executions.ref
+    account TEXT, market TEXT, symbol TEXT, side TEXT,
+    qty REAL, price REAL, trade_id TEXT
+);
+CREATE TABLE IF NOT EXISTS follower_executions (
+    id INTEGER PRIMARY KEY,
+    ts_ms INTEGER NOT NULL,      -- time the Bitget ack (or failure) came back, on the Binance clock
+    ref TEXT NOT NULL,
+    client_oid TEXT, market TEXT, symbol TEXT, side TEXT,
+    qty REAL, price REAL, latency_ms REAL, status TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS leader_fills_symbol_ts ON leader_fills (symbol, ts_ms);
+CREATE INDEX IF NOT EXISTS leader_fills_ref ON leader_fills (ref);
+CREATE INDEX IF NOT EXISTS follower_executions_symbol_ts ON follower_executions (symbol, ts_ms);
+CREATE INDEX IF NOT EXISTS follower_executions_ref ON follower_executions (ref);
+"""
+
+def connect(path=AUDIT_DB_FILE):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+class AuditStore:
+    """
+    Append-only SQLite record of leader fills and follower executions. Callers only enqueue a tuple,
+    a writer thread inserts them in batches so the hot path never waits on disk.
+    """
+    def __init__(self, path=AUDIT_DB_FILE):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer_loop, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def leader_fill(self, ref, ts_ms, account, market, symbol, side, qty, price, trade_id):
+        self._ensure_writer()
+        self._queue.put(("leader_fills", (int(ts_ms), ref, account, market, symbol, side, float(qty), float(price or 0), str(trade_id))))
+
+    def follower_execution(self, ref, client_oid, market, symbol, side, qty, order=None, leader_ts_ms=None, error=None):
+        """Record a Bitget order outcome; `order` is the ccxt order dict, None when the order failed"""
+        self._ensure_writer()
+        now_ms = clock.now_ms("binance")  # on the leader's clock, so latency is the true leader fill -> ack lag
+        price = None
+        status = "failed"
+        if order:
+            price = order.get("average") or order.get("price")
+            status = order.get("status") or "acked"
+        latency_ms = now_ms - leader_ts_ms if leader_ts_ms else None
+        self._queue.put(("follower_executions", (int(now_ms), ref, client_oid, market, symbol, side, float(qty),
+                                                  float(price) if price else None, latency_ms, status, str(error)[:500] if error else None)))
+
+    def _writer_loop(self):
+        conn = connect(self.path)
+        columns = {
+            "leader_fills": "ts_ms, ref, account, market, symbol, side, qty, price, trade_id",
+            "follower_executions": "ts_ms, ref, client_oid, market, symbol, side, qty, price, latency_ms, status, error",
+        }
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + AUDIT_FLUSH_MS / 1000
+            while len(batch) < AUDIT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for table in columns:
+                        rows = [row for t, row in batch if t == table]
+                        if rows:
+                            placeholders = ",".join("?" * len(rows[0]))
+                            conn.executemany(f"INSERT INTO {table} ({columns[table]}) VALUES ({placeholders})", rows)
+            except Exception as e:
+                print(f"[Audit] Failed to write {len(batch)} rows: {e}")
+
+audit = AuditStore()
+
+################################## CLI #######################################
+
+def _since_ms(value):
+    if not value:
+        return 0
+    return int(datetime.datetime.fromisoformat(value).timestamp() * 1000)
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+def report(conn, metric, symbol=None, since=None):
+    """
+    Per-symbol stats of `metric`: 'slippage' (bps, positive = worse than the leader) or 'latency'
+    (ms from leader fill to follower ack).
+    """
+    if metric == "slippage":
+        expr = "(f.price - l.price) / l.price * 10000 * (CASE WHEN lower(l.side) = 'buy' THEN 1 ELSE -1 END)"
+        where = "f.price IS NOT NULL AND l.price > 0"
+    else:
+        expr = "f.latency_ms"
+        where = "f.latency_ms IS NOT NULL"
+    sql = f"""SELECT l.symbol, {expr} AS v FROM leader_fills l JOIN follower_executions f ON f.ref = l.ref
+              WHERE {where} AND l.ts_ms >= ?"""
+    args = [_since_ms(since)]
+    if symbol:
+        sql += " AND l.symbol = ?"
+        args.append(symbol)
+    sql += " ORDER BY l.symbol, v"
+    results = {}
+    for sym, value in conn.execute(sql, args):
+        results.setdefault(sym, []).append(value)
+    return {sym: {"count": len(v), "avg": sum(v) / len(v), "p50": _percentile(v, 0.5), "p99": _percentile(v, 0.99), "max": v[-1]}
+            for sym, v in results.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy-trading audit queries")
+    parser.add_argument("metric", choices=["slippage", "latency"])
+    parser.add_argument("--symbol", help="Binance symbol, e.g. BTCUSDT")
+    parser.add_argument("--since", help="ISO date/time, e.g. 2025-07-01")
+    parser.add_argument("--db", default=AUDIT_DB_FILE)
+    args = parser.parse_args(argv)
+    unit = "bps" if args.metric == "slippage" else "ms"
+    started = time.perf_counter()
+    stats = report(connect(args.db), args.metric, args.symbol, args.since)
+    print(f"{'Symbol':<14}{'Count':>10}{'Avg':>12}{'P50':>12}{'P99':>12}{'Max':>12}  ({unit})")
+    for sym, s in sorted(stats.items()):
+        print(f"{sym:<14}{s['count']:>10}{s['avg']:>12.2f}{s['p50']:>12.2f}{s['p99']:>12.2f}{s['max']:>12.2f}")
+    print(f"\n{sum(s['count'] for s in stats.values())} rows in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    sys.exit(main())
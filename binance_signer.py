@@ -0,0 +1,66 @@
+import os,hmac,hashlib,threading,requests
+from urllib.parse import urlencode
+from dotenv import load_dotenv
+from stream_manager import leader_credentials
+from clock_sync import clock
+
+load_dotenv()
+
+BINANCE_RECV_WINDOW = int(os.getenv("BINANCE_RECV_WINDOW", "5000"))
+
+# market -> (REST base url, clock_sync source of its server time)
+ENDPOINTS = {
+    "spot": ("https://api.binance.com", "binance"),
+    "futures": ("https://fapi.binance.com", "binance-futures"),
+}
+
+class BinanceSigner:
+    """
+    Signed REST requests for one Binance account and API. The HMAC is keyed once and copied per
+    request, headers and the HTTP session are reused, and timestamps come from the synced exchange
+    clock (clock_sync) so requests aren't rejected with -1021.
+    """
+    def __init__(self, api_key, api_secret, base_url, clock_source, recv_window=BINANCE_RECV_WINDOW):
+        self.base_url = base_url
+        self.clock_source = clock_source
+        self.recv_window = recv_window
+        self.headers = {"X-MBX-APIKEY": api_key}
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._mac = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+
+    def sign(self, query_string):
+        mac = self._mac.copy()
+        mac.update(query_string.encode())
+        return mac.hexdigest()
+
+    def timestamp(self):
+        return int(clock.now_ms(self.clock_source))
+
+    def request(self, method, path, params=None):
+        """Send a signed request, resyncing the clock and retrying once on a -1021 timestamp rejection"""
+        for attempt in range(2):
+            query = dict(params or {})
+            query["recvWindow"] = self.recv_window
+            query["timestamp"] = self.timestamp()
+            query_string = urlencode(query)
+            url = f"{self.base_url}{path}?{query_string}&signature={self.sign(query_string)}"
+            resp = self.session.request(method, url)
+            if resp.status_code == 400 and attempt == 0 and '"code":-1021' in resp.text.replace(" ", ""):
+                clock.sync(self.clock_source)
+                continue
+            resp.raise_for_status()
+            return resp.json()
+
+_signers = {}
+_signers_lock = threading.Lock()
+
+def get_signer(account, market):
+    """Shared signer per (leader account, 'spot' | 'futures')"""
+    key = (account, market)
+    with _signers_lock:
+        if key not in _signers:
+            api_key, api_secret = leader_credentials(account)
+            base_url, clock_source = ENDPOINTS[market]
+            _signers[key] = BinanceSigner(api_key, api_secret, base_url, clock_source)
+        return _signers[key]
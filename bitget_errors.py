@@ -0,0 +1,98 @@
+import re
+import ccxt
+from collections import namedtuple
+from bounded import LRUDict
+
+# What to do about a failed Bitget request
+RETRY = "retry"                        # transient: back off and send again (resolved by clientOid first)
+RESIZE = "resize"                      # not enough balance or position: send what the account can cover
+REFRESH_LEVERAGE = "refresh_leverage"  # leverage rejected: clamp to what Bitget allows and set it again
+SKIP = "skip"                          # the order can't be mirrored as is (too small, nothing to close)
+ALERT = "alert"                        # needs a human: credentials, permissions, account mode, unknown errors
+RESOLVE = "resolve"                    # clientOid already used: the order exists, look it up
+
+BitgetError = namedtuple("BitgetError", ["action", "code", "reason"])
+
+# Bitget business error codes (spot and mix, v2 API)
+CODES = {
+    "429": (RETRY, "rate limited"),
+    "30007": (RETRY, "rate limited"),
+    "40010": (RETRY, "request timed out on Bitget"),
+    "45001": (RETRY, "system busy"),
+    "43012": (RESIZE, "insufficient balance"),
+    "40762": (RESIZE, "order amount exceeds the balance"),
+    "40754": (RESIZE, "not enough balance for the margin"),
+    "40757": (RESIZE, "not enough position to close"),
+    "22002": (SKIP, "no position to close"),
+    "45110": (SKIP, "below the minimum order value of 5 USDT"),
+    "45111": (SKIP, "below the minimum order quantity"),
+    "43027": (SKIP, "below the minimum order value"),
+    "40309": (SKIP, "symbol has been delisted"),
+    "40034": (SKIP, "symbol does not exist"),
+    "40797": (REFRESH_LEVERAGE, "leverage above the maximum for this symbol"),
+    "40798": (REFRESH_LEVERAGE, "leverage below the minimum"),
+    "40893": (REFRESH_LEVERAGE, "leverage can't be changed with the current margin"),
+    "40774": (ALERT, "order type does not match the account position mode (one-way vs hedge)"),
+    "40006": (ALERT, "invalid API key"),
+    "40012": (ALERT, "API key or passphrase is incorrect"),
+    "40014": (ALERT, "API key lacks the trade permission"),
+    "40037": (ALERT, "API key does not exist"),
+    "40786": (RESOLVE, "duplicate clientOid"),
+}
+
+# ccxt exception types, most specific first, for errors without a known Bitget code
+TYPES = [
+    (ccxt.DuplicateOrderId, RESOLVE, "duplicate clientOid"),
+    (ccxt.InsufficientFunds, RESIZE, "insufficient balance"),
+    (ccxt.AuthenticationError, ALERT, "authentication failed"),
+    (ccxt.PermissionDenied, ALERT, "permission denied"),
+    (ccxt.AccountSuspended, ALERT, "account suspended"),
+    (ccxt.BadSymbol, SKIP, "unknown symbol"),
+    (ccxt.InvalidOrder, SKIP, "order rejected"),
+    (ccxt.DDoSProtection, RETRY, "rate limited"),
+    (ccxt.RateLimitExceeded, RETRY, "rate limited"),  # not a DDoSProtection subclass in ccxt 4.5
+    (ccxt.NetworkError, RETRY, "network error"),  # includes rate limits, timeouts and exchange maintenance
+]
+
+_CODE_RE = re.compile(r'"code"\s*:\s*"?(\d+)')
+
+def error_code(e):
+    """Bitget error code of an exception (BitgetTradeError carries it, ccxt puts the JSON body in the message)"""
+    code = getattr(e, "code", None)
+    if code:
+        return str(code)
+    match = _CODE_RE.search(str(e))
+    return match.group(1) if match else None
+
+def classify_code(code, message=None):
+    """Classify a bare Bitget error code, as found in a batch failureList"""
+    if code in CODES:
+        action, reason = CODES[code]
+        return BitgetError(action, code, reason)
+    if message and "clientoid" in message.lower() and ("duplicate" in message.lower() or "exist" in message.lower()):
+        return BitgetError(RESOLVE, code, "duplicate clientOid")
+    return BitgetError(ALERT, code, message or "unknown Bitget error")
+
+def classify(e):
+    """BitgetError(action, code, reason) for an exception raised by a Bitget request"""
+    code = error_code(e)
+    if code in CODES:
+        return classify_code(code)
+    for exc_type, action, reason in TYPES:
+        if isinstance(e, exc_type):
+            return BitgetError(action, code, reason)
+    return classify_code(code, str(e))
+
+def describe(error):
+    return f"{error.reason} ({error.code})" if error.code else error.reason
+
+# clientOid -> why its order was not placed, for the audit trail of paths that only return None
+_failures = LRUDict(1000)
+
+def note_failure(client_oid, reason):
+    if client_oid:
+        _failures[client_oid] = str(reason)
+
+def failure_reason(client_oid, default="not placed"):
+    """The reason noted for a clientOid whose order was not placed, read once"""
+    return (_failures.pop(client_oid) if client_oid else None) or default
@@ -1,4 +1,9 @@
-import ccxt
+import threading
+from concurrent.futures import Future
+from order_submission import submit_order, submit_orders
+import bitget_errors
+from paper_trading import bitget_client
+from profiler import hot
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -8,19 +13,15 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-BITGET_API_KEY = os.getenv("BITGET_API_KEY")
-BITGET_API_SECRET = os.getenv("BITGET_API_SECRET")
-BITGET_PASSPHRASE = os.getenv("BITGET_PASSPHRASE")
+# ORDER_BATCHING=0 sends every mirrored futures order on its own, from the calling thread
+ORDER_BATCHING = os.getenv("ORDER_BATCHING", "1") == "1"
+ORDER_BATCH_MAX = int(os.getenv("ORDER_BATCH_MAX", "20"))  # orders per Bitget batch place-order request
 
-bitget = ccxt.bitget({
-    "apiKey": BITGET_API_KEY,
-    "secret": BITGET_API_SECRET,
-    "password": BITGET_PASSPHRASE,
-    "enableRateLimit": True,
-    'options': {'defaultType': 'swap'},
-})
+bitget = bitget_client("swap")
+console = Console()
 
-def place_bitget_order(bitget, symbol, order_type, side, amount, price, leverage, margin_mode, trade_side):
+@hot
+def place_bitget_order(bitget, symbol, order_type, side, amount, price, leverage, margin_mode, trade_side, client_oid=None, reduce_only=False, time_in_force=None, leverage_set=False):
     """
     Place an order on Bitget using ccxt.
     Parameters:
@@ -32,38 +33,46 @@ def place_bitget_order(bitget, symbol, order_type, side, amount, price, leverage
         price: float or None (required for limit orders)
         leverage: int
         margin_mode: 'isolated' or 'cross'
-        trade_side: 'open' or 'close' or None
+        trade_side: 'open' or 'close' (hedge mode) or None (one-way mode)
+        client_oid: str or None, deterministic Bitget clientOid used to retry without double-filling
+        reduce_only: bool, one-way mode orders that may only shrink the position
+        time_in_force: 'IOC' etc. for limit orders, None for the exchange default
+        leverage_set: bool, leverage was already set for this order (speculative preparation)
     Returns:
         order response dict or None
     """
     amount = float(amount)
-    console = Console()
-    try:
-        bitget.set_leverage(
-            leverage=leverage,
-            symbol=symbol,
-            params={'marginMode': margin_mode}
-        )
-    except Exception as e:
-        console.print(f"[bold red]Failed to set leverage on Bitget because the amount is less than the minimum required $5 USDT.[/bold red]")
+    if not leverage_set and not set_leverage(bitget, symbol, leverage, margin_mode):
+        bitget_errors.note_failure(client_oid, "leverage could not be set")
         return None
 
-    params = {'marginMode': margin_mode}
-    if trade_side:
-        params['tradeSide'] = trade_side
+    params = order_params(margin_mode, trade_side, reduce_only, time_in_force)
 
     try:
-        order = bitget.create_order(
-            symbol=symbol,
-            type=order_type,
-            side=side,
-            amount=amount,
-            price=price if order_type == 'limit' else None,
-            params=params
-        )
+        try:
+            order = submit_order(
+                bitget,
+                symbol=symbol,
+                order_type=order_type,
+                side=side,
+                amount=amount,
+                price=price if order_type == 'limit' else None,
+                params=params,
+                client_oid=client_oid
+            )
+        except Exception as e:
+            if bitget_errors.classify(e).action != bitget_errors.RESIZE:
+                raise
+            resized = close_resize_amount(bitget, symbol, side, trade_side, reduce_only, amount)
+            if resized <= 0 or resized >= amount:
+                raise
+            console.print(f"[bold yellow]Not enough {symbol} position to close {amount}, closing {resized} instead.[/bold yellow]")
+            order = submit_order(bitget, symbol=symbol, order_type=order_type, side=side, amount=resized,
+                                 price=price if order_type == 'limit' else None, params=params, client_oid=client_oid and f"{client_oid}R")
         # Check for Bitget error in response
         if 'info' in order and isinstance(order['info'], dict) and ('code' in order['info'] and order['info']['code'] != '00000'):
             console.print(f"[bold red]Bitget order error: {order['info'].get('msg', order['info'])}[/bold red]")
+            bitget_errors.note_failure(client_oid, order['info'].get('msg', order['info']))
             return None
         # Fetch full order details for accurate output
         try:
@@ -80,9 +89,155 @@ def place_bitget_order(bitget, symbol, order_type, side, amount, price, leverage
             format_bitget_order_output(order)
             return order
     except Exception as e:
-        console.print(f"[bold red]Bitget order failed: {e}[/bold red]")
+        error = bitget_errors.classify(e)
+        if error.action == bitget_errors.SKIP:
+            console.print(f"[bold yellow]Bitget {side} {amount} {symbol} not placed: {bitget_errors.describe(error)}.[/bold yellow]")
+        else:
+            console.print(f"[bold red]Bitget order failed [{bitget_errors.describe(error)}]: {e}[/bold red]")
+        bitget_errors.note_failure(client_oid, bitget_errors.describe(error))
         return None
 
+def set_leverage(bitget, symbol, leverage, margin_mode):
+    """
+    set_leverage with recovery by error class: a transient failure is retried once, leverage out of
+    the symbol's range is clamped, and leverage that can't change with the open position is kept.
+    Returns False when the order should not be placed.
+    """
+    for attempt in range(2):
+        try:
+            bitget.set_leverage(leverage=leverage, symbol=symbol, params={'marginMode': margin_mode})
+            return True
+        except Exception as e:
+            error = bitget_errors.classify(e)
+            if attempt == 0 and error.action == bitget_errors.RETRY:
+                continue
+            if attempt == 0 and error.action == bitget_errors.REFRESH_LEVERAGE:
+                limits = bitget.market(symbol).get('limits', {}).get('leverage') or {}
+                clamped = max(min(int(leverage), int(limits.get('max') or leverage)), int(limits.get('min') or 1))
+                if clamped != int(leverage):
+                    console.print(f"[bold yellow]{leverage}x leverage rejected for {symbol} ({bitget_errors.describe(error)}), using {clamped}x.[/bold yellow]")
+                    leverage = clamped
+                    continue
+                console.print(f"[bold yellow]Keeping the current Bitget leverage for {symbol}: {bitget_errors.describe(error)}.[/bold yellow]")
+                return True
+            console.print(f"[bold red]Failed to set {leverage}x leverage on Bitget for {symbol}: {bitget_errors.describe(error)}.[/bold red]")
+            return False
+    return False
+
+def closable_amount(bitget, symbol, side, trade_side):
+    """Follower contracts a closing order can take: hedge closes name the position, one-way reduces go against it"""
+    if trade_side == 'close':
+        position_side = 'long' if side == 'buy' else 'short'
+    else:
+        position_side = 'long' if side == 'sell' else 'short'
+    return sum(float(p.get('contracts') or 0) for p in bitget.fetch_positions([symbol]) if p.get('side') == position_side)
+
+def close_resize_amount(bitget, symbol, side, trade_side, reduce_only, amount):
+    """Closing more than the follower holds: the amount that closes what is there, 0 for an opening order"""
+    if trade_side != 'close' and not reduce_only:
+        return 0
+    return float(bitget.amount_to_precision(symbol, min(closable_amount(bitget, symbol, side, trade_side), amount)))
+
+def order_params(margin_mode, trade_side=None, reduce_only=False, time_in_force=None):
+    params = {'marginMode': margin_mode}
+    if trade_side:
+        params['tradeSide'] = trade_side
+    if reduce_only:
+        params['reduceOnly'] = True
+    if time_in_force:
+        params['timeInForce'] = time_in_force
+    return params
+
+def place_bitget_orders(bitget, symbol, orders):
+    """
+    Batch counterpart of place_bitget_order for orders of one symbol, margin mode and leverage.
+    `orders` are dicts of place_bitget_order keyword arguments, each with a client_oid. Leverage is
+    set once for the batch and the orders go out in chunks of ORDER_BATCH_MAX. A close rejected for
+    more than the follower holds is resent for what is there, as in place_bitget_order. Returns the
+    ccxt orders (None for a failed one) in input order. The batch response has no fill details, so
+    unlike place_bitget_order the orders are not fetched again.
+    """
+    first = orders[0]
+    if not all(o.get('leverage_set') for o in orders) and not set_leverage(bitget, symbol, first['leverage'], first['margin_mode']):
+        for o in orders:
+            bitget_errors.note_failure(o['client_oid'], "leverage could not be set")
+        return [None] * len(orders)
+    requests = [{"order_type": o['order_type'], "side": o['side'], "amount": float(o['amount']),
+                 "price": o.get('price') if o['order_type'] == 'limit' else None, "client_oid": o['client_oid'],
+                 "params": order_params(o['margin_mode'], o.get('trade_side'), o.get('reduce_only', False), o.get('time_in_force'))}
+                for o in orders]
+    placed = []
+    for start in range(0, len(requests), ORDER_BATCH_MAX):
+        chunk = requests[start:start + ORDER_BATCH_MAX]
+        placed.extend(submit_orders(bitget, symbol, chunk, resize=lambda o: close_resize_amount(
+            bitget, symbol, o['side'], o['params'].get('tradeSide'), o['params'].get('reduceOnly', False), o['amount'])))
+    console.print(f"[blue]Bitget batch {symbol}: {sum(1 for o in placed if o)}/{len(placed)} orders placed in {-(-len(placed) // ORDER_BATCH_MAX)} request(s)[/blue]")
+    return placed
+
+class OrderBatcher:
+    """
+    Sends mirrored futures orders from one thread. Orders that arrive while a request is in flight,
+    as when the leader closes a whole portfolio and dozens of fills land within milliseconds, queue
+    up and go out together: grouped by product type, margin coin, symbol, margin mode and leverage
+    (the Bitget batch endpoint is per symbol) through place_bitget_orders. A lone order is sent as
+    soon as it arrives, so batching adds no delay outside bursts.
+    """
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self._pending = []      # (place_bitget_order kwargs, Future)
+        self._cond = threading.Condition()
+        self._thread = None
+        self.batches = 0
+        self.batched_orders = 0
+
+    def submit(self, **order):
+        """Queue a place_bitget_order call, returns a Future of its result (the order or None)"""
+        future = Future()
+        if not ORDER_BATCHING:
+            future.set_result(place_bitget_order(self.exchange, **order))
+            return future
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="bitget-orders", daemon=True)
+                self._thread.start()
+            self._pending.append((order, future))
+            self._cond.notify()
+        return future
+
+    def _group_key(self, order):
+        market = self.exchange.market(order['symbol'])
+        return (market['type'], market.get('settleId'), order['symbol'], order['margin_mode'], int(order['leverage']))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                pending, self._pending = self._pending, []
+            groups = {}
+            for order, future in pending:
+                batchable = order.get('client_oid') and order['order_type'] in ('market', 'limit')
+                key = self._group_key(order) if batchable else id(future)
+                groups.setdefault(key, []).append((order, future))
+            for items in groups.values():
+                try:
+                    if len(items) == 1:
+                        results = [place_bitget_order(self.exchange, **items[0][0])]
+                    else:
+                        self.batches += 1
+                        self.batched_orders += len(items)
+                        results = place_bitget_orders(self.exchange, items[0][0]['symbol'], [{k: v for k, v in o.items() if k != 'symbol'} for o, _ in items])
+                except Exception as e:
+                    console.print(f"[bold red]Bitget order batch failed: {e}[/bold red]")
+                    for order, _ in items:
+                        bitget_errors.note_failure(order.get('client_oid'), e)
+                    results = [None] * len(items)
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
+
+    def stats(self):
+        return {"batching": ORDER_BATCHING, "pending": len(self._pending), "batches": self.batches, "batched_orders": self.batched_orders}
+
 def format_bitget_order_output(order):
     table = Table(show_header=False, box=box.SQUARE, expand=False)
     info = order.get('info', {})
@@ -112,7 +267,6 @@ def format_bitget_order_output(order):
     table.add_row("[cyan]Trade Side", f"[white]{trade_side}")
     table.add_row("[cyan]Order Status", f"[white]{status}")
     panel = Panel(table, title=f"[bold]{side} [blue] Bitget [green]{order_type}[/green]", border_style="blue", expand=False)
-    console = Console()
     console.print(panel)
 
 
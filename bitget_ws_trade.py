@@ -0,0 +1,172 @@
+import os,json,hmac,hashlib,base64,threading,itertools
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import ccxt,websocket
+from dotenv import load_dotenv
+from position_sizing import sizer
+from clock_sync import clock
+import health
+
+load_dotenv()
+
+BITGET_API_KEY = os.getenv("BITGET_API_KEY")
+BITGET_API_SECRET = os.getenv("BITGET_API_SECRET")
+BITGET_PASSPHRASE = os.getenv("BITGET_PASSPHRASE")
+
+# "rest" sends every order through ccxt, "ws" uses the private trade socket and falls back to REST
+ORDER_TRANSPORT = os.getenv("ORDER_TRANSPORT", "rest").lower()
+BITGET_WS_PRIVATE = os.getenv("BITGET_WS_PRIVATE", "wss://ws.bitget.com/v2/ws/private")
+WS_ORDER_TIMEOUT = float(os.getenv("WS_ORDER_TIMEOUT", "2"))  # seconds before falling back to REST
+
+class BitgetTradeError(ccxt.ExchangeError):
+    """Order rejected by Bitget over the trade socket (business error, not a transport failure)"""
+    def __init__(self, code, msg):
+        super().__init__(f'bitget {{"code":"{code}","msg":"{msg}"}}')
+        self.code = str(code)
+
+class BitgetTradeSocket:
+    """
+    Persistent authenticated Bitget private WebSocket. Orders are pipelined: each request carries an
+    id and the response is matched back to the waiting caller, so many orders can be in flight on one
+    connection. The same socket streams the follower's spot and futures account balances into the sizer.
+    """
+    def __init__(self, url=BITGET_WS_PRIVATE):
+        self.url = url
+        self.ready = threading.Event()
+        self._ws = None
+        self._send_lock = threading.Lock()
+        self._pending = {}  # request id -> Future
+        self._ids = itertools.count(1)
+
+    # --- Connection ---
+
+    def _login_args(self):
+        timestamp = str(int(clock.now_ms("bitget") / 1000))
+        sign = base64.b64encode(hmac.new(BITGET_API_SECRET.encode(), f"{timestamp}GET/user/verify".encode(), hashlib.sha256).digest()).decode()
+        return [{"apiKey": BITGET_API_KEY, "passphrase": BITGET_PASSPHRASE, "timestamp": timestamp, "sign": sign}]
+
+    def _on_open(self, ws):
+        health.register_stream("BITGET-TRADE", reconnect=ws.close)
+        ws.send(json.dumps({"op": "login", "args": self._login_args()}))
+
+    def _on_message(self, ws, message):
+        health.note_frame("BITGET-TRADE")
+        if message == "pong":
+            return
+        msg = json.loads(message)
+        event = msg.get("event")
+        if event == "login":
+            if str(msg.get("code")) == "0":
+                ws.send(json.dumps({"op": "subscribe", "args": [
+                    {"instType": "SPOT", "channel": "account", "coin": "default"},
+                    {"instType": "USDT-FUTURES", "channel": "account", "coin": "default"},
+                ]}))
+                self.ready.set()
+                print("[Bitget WS] Trade socket authenticated")
+            return
+        if event in ("trade", "error") and msg.get("arg"):
+            arg = msg["arg"][0] if isinstance(msg["arg"], list) else msg["arg"]
+            future = self._pending.pop(str(arg.get("id")), None)
+            if future is None:
+                if event == "error":
+                    print(f"[Bitget WS] Error: {msg}")
+                return
+            if str(msg.get("code")) == "0":
+                future.set_result(arg.get("params", {}))
+            else:
+                future.set_exception(BitgetTradeError(msg.get("code"), msg.get("msg")))
+            return
+        if msg.get("arg", {}).get("channel") == "account" and "data" in msg:
+            self._on_account(msg["arg"]["instType"], msg["data"])
+
+    def _on_account(self, inst_type, data):
+        if inst_type == "SPOT":
+            sizer.update_follower_balances("spot", {d["coin"].upper(): float(d.get("available") or 0) + float(d.get("frozen") or 0) + float(d.get("locked") or 0) for d in data})
+        else:
+            sizer.update_follower_balances("futures", {d["marginCoin"].upper(): float(d.get("usdtEquity") or d.get("accountEquity") or 0) for d in data})
+
+    def _on_close(self, ws, *args):
+        self.ready.clear()
+        # Fail everything still in flight, callers fall back to REST with the same clientOid
+        for request_id in list(self._pending):
+            future = self._pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_exception(ccxt.NetworkError("Bitget trade socket closed"))
+
+    def _ping_loop(self, shutdown_event):
+        while not shutdown_event.wait(25):
+            if self.ready.is_set():
+                try:
+                    self._ws.send("ping")
+                except Exception:
+                    pass
+
+    def run(self, shutdown_event):
+        backoff = 1
+        threading.Thread(target=self._ping_loop, args=(shutdown_event,), daemon=True).start()
+        while not shutdown_event.is_set():
+            self._ws = websocket.WebSocketApp(self.url, on_open=self._on_open, on_message=self._on_message, on_close=self._on_close,
+                                              on_error=lambda ws, error: print(f"[Bitget WS] WebSocket error: {error}"))
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                print(f"[Bitget WS] run_forever() error: {e}")
+            self._on_close(self._ws)
+            if shutdown_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, 30)
+
+    def start(self, shutdown_event):
+        t = threading.Thread(target=self.run, args=(shutdown_event,), name="bitget-trade-ws", daemon=True)
+        t.start()
+        return t
+
+    # --- Orders ---
+
+    def place_order(self, exchange, symbol, order_type, side, amount, price=None, params=None, timeout=WS_ORDER_TIMEOUT):
+        """
+        Place an order over the socket, returning a ccxt-shaped order dict. Raises BitgetTradeError on
+        rejection and ccxt.NetworkError when the socket is down or the ack doesn't arrive in time.
+        """
+        if not self.ready.is_set():
+            raise ccxt.NetworkError("Bitget trade socket not connected")
+        params = dict(params or {})
+        market = exchange.market(symbol)
+        spot = market["spot"]
+        size = amount
+        if spot and order_type == "market" and side == "buy":
+            # Spot market buys are sized in quote coin, as ccxt create_order sends them: amount * price
+            if price is None:
+                raise ccxt.InvalidOrder(f"A spot market buy of {amount} {symbol} needs the expected price")
+            size = exchange.cost_to_precision(symbol, float(amount) * float(price))
+        order = {"orderType": order_type, "side": side, "size": str(size), "force": "gtc"}
+        if order_type == "limit":
+            order["price"] = str(price)
+            order["force"] = "ioc" if params.get("timeInForce") == "IOC" else "gtc"
+        if params.get("clientOid"):
+            order["clientOid"] = params["clientOid"]
+        if not spot:
+            order["marginCoin"] = market["settleId"]
+            order["marginMode"] = "crossed" if params.get("marginMode") == "cross" else params.get("marginMode", "crossed")
+            if params.get("tradeSide"):
+                order["tradeSide"] = params["tradeSide"]
+            if params.get("reduceOnly"):
+                order["reduceOnly"] = "YES"
+        request_id = str(next(self._ids))
+        future = Future()
+        self._pending[request_id] = future
+        request = {"op": "trade", "args": [{"id": request_id, "instType": "SPOT" if spot else "USDT-FUTURES", "instId": market["id"],
+                                            "channel": "place-order", "params": order}]}
+        try:
+            with self._send_lock:
+                self._ws.send(json.dumps(request))
+            result = future.result(timeout=timeout)
+        except FutureTimeout:
+            raise ccxt.RequestTimeout(f"No trade socket ack for {order.get('clientOid') or request_id} in {timeout}s")
+        except websocket.WebSocketException as e:
+            raise ccxt.NetworkError(str(e))
+        finally:
+            self._pending.pop(request_id, None)
+        return {"id": result.get("orderId"), "clientOrderId": result.get("clientOid"), "symbol": symbol, "type": order_type,
+                "side": side, "amount": float(amount), "price": price, "status": "open", "info": result}
+
+trade_socket = BitgetTradeSocket()
@@ -0,0 +1,93 @@
+import os,json,time,threading,websocket
+from dotenv import load_dotenv
+import health
+
+load_dotenv()
+
+BITGET_WS_PUBLIC = os.getenv("BITGET_WS_PUBLIC", "wss://ws.bitget.com/v2/ws/public")
+
+class BookCache:
+    """
+    Local Bitget top-of-book per (instType, instId), fed by the public books1 channel. Symbols are
+    subscribed on first use, so only actively mirrored symbols are streamed. Reads are plain dict lookups.
+    """
+    def __init__(self, url=BITGET_WS_PUBLIC):
+        self.url = url
+        self._books = {}        # (inst_type, inst_id) -> (bid, ask, monotonic time)
+        self._subscribed = set()
+        self._ws = None
+        self.connected = threading.Event()
+        self._lock = threading.Lock()
+
+    def top(self, inst_type, inst_id):
+        """(bid, ask, age in ms) or None if the symbol has no book yet"""
+        book = self._books.get((inst_type, inst_id))
+        if book is None:
+            return None
+        return book[0], book[1], (time.monotonic() - book[2]) * 1000
+
+    def ensure_subscribed(self, inst_type, inst_id):
+        key = (inst_type, inst_id)
+        if key in self._subscribed:
+            return
+        with self._lock:
+            self._subscribed.add(key)
+        if self.connected.is_set():
+            self._send_subscribe([key])
+
+    def _send_subscribe(self, keys):
+        args = [{"instType": inst_type, "channel": "books1", "instId": inst_id} for inst_type, inst_id in keys]
+        try:
+            self._ws.send(json.dumps({"op": "subscribe", "args": args}))
+        except Exception as e:
+            print(f"[Book] Subscribe failed: {e}")
+
+    def _on_open(self, ws):
+        self.connected.set()
+        health.register_stream("BITGET-BOOK", reconnect=ws.close)
+        with self._lock:
+            keys = list(self._subscribed)
+        if keys:
+            self._send_subscribe(keys)
+
+    def _on_message(self, ws, message):
+        health.note_frame("BITGET-BOOK")
+        if message == "pong":
+            return
+        msg = json.loads(message)
+        arg = msg.get("arg", {})
+        if arg.get("channel") != "books1" or not msg.get("data"):
+            return
+        book = msg["data"][0]
+        if book.get("bids") and book.get("asks"):
+            self._books[(arg["instType"], arg["instId"])] = (float(book["bids"][0][0]), float(book["asks"][0][0]), time.monotonic())
+
+    def _ping_loop(self, shutdown_event):
+        while not shutdown_event.wait(25):
+            if self.connected.is_set():
+                try:
+                    self._ws.send("ping")
+                except Exception:
+                    pass
+
+    def run(self, shutdown_event):
+        threading.Thread(target=self._ping_loop, args=(shutdown_event,), daemon=True).start()
+        backoff = 1
+        while not shutdown_event.is_set():
+            self._ws = websocket.WebSocketApp(self.url, on_open=self._on_open, on_message=self._on_message,
+                                              on_error=lambda ws, error: print(f"[Book] WebSocket error: {error}"))
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                print(f"[Book] run_forever() error: {e}")
+            self.connected.clear()
+            if shutdown_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, 30)
+
+    def start(self, shutdown_event):
+        t = threading.Thread(target=self.run, args=(shutdown_event,), name="bitget-book-ws", daemon=True)
+        t.start()
+        return t
+
+book_cache = BookCache()
@@ -0,0 +1,155 @@
+import os,sys,time,threading,collections
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class LRUDict:
+    """
+    Dict capped at `maxsize` entries, evicting the least recently used, with an optional per-entry
+    TTL in seconds. Keeps long-running caches and dedup state from growing with uptime.
+    """
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()  # key -> (value, monotonic time stored)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            if self.ttl is not None and time.monotonic() - item[1] > self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return item[0]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def values(self):
+        with self._lock:
+            return [v for v, _ in self._data.values()]
+
+    def items(self):
+        with self._lock:
+            return [(k, v) for k, (v, _) in self._data.items()]
+
+_MISSING = object()
+
+class LRUSet:
+    """Set with the same LRU/TTL bounds as LRUDict, for dedup of ids"""
+    def __init__(self, maxsize, ttl=None, items=()):
+        self._dict = LRUDict(maxsize, ttl)
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        self._dict[item] = True
+
+    def discard(self, item):
+        self._dict.pop(item)
+
+    def __contains__(self, item):
+        return item in self._dict
+
+    def __len__(self):
+        return len(self._dict)
+
+    def __iter__(self):
+        return iter([k for k, _ in self._dict.items()])
+
+################################## Soak run ######################################
+
+def rss_mb():
+    """Resident set size in MB, from /proc where available, else the tracemalloc figure"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return tracemalloc.get_traced_memory()[0] / 1024 / 1024
+
+def soak(events=1_000_000, report_every=100_000):
+    """
+    Push synthetic spot and futures fills through the in-process pipeline state (ingest queue,
+    dedup, leader position book, fill translation, panel rendering to a shared Console) and print
+    RSS as it goes. Returns (rss once the bounded structures are full, rss at the end).
+    """
+    import io,json
+    from rich.console import Console
+    from rich.table import Table
+    from ingest_queue import IngestQueue
+    from futures_translator import LeaderPositionBook, translate_fill
+    # Small enough that eviction runs for most of the soak, the dict tables settle after ~10x churn
+    dedup_max = min(int(os.getenv("PROCESSED_TRADES_MAX", "200000")), max(events // 50, 1))
+    dedup = LRUSet(dedup_max)
+    book = LeaderPositionBook()
+    queue = IngestQueue("SOAK", maxsize=1000)
+    console = Console(file=io.StringIO(), width=120)
+    symbols = [f"C{i}USDT" for i in range(400)]
+    baseline = None
+    for n in range(1, events + 1):
+        symbol = symbols[n % len(symbols)]
+        if n % 2:
+            event = {"e": "executionReport", "x": "TRADE", "X": "FILLED", "s": symbol, "S": "BUY", "q": "1.5", "L": "10.0", "t": n}
+        else:
+            event = {"e": "ORDER_TRADE_UPDATE", "T": n, "o": {"x": "TRADE", "X": "FILLED", "s": symbol, "S": "BUY" if n % 4 else "SELL",
+                                                              "ps": "BOTH", "q": "2", "z": "2", "l": "2", "ap": "10.0", "t": n}}
+        queue.put(json.loads(json.dumps(event)))
+        data = queue.get(timeout=0)
+        if data is None or data.get("t", n) in dedup:
+            continue
+        dedup.add(data.get("t", n))
+        if data["e"] == "ORDER_TRADE_UPDATE":
+            translate_fill(data["o"], book)
+        table = Table(show_header=False)
+        table.add_row("Symbol", symbol)
+        table.add_row("Trade ID", str(n))
+        console.print(table)
+        console.file.seek(0)
+        console.file.truncate()
+        if n % report_every == 0:
+            rss = rss_mb()
+            if baseline is None and n >= events // 5:
+                baseline = rss  # warmed up: from here on memory should stay flat
+            print(f"[Soak] {n:>9} events  RSS {rss:8.1f} MB  dedup {len(dedup)}")
+    end = rss_mb()
+    return baseline if baseline is not None else end, end
+
+def within_budget(start, end):
+    """Whether RSS stayed flat after the warm-up: under 5% or 5 MB of growth, whichever is larger"""
+    return end - start < max(start * 0.05, 5)
+
+if __name__ == "__main__":
+    # python bounded.py soak [events]
+    if len(sys.argv) > 1 and sys.argv[1] == "soak":
+        total = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+        start, end = soak(total, max(total // 10, 1))
+        growth = end - start
+        print(f"[Soak] RSS after warm-up {start:.1f} MB, at the end {end:.1f} MB ({growth:+.1f} MB)")
+        sys.exit(0 if within_budget(start, end) else 1)
@@ -0,0 +1,133 @@
+import os,time,threading,requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CLOCK_SYNC_SECONDS = float(os.getenv("CLOCK_SYNC_SECONDS", "60"))
+CLOCK_SYNC_SAMPLES = int(os.getenv("CLOCK_SYNC_SAMPLES", "4"))      # requests per sync, the lowest-RTT one is used
+CLOCK_SYNC_ALPHA = float(os.getenv("CLOCK_SYNC_ALPHA", "0.3"))      # smoothing of successive offset measurements
+CLOCK_SYNC_STEP_MS = float(os.getenv("CLOCK_SYNC_STEP_MS", "1000"))  # a jump larger than this is taken as is
+CLOCK_MAX_SKEW_MS = float(os.getenv("CLOCK_MAX_SKEW_MS", "1000"))    # local wall clock skew reported as unhealthy
+
+# Server-time endpoints: source -> (url, fn(json) returning the server time in ms)
+SOURCES = {
+    "binance": ("https://api.binance.com/api/v3/time", lambda r: r["serverTime"]),
+    "binance-futures": ("https://fapi.binance.com/fapi/v1/time", lambda r: r["serverTime"]),
+    "bitget": ("https://api.bitget.com/api/v2/public/time", lambda r: r["data"]["serverTime"]),
+}
+
+class ClockSync:
+    """
+    Exchange clocks derived from the local monotonic clock. Wall time is read once at startup and
+    advanced with time.monotonic(), so NTP steps and container clock jumps don't move it; each
+    exchange's offset from it is measured against its server-time endpoint (RTT compensated, the
+    lowest-RTT of several samples, smoothed across syncs) and kept fresh by a background thread.
+    """
+    def __init__(self):
+        self._wall_anchor_ms = time.time() * 1000
+        self._mono_anchor = time.monotonic()
+        self._session = requests.Session()
+        self._locks = {source: threading.Lock() for source in SOURCES}  # per source, never held across a request
+        self._offsets = {}      # source -> {"offset_ms", "rtt_ms", "synced", "attempted", "syncs", "error"}
+        self._hooks = {}        # source -> [fn(clock)] called after every sync
+
+    def local_ms(self):
+        """Local epoch ms on the monotonic clock"""
+        return self._wall_anchor_ms + (time.monotonic() - self._mono_anchor) * 1000
+
+    def now_ms(self, source="binance"):
+        """Current time on `source`'s clock in epoch ms, for signing requests and measuring lag"""
+        state = self._offsets.get(source)
+        if state is None:
+            self.sync(source)  # first use, before the background thread's first pass
+            state = self._offsets.get(source)
+        elif time.monotonic() - state["attempted"] > CLOCK_SYNC_SECONDS:
+            self._sync_in_background(source)  # the background thread is not running, or fell behind
+        return self.local_ms() + (state["offset_ms"] if state else 0.0)
+
+    def _sync_in_background(self, source):
+        with self._locks[source]:
+            state = self._offsets[source]
+            if time.monotonic() - state["attempted"] <= CLOCK_SYNC_SECONDS:
+                return  # another caller already started one
+            state["attempted"] = time.monotonic()
+        threading.Thread(target=self.sync, args=(source,), name=f"clock-sync-{source}", daemon=True).start()
+
+    def offset_ms(self, source):
+        state = self._offsets.get(source)
+        return state["offset_ms"] if state else 0.0
+
+    def wall_difference_ms(self, source):
+        """Local wall clock minus `source`'s clock, what ccxt calls timeDifference"""
+        return time.time() * 1000 - self.now_ms(source)
+
+    def on_sync(self, source, fn):
+        self._hooks.setdefault(source, []).append(fn)
+
+    def _sample(self, source):
+        url, parse = SOURCES[source]
+        t0 = self.local_ms()
+        resp = self._session.get(url, timeout=5)
+        t1 = self.local_ms()
+        resp.raise_for_status()
+        # The server stamped its time somewhere in the round trip, the midpoint halves the error
+        return float(parse(resp.json())) - (t0 + t1) / 2, t1 - t0
+
+    def sync(self, source):
+        """Measure `source`'s offset. Returns it, or None if the endpoint could not be reached."""
+        lock = self._locks[source]
+        with lock:
+            state = self._offsets.setdefault(source, {"offset_ms": 0.0, "rtt_ms": None, "synced": None, "attempted": 0.0, "syncs": 0, "error": None})
+            state["attempted"] = time.monotonic()
+        samples = []
+        error = None
+        for _ in range(CLOCK_SYNC_SAMPLES):
+            try:
+                samples.append(self._sample(source))
+            except Exception as e:
+                error = str(e)
+        with lock:
+            if not samples:
+                state["error"] = error
+                print(f"[Clock] {source} time sync failed: {error}")
+                return None
+            offset, rtt = min(samples, key=lambda s: s[1])
+            if state["syncs"] == 0 or abs(offset - state["offset_ms"]) > CLOCK_SYNC_STEP_MS:
+                state["offset_ms"] = offset
+            else:
+                state["offset_ms"] += CLOCK_SYNC_ALPHA * (offset - state["offset_ms"])
+            state.update(rtt_ms=rtt, synced=time.monotonic(), syncs=state["syncs"] + 1, error=None)
+        for fn in self._hooks.get(source, []):
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"[Clock] Sync hook for {source} failed: {e}")
+        return state["offset_ms"]
+
+    def _sync_loop(self, shutdown_event):
+        while True:
+            for source in SOURCES:
+                self.sync(source)
+            if shutdown_event.wait(CLOCK_SYNC_SECONDS):
+                break
+
+    def start(self, shutdown_event):
+        t = threading.Thread(target=self._sync_loop, args=(shutdown_event,), name="clock-sync", daemon=True)
+        t.start()
+        return t
+
+    def health(self):
+        """Health check: every exchange clock synced recently; local wall clock skew is reported"""
+        now = time.monotonic()
+        info = {}
+        ok = True
+        for source, state in list(self._offsets.items()):
+            fresh = state["synced"] is not None and now - state["synced"] < 5 * CLOCK_SYNC_SECONDS
+            ok &= fresh
+            info[source] = {"offset_ms": round(state["offset_ms"], 1), "rtt_ms": round(state["rtt_ms"] or 0, 1),
+                            "synced_s_ago": round(now - state["synced"]) if state["synced"] else None, "error": state["error"]}
+        skew = time.time() * 1000 - self.now_ms("binance") if "binance" in self._offsets else 0.0
+        info["local_wall_skew_ms"] = round(skew, 1)
+        return ok and abs(skew) <= CLOCK_MAX_SKEW_MS, info
+
+clock = ClockSync()
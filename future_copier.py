@@ -1,90 +1,241 @@
-import asyncio,websockets,requests,time,hmac,hashlib,json
+import time,threading,traceback
 from rich.console import Console
 from dotenv import load_dotenv
-from rich.table import Table
-from rich.panel import Panel
-from rich import box
-import ccxt,os
-from bitget_order_utils import place_bitget_order
-import threading
-import traceback
+from bitget_order_utils import place_bitget_order, OrderBatcher
+from order_submission import make_client_oid
+from mirror_journal import journal
+from futures_translator import translate_fill, apply_partial_fill, correction_leg, leader_positions, get_position_book, position_books
+from audit_store import audit
+from binance_signer import get_signer
+from position_sizing import sizer, DEFAULT_ACCOUNT
+from position_reconciler import reconciler
+import slippage_guard
+import bitget_errors
+from paper_trading import bitget_client, load_markets
+from speculative import speculator
+from book_cache import book_cache
+from pipeline import pipeline, MarketAdapter, Fill, fill_panel
+from stream_manager import leader_accounts
+from clock_sync import clock
 
 load_dotenv()
 
-BINANCE_API_KEY = os.getenv("BINANCE_API_KEY")
-BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET")
-BITGET_API_KEY = os.getenv("BITGET_API_KEY")
-BITGET_API_SECRET = os.getenv("BITGET_API_SECRET")
-BITGET_PASSPHRASE = os.getenv("BITGET_PASSPHRASE")
-
-
-
-bitget = ccxt.bitget({
-    "apiKey": BITGET_API_KEY,
-    "secret": BITGET_API_SECRET,
-    "password": BITGET_PASSPHRASE,
-    "enableRateLimit": True,
-    'options': {'defaultType': 'swap'},
-})
-
-# For futures trading links for binance
-REST_BASE = "https://fapi.binance.com"
-WS_BASE = "wss://fstream.binance.com/ws/"
-
+bitget = bitget_client("swap")
+load_markets(bitget, "swap_markets", sizer.register_markets)
+order_batcher = OrderBatcher(bitget)
 
 console = Console()
 
+# Leader futures equity is wallet balance plus unrealized PnL, like the follower's usdtEquity
+leader_wallets = {}     # account -> {asset: walletBalance}
+leader_unrealized = {}  # account -> {(symbol, position side): (margin asset, unrealized PnL)}
+leader_equity_lock = threading.Lock()
+
 ################################# Support Functions ###################################
 
-def get_listen_key():
-    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
-    resp = requests.post(f"{REST_BASE}/fapi/v1/listenKey", headers=headers)
-    resp.raise_for_status()
-    return resp.json()["listenKey"]
+def get_position_risk(account=DEFAULT_ACCOUNT, symbol=None):
+    """
+    Fetch leader positions (leverage, marginType, positionAmt per symbol and position side) using the REST API.
+    Pass `symbol` to only fetch that symbol's positions.
+    """
+    return get_signer(account, "futures").request("GET", "/fapi/v2/positionRisk", {"symbol": symbol} if symbol else None)
 
-def get_position_info(symbol, position_side):
+def get_position_info(symbol, position_side, account=DEFAULT_ACCOUNT):
     """
-    Fetch the current leverage and marginType for a symbol and position side (LONG/SHORT) using the REST API.
+    Fetch the current leverage and marginType for a symbol and position side (LONG/SHORT/BOTH) using the REST API.
     """
-    params = {
-        "timestamp": int(time.time() * 1000)
-    }
-    query_string = '&'.join([f"{k}={params[k]}" for k in sorted(params)])
-    signature = hmac.new(BINANCE_API_SECRET.encode(), query_string.encode(), hashlib.sha256).hexdigest()
-    params["signature"] = signature
-    headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
-    resp = requests.get(f"{REST_BASE}/fapi/v2/positionRisk", params=params, headers=headers)
-    resp.raise_for_status()
-    positions = resp.json()
-    for p in positions:
+    for p in get_position_risk(account, symbol):
         if p["symbol"] == symbol and p["positionSide"] == position_side:
             return f"{p['leverage']}x", p.get('marginType', '-')
     return "-", "-"
 
-def format_order_update(data):
+def get_account_balances(account=DEFAULT_ACCOUNT):
+    """
+    Fetch a leader's futures account: ({asset: walletBalance}, {(symbol, position side): (margin
+    asset, unrealizedProfit)}) for the open positions.
+    """
+    snapshot = get_signer(account, "futures").request("GET", "/fapi/v2/account")
+    wallet = {a["asset"]: float(a["walletBalance"]) for a in snapshot.get("assets", [])}
+    unrealized = {(p["symbol"], p["positionSide"]): ("USDC" if p["symbol"].endswith("USDC") else "USDT", float(p["unrealizedProfit"]))
+                  for p in snapshot.get("positions", []) if float(p.get("positionAmt") or 0)}
+    return wallet, unrealized
+
+def update_leader_equity(account, wallet, unrealized, replace=False):
+    """
+    Feed the sizer a leader's futures equity per asset: wallet balance plus the unrealized PnL of the
+    positions margined in it. ACCOUNT_UPDATE events only carry what changed, so they are merged.
+    """
+    with leader_equity_lock:
+        wallets = leader_wallets[account] = {} if replace else leader_wallets.get(account, {})
+        positions = leader_unrealized[account] = {} if replace else leader_unrealized.get(account, {})
+        wallets.update(wallet)
+        positions.update(unrealized)
+        equity = dict(wallets)
+        for asset, pnl in positions.values():
+            equity[asset] = equity.get(asset, 0.0) + pnl
+    sizer.update_leader_balances(account, "futures", equity, replace=True)
+
+def seed_futures_equity():
+    """One-off snapshot of the follower's and every leader's futures equity, ACCOUNT_UPDATE events keep it current afterwards"""
+    try:
+        follower = bitget.fetch_balance().get("total", {})
+        sizer.update_follower_balances("futures", {a: float(q or 0) for a, q in follower.items()}, replace=True)
+    except Exception as e:
+        console.print(f"[bold red][Sizing] Could not seed the follower's futures equity: {e}[/bold red]")
+    for account in leader_accounts("futures"):
+        try:
+            update_leader_equity(account, *get_account_balances(account), replace=True)
+            console.print(f"[cyan][Sizing] Futures equity ratio of {account}: {sizer.equity_ratio(account, 'futures')}[/cyan]")
+        except Exception as e:
+            console.print(f"[bold red][Sizing] Could not seed the futures equity of {account}: {e}[/bold red]")
+
+def seed_leader_positions():
+    """
+    Load every futures leader's open positions so one-way fills can tell opens from closes from the
+    first event. The positions are as of the request time: fills the stream applied after it are
+    kept. Positions restored from the warm-state snapshot that were closed meanwhile are zeroed; a
+    restored book is dropped if its leader can't be fetched or is no longer configured.
+    """
+    accounts = leader_accounts("futures")
+    for account in set(position_books) - set(accounts):
+        del position_books[account]
+    if DEFAULT_ACCOUNT not in accounts:
+        leader_positions.clear()
+    for account in accounts:
+        book = get_position_book(account)
+        try:
+            fetched_ms = int(clock.now_ms("binance-futures"))
+            open_positions = {}
+            for p in get_position_risk(account):
+                qty = float(p["positionAmt"])
+                if qty:
+                    open_positions[(p["symbol"], p["positionSide"])] = qty if p["positionSide"] == "BOTH" else abs(qty)
+        except Exception as e:
+            book.clear()
+            console.print(f"[bold red]Could not load leader positions of {account}: {e}[/bold red]")
+            continue
+        for symbol, ps, qty, _ in book.snapshot():
+            if qty and (symbol, ps) not in open_positions:
+                open_positions[(symbol, ps)] = 0.0
+        for (symbol, ps), qty in open_positions.items():
+            book.set(symbol, ps, qty, fetched_ms)
+            if account == DEFAULT_ACCOUNT:
+                reconciler.update_leader("futures", symbol, ps, book.get(symbol, ps))  # only positions it tracks
+
+def fetch_follower_futures(binance_symbol, position_side):
+    """Current Bitget position size for a symbol/side, signed for one-way (BOTH) positions"""
+    bitget_symbol = convert_binance_to_bitget_symbol(binance_symbol)
+    long_qty, short_qty = 0.0, 0.0
+    for p in bitget.fetch_positions([bitget_symbol]):
+        if p.get("side") == "long":
+            long_qty += float(p.get("contracts") or 0)
+        elif p.get("side") == "short":
+            short_qty += float(p.get("contracts") or 0)
+    if position_side == "LONG":
+        return long_qty
+    if position_side == "SHORT":
+        return short_qty
+    return long_qty - short_qty
+
+def correct_futures_drift(binance_symbol, position_side, delta, follower_qty, client_oid):
+    """Send a corrective futures market order of `delta` contracts (already in follower size)"""
+    bitget_symbol = convert_binance_to_bitget_symbol(binance_symbol)
+    leg = correction_leg(position_side, delta, follower_qty)
+    amount = sizer.round_amount(bitget_symbol, leg["qty"])
+    if amount <= 0:
+        return False
+    leverage_, margin_type_ = get_position_info(binance_symbol, position_side)
+    leverage = leverage_.replace('x', '') if isinstance(leverage_, str) else leverage_
+    order = place_bitget_order(
+        bitget=bitget,
+        symbol=bitget_symbol,
+        order_type="market",
+        side=leg["side"],
+        amount=amount,
+        price=None,
+        leverage=int(leverage) if leverage not in (None, "-") else 1,
+        margin_mode=margin_type_,
+        trade_side=leg["trade_side"],
+        client_oid=client_oid,
+        reduce_only=leg["reduce_only"]
+    )
+    return order is not None
+
+reconciler.register_market(
+    "futures",
+    fetch_follower=fetch_follower_futures,
+    correct=correct_futures_drift,
+    price=lambda symbol: sizer.price(symbol[:-4]),
+    leader=lambda symbol, position_side: leader_positions.get(symbol, position_side),
+    bitget_symbol=lambda symbol: convert_binance_to_bitget_symbol(symbol),
+    persist=True,
+)
+
+def futures_order(client_oid, payload):
+    """place_bitget_order keyword arguments (without the client) of a journaled futures intent"""
+    return dict(
+        symbol=convert_binance_to_bitget_symbol(payload["binance_symbol"]),
+        order_type=payload.get("order_type", "market"),
+        side=payload["side"],
+        amount=payload["amount"],
+        price=payload.get("limit_price"),
+        leverage=payload["leverage"],
+        margin_mode=payload["margin_mode"],
+        trade_side=payload["trade_side"],
+        reduce_only=payload.get("reduce_only", False),
+        client_oid=client_oid,
+        time_in_force="IOC" if payload.get("order_type") == "limit" else None,
+        leverage_set=payload.get("leverage_set", False)
+    )
+
+def submit_futures_intent(client_oid, payload):
+    """Send a translated futures mirror order and update the reconciler with the outcome. Returns the order or None."""
+    order = place_bitget_order(bitget=bitget, **futures_order(client_oid, payload))
+    return settle_futures_intent(payload, order)
+
+def settle_futures_intent(payload, order):
+    """Update the reconciler with the outcome of a futures intent, returns the order"""
+    binance_symbol = payload["binance_symbol"]
+    # Only the default leader's own futures fills are reconciled against the follower's positions
+    reconcile = payload.get("account", DEFAULT_ACCOUNT) == DEFAULT_ACCOUNT and not payload.get("routed")
+    if order is not None:
+        if reconcile:
+            if payload.get("order_type", "market") == "market":
+                reconciler.note_follower_fill("futures", binance_symbol, payload["position_side"], payload["delta"])
+            else:
+                reconciler.mark_dirty("futures", binance_symbol, payload["position_side"])  # an IOC limit may fill partially
+        return order
+    if reconcile:
+        reconciler.mark_dirty("futures", binance_symbol, payload["position_side"])
+    return None
+
+# Journal replays use the same path, the clientOid makes a replay of a landed order a no-op
+replay_futures_intent = submit_futures_intent
+
+def order_update_rows(data, direction=None, account=DEFAULT_ACCOUNT):
     o = data["o"]
-    table = Table(show_header=False, box=box.SQUARE, expand=False)
-    table.add_row("[cyan]Timestamp", f"[white]{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['T']/1000))}")
-    table.add_row("[cyan]Symbol", f"[white]{o['s']}")
-    table.add_row("[cyan]Side", f"[white]{o['S']}" )
-    # Always show the position side as reported by Binance (LONG/SHORT/BOTH)
-    table.add_row("[cyan]Position Side", f"[white]{o.get('ps', '-')}")
-    table.add_row("[cyan]Quantity", f"[white]{o['q']}")
-    table.add_row("[cyan]Price", f"[white]{o['ap']} USDT")
-    table.add_row("[cyan]Total Value", f"[white]{float(o['ap'])*float(o['q']):.2f} USDT")
-    table.add_row("[cyan]Trade ID", f"[white]{o['t']}" )
-    table.add_row("[cyan]Order Status", f"[white]{o['X']}" )
-    table.add_row("[cyan]Order Type", f"[white]{o['o']}" )
     if 'ps' in o:
-        leverage, margin_type = get_position_info(o['s'], o['ps'])
+        leverage, margin_type = get_position_info(o['s'], o['ps'], account)
     else:
         leverage, margin_type = "-", "-"
-    table.add_row("[cyan]Leverage", f"[white]{leverage}")
-    table.add_row("[cyan]Margin Type", f"[white]{margin_type}")
-    table.add_row("[cyan]Position Amt", f"[white]{o['z']}")
-    table.add_row("[cyan]Reduce Only", f"[white]{o['R']}")
-    table.add_row("[cyan]Direction", f"[white]{'OPEN' if o['X']=='FILLED' and float(o['z'])!=0 else 'CLOSE'}")    
-    return table
+    return [
+        ("Timestamp", time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['T']/1000))),
+        ("Symbol", o['s']),
+        ("Side", o['S']),
+        # Always show the position side as reported by Binance (LONG/SHORT/BOTH)
+        ("Position Side", o.get('ps', '-')),
+        ("Quantity", o['q']),
+        ("Price", f"{o['ap']} USDT"),
+        ("Total Value", f"{float(o['ap'])*float(o['q']):.2f} USDT"),
+        ("Trade ID", o['t']),
+        ("Order Status", o['X']),
+        ("Order Type", o['o']),
+        ("Leverage", leverage),
+        ("Margin Type", margin_type),
+        ("Position Amt", o['z']),
+        ("Reduce Only", o['R']),
+        ("Direction", direction or '-'),
+    ]
 
 def convert_binance_to_bitget_symbol(binance_symbol):
     if binance_symbol.endswith("USDT"):
@@ -94,80 +245,155 @@ def convert_binance_to_bitget_symbol(binance_symbol):
         raise ValueError(f"Unsupported symbol format: {binance_symbol}")
 
 
-################################## Main Function #######################################
-
-def keepalive_listen_key(listen_key, stop_event):
+def mirror_leg(account, binance_symbol, bitget_symbol, position_side, leg, amount, leader_price, leverage, margin_mode, client_oid, ref, leader_ts_ms, routed=False, leverage_set=False):
     """
-    Sends a keepalive request to Binance every 20 minutes to prevent listen key expiration.
-    Stops if stop_event is set.
+    Slippage-check, journal and queue one futures leg on the order batcher, recording the outcome in
+    the audit store when it completes. Returns a Future of the order (None on failure), or None if skipped.
     """
-    while not stop_event.is_set():
-        try:
-            headers = {"X-MBX-APIKEY": BINANCE_API_KEY}
-            requests.put(f"{REST_BASE}/fapi/v1/listenKey", headers=headers, params={"listenKey": listen_key})
-        except Exception as e:
-            console.print(f"[bold red]Error keeping listen key alive: {e}[/bold red]")
-        stop_event.wait(20 * 60)  # 20 minutes
-
-async def user_data_ws(shutdown_event):
-    while not shutdown_event.is_set():
-        listen_key = get_listen_key()
-        ws_url = WS_BASE + listen_key
-        stop_event = shutdown_event  # Use the global shutdown_event
-        keepalive_thread = threading.Thread(target=keepalive_listen_key, args=(listen_key, stop_event), daemon=True)
-        keepalive_thread.start()
+    # Pre-trade slippage check against the cached Bitget book, closing legs are never skipped.
+    # A hedge-mode close names the position side (buy closes a long), the trade itself goes the other way.
+    closing = leg["reduce_only"] or leg["trade_side"] == "close"
+    taker_side = leg["side"] if leg["trade_side"] != "close" else ("sell" if leg["side"] == "buy" else "buy")
+    inst_id = bitget.market(bitget_symbol)["id"]
+    order_type, limit_price, deviation_bps = slippage_guard.decide("USDT-FUTURES", inst_id, taker_side, float(leader_price), reduce_only=closing)
+    if order_type == slippage_guard.SKIP:
+        console.print(f"[bold red]Skipping {bitget_symbol}: Bitget is {deviation_bps:.1f} bps away from the leader price {leader_price} (max {slippage_guard.MAX_SLIPPAGE_BPS} bps).[/bold red]")
+        audit.follower_execution(ref, client_oid, "futures", binance_symbol, leg["side"], amount, leader_ts_ms=leader_ts_ms, error="slippage guard")
+        return None
+    if order_type == slippage_guard.LIMIT:
+        limit_price = float(bitget.price_to_precision(bitget_symbol, limit_price))
+    print(f"Placing Bitget {order_type} order for {bitget_symbol} with side {leg['side']}, amount {amount}, leverage {leverage}, margin type {margin_mode}, direction {leg['trade_side'] or ('reduce' if leg['reduce_only'] else 'one-way')}")
+    payload = {"account": account, "binance_symbol": binance_symbol, "position_side": position_side, "side": leg["side"], "amount": amount,
+               "leverage": int(leverage), "margin_mode": margin_mode, "trade_side": leg["trade_side"],
+               "reduce_only": leg["reduce_only"], "delta": amount if leg["delta"] > 0 else -amount,
+               "order_type": order_type, "limit_price": limit_price, "routed": routed, "leverage_set": leverage_set}
+    # Batched orders are not fetched again after the batch, their audit row gets the price the order was expected to fill at
+    top = book_cache.top("USDT-FUTURES", inst_id)
+    expected_price = limit_price or ((top[1] if taker_side == "buy" else top[0]) if top else float(leader_price))
+    journal.received(client_oid, "futures", payload)
+    journal.submitted(client_oid)
+
+    def settled(future):
+        # Runs as a done-callback, which would swallow an exception and leave the intent unconfirmed
         try:
-            async with websockets.connect(ws_url) as ws:
-                console.print("[bold green]Listening for real-time order updates...[/bold green]")
-                while not shutdown_event.is_set():
-                    try:
-                        msg = await ws.recv()
-                        if shutdown_event.is_set():
-                            break
-                        data = json.loads(msg)
-                        if data.get("e") == "ORDER_TRADE_UPDATE":
-                            o = data["o"]
-                            if o["X"] == "FILLED":
-                                table = format_order_update(data)
-                                panel = Panel(table, title=f"[bold]{o['S']} [blue]{o['s']} - [green]{'OPEN' if float(o['z'])!=0 else 'CLOSE'}[/green]", border_style="green", expand=False)
-                                console.print(panel)
-                                binance_symbol = o["s"]
-                                bitget_symbol = convert_binance_to_bitget_symbol(binance_symbol)
-                                if o["ps"] == "LONG":
-                                    side = "sell" if o["ps"] == "SHORT" else "buy"
-                                    direction = "open" if o["S"] == "BUY" else "close"
-                                elif o["ps"] == "SHORT":
-                                    side = "sell" if o["ps"] == "SHORT" else "buy"
-                                    direction = "open" if o["S"] == "SELL" else "close"
-                                leverage_, margin_type_ = get_position_info(o['s'], o['ps'])
-                                leverage = leverage_.replace('x', '') if isinstance(leverage_, str) else leverage_
-                                print(f"Placing Bitget order for {bitget_symbol} with side {side}, amount {o['q']}, leverage {leverage}, margin type {margin_type_}, direction {direction}")
-                                place_bitget_order(
-                                    bitget=bitget,
-                                    symbol=bitget_symbol,
-                                    order_type="market",
-                                    side=side,
-                                    amount=o['q'],
-                                    price=None,
-                                    leverage=int(leverage),
-                                    margin_mode=margin_type_,
-                                    trade_side=direction
-                                )
-                    except websockets.ConnectionClosed as e:
-                        if shutdown_event.is_set():
-                            break
-                        console.print(f"[yellow]WebSocket closed: {e}. Reconnecting in 10 seconds...[/yellow]")
-                        break  # Break inner loop to reconnect
-                    except Exception as e:
-                        if shutdown_event.is_set():
-                            break
-                        console.print(f"[bold red]Error in message processing: {e}\n{traceback.format_exc()}[/bold red]")
-                        await asyncio.sleep(1)
+            order = settle_futures_intent(payload, future.result())
+            if order is not None:
+                journal.acked(client_oid)
+                if not (order.get("average") or order.get("price")):
+                    order = dict(order, price=expected_price)
+            else:
+                journal.failed(client_oid)
+            audit.follower_execution(ref, client_oid, "futures", binance_symbol, leg["side"], amount, order=order, leader_ts_ms=leader_ts_ms,
+                                     error=None if order is not None else bitget_errors.failure_reason(client_oid))
         except Exception as e:
-            if shutdown_event.is_set():
-                break
-            console.print(f"[bold red]WebSocket connection error: {e}\nReconnecting in 10 seconds...[/bold red]")
-            await asyncio.sleep(10)
-        finally:
-            stop_event.set()  # Stop the keepalive thread when reconnecting
-            await asyncio.sleep(10)  # Prevent rapid reconnect loops
\ No newline at end of file
+            console.print(f"[bold red]Could not settle the futures order {client_oid}: {e}[/bold red]")
+            traceback.print_exc()
+
+    # Returns without waiting for Bitget, so the next fills of a burst can join the same batch
+    future = order_batcher.submit(**futures_order(client_oid, payload))
+    future.add_done_callback(settled)
+    return future
+
+class FuturesAdapter(MarketAdapter):
+    """USD-M leader fills, translated into Bitget futures legs in hedge or one-way mode"""
+    name = "futures"
+    markets = ("futures",)
+
+    def normalize(self, data, account, market):
+        if data.get("e") != "ORDER_TRADE_UPDATE" or data["o"]["X"] != "FILLED":
+            return None
+        o = data["o"]
+        sizer.note_price(o['s'][:-4], o['ap'])
+        # Updates the leader position book, the legs depend on the position before this fill
+        legs, direction = translate_fill(o, get_position_book(account))
+        return Fill(account, market, o['s'], o['S'], o['z'], o['ap'], o['t'], o.get("i"), o.get("T") or data.get("T"),
+                    make_client_oid("futures", o['s'], o['t'], account=account), data, {"legs": legs, "direction": direction})
+
+    def update(self, data, account, market):
+        if data.get("e") == "ORDER_TRADE_UPDATE" and data["o"]["x"] == "TRADE" and data["o"]["X"] == "PARTIALLY_FILLED":
+            # Keeps the book right when the ACCOUNT_UPDATE of a partial fill comes after the final fill
+            apply_partial_fill(data["o"], get_position_book(account))
+            return
+        if data.get("e") != "ACCOUNT_UPDATE":
+            return
+        update_leader_equity(account, {b["a"]: float(b["wb"]) for b in data["a"].get("B", [])},
+                             {(p["s"], p["ps"]): (p.get("ma") or "USDT", float(p.get("up") or 0)) for p in data["a"].get("P", [])})
+        for p in data["a"].get("P", []):
+            qty = float(p["pa"])
+            qty = qty if p["ps"] == "BOTH" else abs(qty)
+            get_position_book(account).set(p["s"], p["ps"], qty, int(data.get("T") or 0))
+            if account == DEFAULT_ACCOUNT:
+                reconciler.update_leader("futures", p["s"], p["ps"], qty)
+
+    def render(self, fill):
+        o = fill.data["o"]
+        direction = fill.detail["direction"]
+        leader = "" if fill.account == DEFAULT_ACCOUNT else f" [magenta]{fill.account}[/magenta]"
+        return fill_panel(f"[bold]{o['S']} [blue]{o['s']} - [green]{direction}[/green]{leader}",
+                          order_update_rows(fill.data, direction, fill.account))
+
+    def execute(self, fill, route, prepared=None):
+        o = fill.data["o"]
+        binance_symbol = fill.symbol
+        bitget_symbol = convert_binance_to_bitget_symbol(binance_symbol)
+        if fill.account == DEFAULT_ACCOUNT:
+            reconciler.track("futures", binance_symbol, o["ps"])
+        if prepared is not None:
+            # Leverage and margin mode were looked up and set on Bitget when the leader order was NEW
+            leverage, margin_type_ = prepared["leverage"], prepared["margin_mode"]
+        else:
+            leverage_, margin_type_ = get_position_info(o['s'], o['ps'], fill.account)
+            leverage = leverage_.replace('x', '') if isinstance(leverage_, str) else leverage_
+        for i, leg in enumerate(fill.detail["legs"]):
+            amount = sizer.scale(fill.account, "futures", binance_symbol, bitget_symbol, leg["qty"], o['ap'], route.multiplier, route.max_notional)
+            if amount <= 0:
+                console.print(f"[bold red]Skipping {bitget_symbol}: scaled amount for {leg['qty']} is below the Bitget minimum.[/bold red]")
+                continue
+            client_oid = make_client_oid("futures", binance_symbol, o['t'], leg=i, account=fill.account)
+            mirror_leg(fill.account, binance_symbol, bitget_symbol, o["ps"], leg, amount, o['ap'], leverage, margin_type_, client_oid, fill.ref,
+                       fill.ts_ms, leverage_set=prepared is not None)
+
+    def execute_routed(self, fill, route):
+        mirror_spot_fill(fill.account, fill.market, fill.symbol, fill.side, fill.qty, fill.price, fill.ref, fill.ts_ms, route)
+
+    def replay(self, client_oid, payload):
+        return replay_futures_intent(client_oid, payload)
+
+    def seed(self):
+        seed_futures_equity()
+        seed_leader_positions()
+
+    def stats(self):
+        return {"futures_batches": order_batcher.stats()}
+
+def prepare_futures_order(data, account):
+    """Speculative preparation on a leader NEW market order: leverage lookup, set_leverage, warm book"""
+    o = data["o"]
+    bitget_symbol = convert_binance_to_bitget_symbol(o["s"])
+    book_cache.ensure_subscribed("USDT-FUTURES", bitget.market(bitget_symbol)["id"])
+    leverage_, margin_type_ = get_position_info(o["s"], o["ps"], account)
+    leverage = leverage_.replace('x', '') if isinstance(leverage_, str) else leverage_
+    leverage = int(leverage) if leverage not in (None, "-") else 1
+    bitget.set_leverage(leverage=leverage, symbol=bitget_symbol, params={'marginMode': margin_type_})
+    return {"leverage": leverage, "margin_mode": margin_type_}
+
+speculator.register("futures", prepare_futures_order)
+
+def mirror_spot_fill(account, market, binance_symbol, side, quantity, price, client_oid, leader_ts_ms, route):
+    """
+    Mirror a leader spot/margin fill routed to futures: a buy opens or grows a long, a sell reduces it.
+    Leverage and margin mode come from the route. Returns a Future of the order, or None if not sent.
+    """
+    bitget_symbol = convert_binance_to_bitget_symbol(binance_symbol)
+    if bitget_symbol not in bitget.markets:
+        console.print(f"[bold red]No Bitget USDT futures market for {binance_symbol}, cannot route the spot fill.[/bold red]")
+        return None
+    leg = correction_leg("LONG", quantity if side.upper() == "BUY" else -quantity)
+    amount = sizer.scale(account, market, binance_symbol, bitget_symbol, leg["qty"], price, route.multiplier, route.max_notional)
+    if amount <= 0:
+        console.print(f"[bold red]Skipping {bitget_symbol}: scaled amount for {quantity} is below the Bitget minimum.[/bold red]")
+        return None
+    return mirror_leg(account, binance_symbol, bitget_symbol, "LONG", leg, amount, price, route.leverage, route.margin_mode,
+                      client_oid, client_oid, leader_ts_ms, routed=True)
+
+pipeline.register(FuturesAdapter())
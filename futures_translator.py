@@ -0,0 +1,167 @@
+import os,threading
+from dotenv import load_dotenv
+from warm_state import warm_state
+
+load_dotenv()
+
+# Position mode of the Bitget follower account: "hedge" (open/close per side) or "one_way"
+BITGET_POSITION_MODE = os.getenv("BITGET_POSITION_MODE", "hedge").lower()
+
+class LeaderPositionBook:
+    """
+    Leader futures positions per (symbol, positionSide). Trades are applied as they arrive so the
+    position before the next fill is always known, ACCOUNT_UPDATE snapshots override them unless
+    they are older than the last applied trade. A snapshot can also arrive before the trade events
+    it already contains (same or later transaction time), those trades are not applied twice.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._positions = {}  # (symbol, ps) -> signed qty
+        self._updated = {}    # (symbol, ps) -> transaction time (ms) of the last applied change
+        self._synced = {}     # (symbol, ps) -> transaction time (ms) of the last snapshot
+
+    def get(self, symbol, position_side="BOTH"):
+        return self._positions.get((symbol, position_side), 0.0)
+
+    def set(self, symbol, position_side, qty, tx_time=0):
+        key = (symbol, position_side)
+        with self._lock:
+            if tx_time and tx_time < self._updated.get(key, 0):
+                return
+            self._positions[key] = qty
+            self._updated[key] = tx_time
+            self._synced[key] = tx_time
+
+    def apply_trade(self, symbol, position_side, signed_filled, signed_last, tx_time=0):
+        """
+        Apply one trade of a leader order: `signed_last` is the trade, `signed_filled` the order's
+        cumulative fill including it. Returns the position before the order's first trade, so
+        partial fills already in the book (as trades or in a snapshot) don't count as the position.
+        """
+        key = (symbol, position_side)
+        with self._lock:
+            position = self._positions.get(key, 0.0)
+            if not (tx_time and tx_time <= self._synced.get(key, 0)):
+                position += signed_last
+                self._positions[key] = position
+                self._updated[key] = max(tx_time, self._updated.get(key, 0))
+            return position - signed_filled
+
+    def snapshot(self):
+        with self._lock:
+            return [[symbol, ps, qty, self._updated.get((symbol, ps), 0)] for (symbol, ps), qty in self._positions.items()]
+
+    def clear(self):
+        with self._lock:
+            self._positions.clear()
+            self._updated.clear()
+            self._synced.clear()
+
+leader_positions = LeaderPositionBook()
+position_books = {}  # account -> LeaderPositionBook for leaders other than the default one
+
+def get_position_book(account=None):
+    if account is None or account == "default":
+        return leader_positions
+    if account not in position_books:
+        position_books[account] = LeaderPositionBook()
+    return position_books[account]
+
+def snapshot_books():
+    return {account: book.snapshot() for account, book in [("default", leader_positions)] + list(position_books.items())}
+
+def restore_books(state):
+    """Leader positions of the previous run, kept until a newer fill or ACCOUNT_UPDATE replaces them"""
+    for account, rows in state.items():
+        book = get_position_book(account)
+        for symbol, ps, qty, tx_time in rows:
+            book.set(symbol, ps, qty, tx_time)
+
+warm_state.register("leader_positions", snapshot_books, restore_books)
+
+def _signed_trade(o):
+    """(cumulative fill, last trade) of an order payload, signed as a change of the position book"""
+    filled, last = float(o["z"] or o["q"]), float(o.get("l") or o["z"] or o["q"])
+    ps, buy = o.get("ps", "BOTH"), o["S"] == "BUY"
+    # Hedge-mode positions are unsigned sizes: opening grows them, one-way (BOTH) buys are positive
+    grows = buy if ps in ("BOTH", "LONG") else not buy
+    return (filled, last) if grows else (-filled, -last)
+
+def apply_partial_fill(o, positions=leader_positions):
+    """Apply a PARTIALLY_FILLED trade to the book, the FILLED event is translated by translate_fill"""
+    filled, last = _signed_trade(o)
+    positions.apply_trade(o["s"], o.get("ps", "BOTH"), filled, last, int(o.get("T") or 0))
+
+def _leg(side, trade_side, reduce_only, qty, delta):
+    return {"side": side, "trade_side": trade_side, "reduce_only": reduce_only, "qty": qty, "delta": delta}
+
+def translate_fill(o, positions=leader_positions, follower_mode=None):
+    """
+    Translate a FILLED ORDER_TRADE_UPDATE order payload into Bitget order legs.
+
+    Works for hedge mode (ps LONG/SHORT) and one-way mode (ps BOTH). In one-way mode open/close is
+    derived from the cached leader position before the fill and the reduce-only flag `R`; a fill that
+    flips the position yields a close leg and an open leg for a hedge-mode follower.
+
+    Each leg is a dict with side, trade_side ('open'/'close'/None), reduce_only, qty (leader units)
+    and delta (change of the follower position in the leader's positionSide terms).
+    Returns (legs, direction) where direction is 'OPEN', 'CLOSE' or 'FLIP'. The last trade is applied
+    to `positions` as a side effect.
+    """
+    follower_mode = follower_mode or BITGET_POSITION_MODE
+    symbol, ps, order_side = o["s"], o.get("ps", "BOTH"), o["S"]
+    qty = float(o["z"] or o["q"])
+    buy = order_side == "BUY"
+    filled, last = _signed_trade(o)
+    # The position before this order, not the book: ACCOUNT_UPDATE may already contain its trades
+    before = positions.apply_trade(symbol, ps, filled, last, int(o.get("T") or 0))
+
+    if ps in ("LONG", "SHORT"):
+        opening = buy if ps == "LONG" else not buy
+        if follower_mode == "one_way":
+            leg = _leg(order_side.lower(), None, not opening, qty, qty if opening else -qty)
+        else:
+            # Bitget hedge mode: side names the position, tradeSide says open or close
+            leg = _leg("buy" if ps == "LONG" else "sell", "open" if opening else "close", False, qty, qty if opening else -qty)
+        return [leg], "OPEN" if opening else "CLOSE"
+
+    # One-way leader: split the fill into the part that reduces the position and the rest
+    signed = qty if buy else -qty
+    reduces = before != 0 and (before > 0) != buy
+    close_qty = min(qty, abs(before)) if reduces else 0.0
+    if o.get("R") and close_qty == 0:
+        # Reduce-only but our cache has no position (e.g. opened before startup): trust the flag
+        close_qty = qty
+    open_qty = 0.0 if o.get("R") else qty - close_qty
+
+    if follower_mode == "one_way":
+        legs = [_leg(order_side.lower(), None, open_qty == 0, qty, signed)]
+    else:
+        legs = []
+        if close_qty > 0:
+            closing_long = before > 0 or (before == 0 and not buy)
+            legs.append(_leg("buy" if closing_long else "sell", "close", False, close_qty, -close_qty if closing_long else close_qty))
+        if open_qty > 0:
+            legs.append(_leg("buy" if buy else "sell", "open", False, open_qty, open_qty if buy else -open_qty))
+    direction = "FLIP" if close_qty and open_qty else ("CLOSE" if close_qty else "OPEN")
+    return legs, direction
+
+def correction_leg(position_side, delta, current=0.0, follower_mode=None):
+    """
+    Order leg that moves the follower position for `position_side` by `delta` (reconciler corrections).
+    `current` is the follower position, signed for BOTH.
+    """
+    follower_mode = follower_mode or BITGET_POSITION_MODE
+    if position_side == "BOTH":
+        if follower_mode == "one_way":
+            return _leg("buy" if delta > 0 else "sell", None, False, abs(delta), delta)
+        if current > 0 and delta < 0:
+            return _leg("buy", "close", False, min(-delta, current), max(delta, -current))
+        if current < 0 and delta > 0:
+            return _leg("sell", "close", False, min(delta, -current), min(delta, -current))
+        return _leg("buy" if delta > 0 else "sell", "open", False, abs(delta), delta)
+    opening = delta > 0
+    if follower_mode == "one_way":
+        buy = opening if position_side == "LONG" else not opening
+        return _leg("buy" if buy else "sell", None, not opening, abs(delta), delta)
+    return _leg("buy" if position_side == "LONG" else "sell", "open" if opening else "close", False, abs(delta), delta)
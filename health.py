@@ -0,0 +1,115 @@
+import os,json,time,threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The server only starts when a port is configured; Railway provides PORT
+HEALTH_PORT = int(os.getenv("HEALTH_PORT") or os.getenv("PORT") or 0)
+HEALTH_CHECK_SECONDS = float(os.getenv("HEALTH_CHECK_SECONDS", "5"))
+# A stream with no frame (message or pong) for this long is considered wedged and reconnected
+STREAM_MAX_LAG_SECONDS = float(os.getenv("STREAM_MAX_LAG_SECONDS", "45"))
+# Client pings keep quiet user data streams producing pongs, so lag is measurable when no fills happen
+STREAM_PING_INTERVAL = float(os.getenv("STREAM_PING_INTERVAL", "15"))
+STREAM_PING_TIMEOUT = float(os.getenv("STREAM_PING_TIMEOUT", "10"))
+
+streams = {}    # name -> {"last_frame", "connected", "reconnect", "reconnects"}
+checks = {}     # name -> fn() returning (ok, details)
+threads = {}    # name -> Thread that must stay alive
+routes = {}     # extra GET paths -> fn(handler, query) returning (status, body)
+
+def register_stream(name, reconnect=None):
+    """(Re)register a stream on connect; `reconnect` is called from the watchdog to force a reconnect"""
+    now = time.monotonic()
+    previous = streams.get(name, {})
+    streams[name] = {"last_frame": now, "connected": now, "reconnect": reconnect, "reconnects": previous.get("reconnects", 0)}
+
+def note_frame(name):
+    stream = streams.get(name)
+    if stream is not None:
+        stream["last_frame"] = time.monotonic()
+
+def register_check(name, fn):
+    checks[name] = fn
+
+def watch_thread(name, thread):
+    threads[name] = thread
+
+def register_route(path, fn):
+    routes[path] = fn
+
+def report():
+    """(healthy, details) over all registered streams, threads and checks"""
+    now = time.monotonic()
+    healthy = True
+    details = {"streams": {}, "threads": {}, "checks": {}}
+    for name, s in list(streams.items()):
+        lag = now - s["last_frame"]
+        ok = lag <= STREAM_MAX_LAG_SECONDS
+        healthy &= ok
+        details["streams"][name] = {"ok": ok, "last_frame_age_s": round(lag, 1), "connected_for_s": round(now - s["connected"], 1),
+                                    "reconnects": s["reconnects"]}
+    for name, t in list(threads.items()):
+        alive = t.is_alive()
+        healthy &= alive
+        details["threads"][name] = alive
+    for name, fn in list(checks.items()):
+        try:
+            ok, info = fn()
+        except Exception as e:
+            ok, info = False, {"error": str(e)}
+        healthy &= bool(ok)
+        details["checks"][name] = dict(info, ok=bool(ok))
+    details["healthy"] = healthy
+    return healthy, details
+
+def _watchdog_loop(shutdown_event):
+    while not shutdown_event.wait(HEALTH_CHECK_SECONDS):
+        now = time.monotonic()
+        for name, s in list(streams.items()):
+            lag = now - s["last_frame"]
+            if lag > STREAM_MAX_LAG_SECONDS and s["reconnect"] is not None:
+                print(f"⚠️ [Health] {name}: no frame for {lag:.0f}s, forcing a reconnect")
+                s["reconnects"] += 1
+                s["last_frame"] = now  # give the new connection a full window before the next attempt
+                try:
+                    s["reconnect"]()
+                except Exception as e:
+                    print(f"[Health] Reconnect of {name} failed: {e}")
+        for name, t in list(threads.items()):
+            if not t.is_alive():
+                print(f"❌ [Health] Thread {name} is not running")
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in routes:
+            status, body = routes[url.path](self, parse_qs(url.query))
+        elif self.path.startswith("/live"):
+            status, body = 200, {"alive": True}
+        elif self.path.startswith("/health") or self.path.startswith("/ready") or self.path == "/":
+            healthy, body = report()
+            status = 200 if healthy else 503
+        else:
+            status, body = 404, {"error": "not found"}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # keep probe requests out of the trade log
+
+def start(shutdown_event, port=HEALTH_PORT):
+    """Start the watchdog and, if a port is configured, the HTTP server (/health, /ready, /live)"""
+    threading.Thread(target=_watchdog_loop, args=(shutdown_event,), name="health-watchdog", daemon=True).start()
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="health-http", daemon=True).start()
+    print(f"[Health] Serving /health on port {port}")
+    return server
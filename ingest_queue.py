@@ -0,0 +1,117 @@
+import os,time,threading,traceback
+from collections import deque
+from dotenv import load_dotenv
+from speculative import is_speculative
+
+load_dotenv()
+
+# Max buffered cosmetic events per stream, events the mirror depends on are never dropped
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "1000"))
+# Cosmetic events older than this are shed instead of processed
+INGEST_MAX_LAG_MS = float(os.getenv("INGEST_MAX_LAG_MS", "2000"))
+
+# Position and balance snapshots, the only feed of the leader position book, equity and reconciler, and listen key expiry
+ACCOUNT_EVENTS = {"ACCOUNT_UPDATE", "outboundAccountPosition", "listenKeyExpired"}
+
+def is_critical(data):
+    """
+    Fills, account snapshots (and listen key expiry) must always be processed, and so must the
+    NEW/cancel events that drive speculative preparation; the rest is only printed
+    """
+    event_type = data.get("e")
+    if event_type == "executionReport":
+        return data.get("x") == "TRADE" or is_speculative(data)
+    if event_type == "ORDER_TRADE_UPDATE":
+        return data.get("o", {}).get("x") == "TRADE" or is_speculative(data)
+    return event_type in ACCOUNT_EVENTS
+
+class IngestQueue:
+    """
+    Bounded buffer between a WebSocket reader and the event processor. Events are served in arrival
+    order, so a leader's fills and account snapshots are applied in the order Binance sent them.
+    Cosmetic events are shed oldest-first when too many are buffered or when they have waited
+    longer than INGEST_MAX_LAG_MS; critical events are never shed.
+    """
+    def __init__(self, name, maxsize=INGEST_QUEUE_SIZE, max_lag_ms=INGEST_MAX_LAG_MS):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_lag = max_lag_ms / 1000
+        self._events = deque()   # (monotonic time received, critical, event)
+        self._cosmetic = 0       # buffered events that may be shed
+        self._cond = threading.Condition()
+        self.shed = 0
+        self.processed = 0
+        self._consumer = None
+
+    def put(self, data):
+        critical = is_critical(data)
+        with self._cond:
+            if not critical:
+                if self._cosmetic >= self.maxsize:
+                    self._shed_oldest_cosmetic()
+                self._cosmetic += 1
+            self._events.append((time.monotonic(), critical, data))
+            self._cond.notify()
+
+    def _shed_oldest_cosmetic(self):
+        for i, (_, critical, _) in enumerate(self._events):
+            if not critical:
+                del self._events[i]
+                self._cosmetic -= 1
+                self.shed += 1
+                return
+
+    def get(self, timeout=None):
+        """Next event in arrival order, skipping cosmetic events that waited too long. Returns None on timeout."""
+        with self._cond:
+            while True:
+                while self._events:
+                    received, critical, data = self._events.popleft()
+                    if critical:
+                        return data
+                    self._cosmetic -= 1
+                    if time.monotonic() - received <= self.max_lag:
+                        return data
+                    self.shed += 1
+                if not self._cond.wait(timeout):
+                    return None
+
+    def depth(self):
+        return len(self._events)
+
+    def oldest_age_ms(self):
+        try:
+            return (time.monotonic() - self._events[0][0]) * 1000
+        except IndexError:
+            return 0.0
+
+    def stats(self):
+        return {"depth": self.depth(), "critical": self.depth() - self._cosmetic, "oldest_age_ms": round(self.oldest_age_ms(), 1),
+                "shed": self.shed, "processed": self.processed}
+
+    def run_consumer(self, handler, shutdown_event):
+        while not shutdown_event.is_set():
+            data = self.get(timeout=1)
+            if data is None:
+                continue
+            try:
+                handler(data)
+            except Exception as e:
+                print(f"[{self.name}] Error processing event {data.get('e')}: {e}")
+                traceback.print_exc()
+            self.processed += 1
+
+    def start_consumer(self, handler, shutdown_event):
+        """Start the consumer thread, once: several streams may feed the same queue"""
+        if self._consumer is None or not self._consumer.is_alive():
+            self._consumer = threading.Thread(target=self.run_consumer, args=(handler, shutdown_event), name=f"{self.name}-consumer", daemon=True)
+            self._consumer.start()
+        return self._consumer
+
+# All ingest queues by stream name, for monitoring
+queues = {}
+
+def get_queue(name):
+    if name not in queues:
+        queues[name] = IngestQueue(name)
+    return queues[name]
@@ -1,31 +1,37 @@
-import os,sys,time,json,logging,traceback,threading,requests,ccxt,websocket,asyncio
+import os,sys,logging,traceback
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich import box
-from future_copier import user_data_ws
-import ctypes
+import future_copier
+from position_sizing import sizer, DEFAULT_ACCOUNT
+from position_reconciler import reconciler
+from order_submission import submit_order, make_client_oid
+from mirror_journal import journal
+from binance_signer import get_signer
+from audit_store import audit
+from book_cache import book_cache
+import slippage_guard
+import bitget_errors
+from routing import router
+from paper_trading import bitget_client, load_markets
+from profiler import hot
+from bounded import LRUSet
+from speculative import speculator
+from pipeline import pipeline, MarketAdapter, Fill, fill_panel
+from stream_manager import leader_accounts
 from logging.handlers import RotatingFileHandler
 import atexit
 import datetime
 
-# Workaround for asyncio/aiodns compatibility on Windows
-if sys.platform.startswith("win"):
-    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
 # Load environment variables from .env file
 load_dotenv()
 
-BINANCE_API_KEY = os.getenv("BINANCE_API_KEY")
-BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET")
-BITGET_API_KEY = os.getenv("BITGET_API_KEY")
-BITGET_API_SECRET = os.getenv("BITGET_API_SECRET")
-BITGET_PASSPHRASE = os.getenv("BITGET_PASSPHRASE")
-
-# Setup logging to both console and file
+# Setup logging to both console and file (sharded workers each get their own LOG_FILE)
+LOG_FILE = os.getenv("LOG_FILE", "log.txt")
 log_formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-log_file_handler = RotatingFileHandler('log.txt', maxBytes=5*1024*1024, backupCount=2, encoding='utf-8')
+log_file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=2, encoding='utf-8')
 log_file_handler.setFormatter(log_formatter)
 log_file_handler.setLevel(logging.INFO)
 
@@ -35,7 +41,7 @@ console_handler.setLevel(logging.INFO)
 
 logging.basicConfig(level=logging.INFO, handlers=[console_handler, log_file_handler])
 
-# Custom Tee class to write to both terminal and log.txt
+# Custom Tee class to write to both terminal and the log file
 class Tee:
     def __init__(self, *files):
         self.files = files
@@ -47,13 +53,13 @@ class Tee:
         for f in self.files:
             f.flush()
 
-# Open log.txt for appending
-log_file = open('log.txt', 'a', encoding='utf-8')
+# Open the log file for appending
+log_file = open(LOG_FILE, 'a', encoding='utf-8')
 import sys
 sys.stdout = Tee(sys.__stdout__, log_file)
 sys.stderr = Tee(sys.__stderr__, log_file)
 
-# On exit, write stop time to log.txt
+# On exit, write stop time to the log file
 def log_stop_time():
     log_file.write(f"\nScript stopped at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     log_file.flush()
@@ -61,130 +67,260 @@ def log_stop_time():
 atexit.register(log_stop_time)
 
 # Symbol mapping (Binance to Bitget format) - dynamic for all available USDT pairs
-bitget = ccxt.bitget({
-    "apiKey": BITGET_API_KEY,
-    "secret": BITGET_API_SECRET,
-    "password": BITGET_PASSPHRASE,
-    'sandboxMode': os.getenv("USE_DEMO", "0") == "1",
-    "enableRateLimit": True,
-})
-bitget_markets = bitget.load_markets()
-
-bitget.set_sandbox_mode(os.getenv("USE_DEMO", "0") == "1")
-SYMBOL_MAP = {symbol.replace('/', ''): symbol for symbol in bitget_markets if symbol.endswith('/USDT')}
+bitget = bitget_client()
+SYMBOL_MAP = {}
+
+def register_spot_markets(exchange):
+    SYMBOL_MAP.update({symbol.replace('/', ''): symbol for symbol in exchange.markets if symbol.endswith('/USDT')})
+    sizer.register_markets(exchange)
+
+bitget_markets = load_markets(bitget, "spot_markets", register_spot_markets)
 
 # Bitget spot client
-bitget_spot = ccxt.bitget({
-    "apiKey": BITGET_API_KEY,
-    "secret": BITGET_API_SECRET,
-    "password": BITGET_PASSPHRASE,
-    "enableRateLimit": True,
-    "options": {"defaultType": "spot"},
-})
+bitget_spot = bitget_client("spot")
+
+console = Console()  # shared by every event, a Console per event costs more than the panel itself
+# Share of the free quote balance kept back for fees when an insufficient-balance buy is resized
+SPOT_RESIZE_FEE_BUFFER = float(os.getenv("SPOT_RESIZE_FEE_BUFFER", "0.002"))
 
-PROCESSED_TRADES_FILE = "processed_trades_ccxt.txt"
-processed_trades = set()
+PROCESSED_TRADES_FILE = os.getenv("PROCESSED_TRADES_FILE", "processed_trades_ccxt.txt")
+# Dedup only needs recent trade ids, replays come from streams and the journal of the last hours
+PROCESSED_TRADES_MAX = int(os.getenv("PROCESSED_TRADES_MAX", "200000"))
+processed_trades = LRUSet(PROCESSED_TRADES_MAX)
+processed_trades_lines = 0
 
 if os.path.exists(PROCESSED_TRADES_FILE):
     with open(PROCESSED_TRADES_FILE, "r") as f:
-        processed_trades = set(line.strip() for line in f if line.strip())
+        for line in f:
+            if line.strip():
+                processed_trades.add(line.strip())
+                processed_trades_lines += 1
+
+def compact_processed_trades():
+    """Rewrite the dedup file with only the ids still held in memory"""
+    global processed_trades_lines
+    tmp_path = PROCESSED_TRADES_FILE + ".tmp"
+    ids = list(processed_trades)
+    with open(tmp_path, "w") as f:
+        f.writelines(f"{trade_id}\n" for trade_id in ids)
+    os.replace(tmp_path, PROCESSED_TRADES_FILE)
+    processed_trades_lines = len(ids)
 
 def save_processed_trade(trade_id):
+    global processed_trades_lines
     processed_trades.add(str(trade_id))
     with open(PROCESSED_TRADES_FILE, "a") as f:
         f.write(f"{trade_id}\n")
+    processed_trades_lines += 1
+    if processed_trades_lines > 2 * PROCESSED_TRADES_MAX:
+        compact_processed_trades()
 
-def place_bitget_order(symbol, side, quantity, price=None):
-    """Place a market order on Bitget to mirror Binance trade using ccxt. Uses real Bitget balance for SELL orders."""
+@hot
+def place_bitget_order(symbol, side, quantity, price=None, client_oid=None, account=DEFAULT_ACCOUNT, market_type="spot", prepared=None):
+    """Place a market order on Bitget to mirror Binance trade using ccxt. Uses real Bitget balance for SELL orders.
+    `client_oid` makes the submission idempotent so timeouts can be retried safely.
+    `prepared` holds values looked up speculatively when the leader order was NEW (see speculative.py).
+    Returns the ccxt order on success, False otherwise."""
     try:
         bitget_symbol = SYMBOL_MAP.get(symbol)
         if not bitget_symbol:
             print(f"❌ No Bitget symbol mapping for {symbol}")
+            bitget_errors.note_failure(client_oid, "no Bitget symbol")
             return False
         side = side.lower()
         params = {}
+        route = router.route(market_type, symbol)
+        inst_id = bitget.market(bitget_symbol)["id"]
+        # Pre-trade slippage check against the cached Bitget book, sells reduce the holding and are never skipped
+        order_type, limit_price, deviation_bps = slippage_guard.decide("SPOT", inst_id, side, price, reduce_only=side == "sell")
+        if order_type == slippage_guard.SKIP:
+            print(f"🚫❌ Bitget {side.upper()} skipped: {bitget_symbol} is {deviation_bps:.1f} bps away from the leader price {price} (max {slippage_guard.MAX_SLIPPAGE_BPS} bps)")
+            bitget_errors.note_failure(client_oid, "slippage guard")
+            return False
+        if order_type == slippage_guard.LIMIT:
+            limit_price = float(bitget.price_to_precision(bitget_symbol, limit_price))
+            params["timeInForce"] = "IOC"
+            print(f"⚠️ {bitget_symbol} is {deviation_bps:.1f} bps away from the leader price, sending IOC limit at {limit_price}")
+        top = book_cache.top("SPOT", inst_id)
         if side == "buy":
             if price is None:
-                # Fetch latest price from Bitget ticker for higher precision
-                ticker = bitget.fetch_ticker(bitget_symbol)
-                price = float(ticker['last'])
-                print(f"⚠️ No price provided for market BUY, using latest Bitget price: {price}")
-            # Buy the same base amount as on Binance
-            amount = float(quantity)
-            params["createMarketBuyOrderRequiresPrice"] = False
+                # Use the cached Bitget ask (or the last known price) instead of a REST ticker round trip
+                price = top[1] if top else sizer.price(bitget_symbol.split("/")[0])
+                print(f"⚠️ No price provided for market BUY, using cached Bitget price: {price}")
+            # Scale the Binance base amount to the follower account
+            amount = sizer.scale(account, market_type, symbol, bitget_symbol, quantity, price, route.multiplier, route.max_notional)
+            if amount <= 0:
+                print(f"🚫❌ Bitget BUY skipped: scaled amount for {quantity} {bitget_symbol} is below the minimum order size.")
+                bitget_errors.note_failure(client_oid, "below the minimum order size")
+                return False
             print(f"[Bitget Debug] Placing BUY order: symbol={bitget_symbol}, amount={amount}, params={params}")
-            order = bitget.create_order(
-                symbol=bitget_symbol,
-                type="market",
-                side=side,
-                amount=amount,  # amount in base currency
-                params=params,
-            )
+            # The price the order is expected to fill at: the limit, else the cached ask
+            order = submit_spot_order(bitget_symbol, order_type, side, amount, limit_price or (top[1] if top else price), params, client_oid)
+            if account == DEFAULT_ACCOUNT and market_type == "spot":
+                if order_type == "market":
+                    reconciler.note_follower_fill("spot", symbol, "BOTH", float(order.get("amount") or amount))
+                else:
+                    reconciler.mark_dirty("spot", symbol)  # an IOC limit may fill partially
         else:
             # For sell, check Bitget balance and only sell up to available
             base_coin = bitget_symbol.split("/")[0]
-            balance = bitget_spot.fetch_balance()
-            available = float(balance[base_coin]["free"]) if base_coin in balance and "free" in balance[base_coin] else 0.0
-            sell_amount = min(float(quantity), available)
+            if prepared is not None and "available" in prepared:
+                available = prepared["available"]
+            else:
+                available = free_spot_balance(base_coin)
+            amount = sizer.scale(account, market_type, symbol, bitget_symbol, quantity, price, route.multiplier, route.max_notional)
+            sell_amount = sizer.round_amount(bitget_symbol, min(amount, available))
             if sell_amount <= 0:
                 print(f"🚫❌ Bitget SELL order failed: No {base_coin} available to sell.")
+                bitget_errors.note_failure(client_oid, f"no {base_coin} available to sell")
                 return False
             print(f"[Bitget Debug] Placing SELL order: symbol={bitget_symbol}, amount={sell_amount}, params={params}")
-            order = bitget.create_order(
-                symbol=bitget_symbol,
-                type="market",
-                side=side,
-                amount=sell_amount,  # amount in base currency
-                params=params,
-            )
-        print(f"✅ Successfully placed {side} order on Bitget for {quantity} {bitget_symbol} at market price")
-        return True
+            order = submit_spot_order(bitget_symbol, order_type, side, sell_amount, limit_price or (top[0] if top else price), params, client_oid)
+            if account == DEFAULT_ACCOUNT and market_type == "spot":
+                if order_type == "market":
+                    reconciler.note_follower_fill("spot", symbol, "BOTH", -float(order.get("amount") or sell_amount))
+                else:
+                    reconciler.mark_dirty("spot", symbol)  # an IOC limit may fill partially
+        print(f"✅ Successfully placed {side} order on Bitget for {order.get('amount') or quantity} {bitget_symbol} at {'market price' if order_type == 'market' else f'IOC limit {limit_price}'}")
+        return order
     except Exception as e:
-        # Check for insufficient balance error
-        err_msg = str(e)
-        if 'Insufficient balance' in err_msg or 'InsufficientFunds' in err_msg or 'code":"43012"' in err_msg:
-            print(f"🚫❌ Bitget order failed: INSUFFICIENT BALANCE for {side.upper()} {quantity} {bitget_symbol}")
-            print(f"   Please check your Bitget account balance and try again.")
+        error = bitget_errors.classify(e)
+        if error.action == bitget_errors.RESIZE:
+            print(f"🚫❌ Bitget order failed: INSUFFICIENT BALANCE for {side.upper()} {quantity} {bitget_symbol} [{bitget_errors.describe(error)}]")
+            print("   Please check your Bitget account balance and try again.")
+        elif error.action == bitget_errors.SKIP:
+            print(f"🚫❌ Bitget {side.upper()} {quantity} {bitget_symbol} not mirrored: {bitget_errors.describe(error)}")
         else:
-            print(f"❌ Bitget order error: {e}")
+            print(f"❌ Bitget order error [{bitget_errors.describe(error)}]: {e}")
             traceback.print_exc()
             if hasattr(e, 'response') and hasattr(e.response, 'text'):
                 print(f"[Bitget Error Response] {e.response.text}")
+        bitget_errors.note_failure(client_oid, bitget_errors.describe(error))
         return False
 
-def handle_pretty_message(msg, market_type="spot"):
-    event_type = msg.get("e")
-    console = Console()
-    if event_type == "executionReport":
-        status = msg.get("X")
-        execution_type = msg.get("x")
+def sent_order(order, amount, price):
+    """Bitget's place-order reply only carries the ids: fill in the amount sent and the expected fill price"""
+    if not order.get("amount"):
+        order["amount"] = amount
+    if not (order.get("average") or order.get("price")):
+        order["price"] = price
+    return order
+
+def submit_spot_order(bitget_symbol, order_type, side, amount, price, params, client_oid):
+    """
+    submit_order on the spot client with the resize recovery: when Bitget reports insufficient
+    balance the order is resent once for what the account can cover, under a derived clientOid.
+    `price` is the limit, or for a market order the price it is expected to fill at. Bitget sizes
+    spot market buys in quote coin: ccxt sends amount * price for them, so buys always carry the price.
+    """
+    order_price = price if order_type == "limit" or side == "buy" else None
+    try:
+        return sent_order(submit_order(bitget, symbol=bitget_symbol, order_type=order_type, side=side, amount=amount,  # amount in base currency
+                                       price=order_price, params=params, client_oid=client_oid), amount, price)
+    except Exception as e:
+        if bitget_errors.classify(e).action != bitget_errors.RESIZE:
+            raise
+        base_coin, quote_coin = bitget_symbol.split("/")
+        if side == "buy":
+            affordable = free_spot_balance(quote_coin) * (1 - SPOT_RESIZE_FEE_BUFFER) / float(price)
+        else:
+            affordable = free_spot_balance(base_coin)
+        resized = sizer.round_amount(bitget_symbol, min(affordable, amount))
+        if resized <= 0 or resized >= amount:
+            raise
+        print(f"⚠️ Insufficient balance for {side.upper()} {amount} {bitget_symbol}, resending for {resized}")
+        return sent_order(submit_order(bitget, symbol=bitget_symbol, order_type=order_type, side=side, amount=resized,
+                                       price=order_price, params=params, client_oid=client_oid and f"{client_oid}R"), resized, price)
+
+def free_spot_balance(base_coin):
+    balance = bitget_spot.fetch_balance()
+    return float(balance[base_coin]["free"]) if base_coin in balance and "free" in balance[base_coin] else 0.0
+
+def prepare_spot_order(msg, account):
+    """Speculative preparation on a leader NEW market order: warm the book, fetch the free balance for sells"""
+    bitget_symbol = SYMBOL_MAP.get(msg.get("s"))
+    if not bitget_symbol:
+        return None
+    book_cache.ensure_subscribed("SPOT", bitget.market(bitget_symbol)["id"])
+    if msg.get("S") == "SELL":
+        return {"available": free_spot_balance(bitget_symbol.split("/")[0])}
+    return {}
+
+speculator.register("spot", prepare_spot_order)
+speculator.register("margin", prepare_spot_order)
+
+class SpotAdapter(MarketAdapter):
+    """Spot and margin leader fills, mirrored as Bitget spot market orders"""
+    name = "spot"
+    markets = ("spot", "margin")
+
+    def normalize(self, msg, account, market):
+        if msg.get("e") != "executionReport":
+            return None
         symbol = msg.get("s")
-        side = msg.get("S")
-        quantity = float(msg.get("q"))
         price = float(msg.get("L") or 0)
+        if price > 0 and symbol in SYMBOL_MAP:
+            sizer.note_price(SYMBOL_MAP[symbol].split("/")[0], price)
+        if msg.get("X") != "FILLED" or msg.get("x") != "TRADE":
+            return None
         trade_id = str(msg.get("t"))
-        if status == "FILLED" and execution_type == "TRADE":
-            if trade_id not in processed_trades:
-                save_processed_trade(trade_id)
-                # Build rich table for pretty output
-                table = Table(show_header=False, box=box.SQUARE, expand=False)
-                table.add_row("[cyan]Symbol", f"[white]{symbol}")
-                table.add_row("[cyan]Side", f"[white]{side}")
-                table.add_row("[cyan]Quantity", f"[white]{quantity}")
-                table.add_row("[cyan]Price", f"[white]{price:,.4f} USDT")
-                table.add_row("[cyan]Total Value", f"[white]{float(quantity) * float(price):,.2f} USDT")
-                table.add_row("[cyan]Trade ID", f"[white]{trade_id}")
-                table.add_row("[cyan]Order Status", f"[white]{status}")
-                panel = Panel(table, title=f"[bold]{side} [blue]{symbol} [green]SPOT[/green]", border_style="green", expand=False)
-                console.print(panel)
-                logging.info(f"🔄 Mirroring trade on Bitget...")
-                result = place_bitget_order(symbol, side, quantity, price)
-                if result:
-                    logging.info(f"✅ Mirrored on Bitget [SPOT]")
-                else:
-                    logging.error(f"❌ Mirror failed on Bitget [SPOT]")
-    elif event_type == "outboundAccountPosition":
+        if account != DEFAULT_ACCOUNT:
+            trade_id = f"{account}:{trade_id}"
+        return Fill(account, market, symbol, msg.get("S"), float(msg.get("q")), price, msg.get("t"), msg.get("i"), msg.get("T"),
+                    make_client_oid(market, symbol, msg.get("t"), account=account), msg, trade_id)
+
+    def is_new(self, fill):
+        return fill.detail not in processed_trades
+
+    def not_mirrored(self, fill):
+        save_processed_trade(fill.detail)
+
+    def render(self, fill):
+        leader = "" if fill.account == DEFAULT_ACCOUNT else f" [magenta]{fill.account}[/magenta]"
+        return fill_panel(f"[bold]{fill.side} [blue]{fill.symbol} [green]{fill.market.upper()}[/green]{leader}", [
+            ("Symbol", fill.symbol),
+            ("Side", fill.side),
+            ("Quantity", fill.qty),
+            ("Price", f"{fill.price:,.4f} USDT"),
+            ("Total Value", f"{fill.qty * fill.price:,.2f} USDT"),
+            ("Trade ID", fill.detail),
+            ("Order Status", fill.data.get("X")),
+        ])
+
+    def execute(self, fill, route, prepared=None):
+        client_oid, market_type, symbol = fill.ref, fill.market, fill.symbol
+        # Journal the intent before marking the trade processed so a crash in between is replayed on restart
+        journal.received(client_oid, "spot", {"symbol": symbol, "side": fill.side, "quantity": fill.qty, "price": fill.price,
+                                               "account": fill.account, "market": market_type})
+        save_processed_trade(fill.detail)
+        logging.info("🔄 Mirroring trade on Bitget...")
+        # Only the default spot leader is reconciled, its balances are the ones baselined at startup
+        reconcile = fill.account == DEFAULT_ACCOUNT and market_type == "spot"
+        if reconcile:
+            reconciler.track("spot", symbol)
+        journal.submitted(client_oid)
+        result = place_bitget_order(symbol, fill.side, fill.qty, fill.price, client_oid=client_oid, account=fill.account, market_type=market_type,
+                                    prepared=prepared)
+        # The amount sent to Bitget, nothing when the order was not placed
+        audit.follower_execution(client_oid, client_oid, market_type, symbol, fill.side, result["amount"] if result else 0.0,
+                                 order=result or None, leader_ts_ms=fill.ts_ms, error=None if result else bitget_errors.failure_reason(client_oid))
+        if result:
+            journal.acked(client_oid)
+            logging.info(f"✅ Mirrored on Bitget [{market_type.upper()}]")
+        else:
+            journal.failed(client_oid)
+            logging.error(f"❌ Mirror failed on Bitget [{market_type.upper()}]")
+            if reconcile:
+                reconciler.mark_dirty("spot", symbol)
+
+    def update(self, msg, account, market_type):
+        if msg.get("e") != "outboundAccountPosition":
+            return
         balances = msg.get("B", [])
+        sizer.update_leader_balances(account, market_type, {b['a']: float(b['f']) + float(b['l']) for b in balances})
+        if account == DEFAULT_ACCOUNT and market_type == "spot":
+            for b in balances:
+                reconciler.update_leader("spot", f"{b['a']}USDT", "BOTH", float(b['f']) + float(b['l']) - spot_baseline_leader.get(b['a'], 0.0))
         table = Table(show_header=True, box=box.SQUARE, expand=False)
         table.add_column("Asset")
         table.add_column("Available")
@@ -193,109 +329,105 @@ def handle_pretty_message(msg, market_type="spot"):
             if available > 0:
                 table.add_row(asset['a'], f"{available}")
         if table.row_count > 0:
-            panel = Panel(table, title="[bold]Account Update - SPOT[/bold]", border_style="blue", expand=False)
+            panel = Panel(table, title=f"[bold]Account Update - {market_type.upper()}[/bold]", border_style="blue", expand=False)
             console.print(panel)
 
-def get_listen_key_spot(api_key, base_url):
-    """Get listen key for spot trading"""
-    url = f"{base_url}/api/v3/userDataStream"
-    headers = {"X-MBX-APIKEY": api_key}
-    response = requests.post(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()["listenKey"]
-    else:
-        print(f"Error getting spot listenKey: {response.status_code} {response.text}")
-        return None
+    def replay(self, client_oid, payload):
+        return replay_spot_intent(client_oid, payload)
 
-shutdown_event = threading.Event()
-
-def keepalive_listen_key_spot(api_key, listen_key, base_url):
-    """Keep spot listen key alive"""
-    url = f"{base_url}/api/v3/userDataStream"
-    headers = {"X-MBX-APIKEY": api_key}
-    while not shutdown_event.is_set():
-        try:
-            requests.put(url, headers=headers, params={"listenKey": listen_key})
-        except Exception as e:
-            print(f"Error keeping spot listenKey alive: {e}")
-        # Wait up to 30 minutes, but exit early if shutdown_event is set
-        for _ in range(30 * 60):
-            if shutdown_event.is_set():
-                break
-            time.sleep(1)
-
-def start_binance_spot_ws():
-    """Standard WebSocket implementation for Binance spot trading"""
-    base_url = "https://api.binance.com"
-    ws_base = "wss://stream.binance.com:9443/ws/"
-    
-    # Get listen key for spot trading
-    listen_key = get_listen_key_spot(BINANCE_API_KEY, base_url)
-    if not listen_key:
-        print("[Spot WS] Could not get listenKey, aborting spot monitor.")
-        return
-    
-    ws_url = ws_base + listen_key
-    print(f"[Spot WS] Connecting to {ws_url}")
-    
-    # Start keepalive thread
-    def keepalive():
-        keepalive_listen_key_spot(BINANCE_API_KEY, listen_key, base_url)
-    threading.Thread(target=keepalive, daemon=True).start()
-    
-    # Start WebSocket connection
-    start_spot_ws(listen_key, ws_url, label="SPOT")
-
-def start_spot_ws(listen_key, ws_url, label):
-    """Start spot WebSocket connection with reconnection logic"""
-    def _on_message(ws, message):
-        on_spot_message(ws, message, label)
-    def _on_error(ws, error):
-        print(f"[{label}] WebSocket error: {error}")
-    def _on_close(ws, close_status_code, close_msg):
-        print(f"[{label}] WebSocket closed: {close_status_code} {close_msg}")
-    def _on_open(ws):
-        print(f"[{label}] WebSocket connection opened. Listening for real-time {label} trade/account events...")
-    backoff = 2
-    max_backoff = 60
-    while not shutdown_event.is_set():
-        ws = websocket.WebSocketApp(ws_url,
-                                    on_message=_on_message,
-                                    on_error=_on_error,
-                                    on_close=_on_close,
-                                    on_open=_on_open)
-        try:
-            ws.run_forever()
-        except Exception as e:
-            print(f"[{label}] WebSocket run_forever() error: {e}")
-        if shutdown_event.is_set():
-            break
-        print(f"[{label}] WebSocket disconnected. Reconnecting in {backoff} seconds...")
-        for _ in range(backoff):
-            if shutdown_event.is_set():
-                break
-            time.sleep(1)
-        backoff = min(backoff * 2, max_backoff)
-
-def on_spot_message(ws, message, label):
-    """Handle spot WebSocket messages"""
+    def seed(self):
+        seed_spot_equity()
+
+def get_spot_account_balances(account=DEFAULT_ACCOUNT):
+    """Fetch the full spot balance snapshot {asset: free+locked} for a leader account"""
+    snapshot = get_signer(account, "spot").request("GET", "/api/v3/account", {"omitZeroBalances": "true"})
+    return {b['asset']: float(b['free']) + float(b['locked']) for b in snapshot.get("balances", [])}
+
+def get_margin_account_balances(account=DEFAULT_ACCOUNT):
+    """Fetch the cross margin balance snapshot {asset: free+locked} for a leader account, as its account events report it"""
+    snapshot = get_signer(account, "spot").request("GET", "/sapi/v1/margin/account")
+    return {b['asset']: float(b['free']) + float(b['locked']) for b in snapshot.get("userAssets", []) if float(b['free']) + float(b['locked'])}
+
+# Spot balances at startup. Spot holdings that predate the bot are not mirrored, so the
+# reconciler compares balance changes since startup rather than absolute balances.
+spot_baseline_leader = {}
+spot_baseline_follower = {}
+spot_baseline_fixed = False
+
+def set_spot_baseline(leader, follower):
+    """Use a baseline taken elsewhere (the sharded supervisor) instead of the one seed_spot_equity takes"""
+    global spot_baseline_fixed
+    spot_baseline_leader.update(leader)
+    spot_baseline_follower.update(follower)
+    spot_baseline_fixed = True
+
+def seed_spot_equity():
+    """One-off snapshot of the follower's and every spot/margin leader's equity, the account streams keep it current afterwards"""
     try:
-        data = json.loads(message)
-        handle_pretty_message(data, market_type="spot")
+        sizer.set_prices_from_tickers(bitget_spot.fetch_tickers())
+        follower = {a: float(q or 0) for a, q in bitget_spot.fetch_balance().get("total", {}).items()}
+        sizer.update_follower_balances("spot", follower, replace=True)
+        if not spot_baseline_fixed:
+            spot_baseline_follower.update(follower)
     except Exception as e:
-        print(f"[{label}] Error processing message: {e}")
+        print(f"[Sizing] Could not seed the follower's spot equity: {e}")
+    for market_type, fetch in (("spot", get_spot_account_balances), ("margin", get_margin_account_balances)):
+        for account in leader_accounts(market_type):
+            try:
+                leader = fetch(account)
+                sizer.update_leader_balances(account, market_type, leader, replace=True)
+                if account == DEFAULT_ACCOUNT and market_type == "spot" and not spot_baseline_fixed:
+                    spot_baseline_leader.update(leader)
+                print(f"[Sizing] {market_type.capitalize()} equity ratio of {account}: {sizer.equity_ratio(account, market_type)}")
+            except Exception as e:
+                print(f"[Sizing] Could not seed the {market_type} equity of {account}: {e}")
 
-# --- Main entry point (SPOT ONLY) ---
-if __name__ == "__main__":
-    print("[Main] Binance to Bitget CopyTrading New Bot (SPOT and FUTURE) is running. Press Ctrl+C to exit.")
-    # ctypes.windll.kernel32.SetThreadExecutionState(0x80000002)
-    t_spot = threading.Thread(target=start_binance_spot_ws, daemon=True)
-    t_spot.start()
-    print(["Debug:"],BINANCE_API_KEY, BITGET_API_KEY, BITGET_API_SECRET, BITGET_PASSPHRASE)
+def fetch_follower_spot(symbol, position_side):
+    """Follower base-asset balance change since startup, used by the reconciler"""
+    base_coin = SYMBOL_MAP[symbol].split("/")[0]
+    total = float(bitget_spot.fetch_balance().get("total", {}).get(base_coin) or 0)
+    return total - spot_baseline_follower.get(base_coin, 0.0)
+
+def leader_spot_change(symbol, position_side):
+    """Leader base-asset balance change since startup, the reconciler's leader quantity for spot"""
+    base_coin = SYMBOL_MAP[symbol].split("/")[0]
+    return sizer.leader_balance(DEFAULT_ACCOUNT, "spot", base_coin) - spot_baseline_leader.get(base_coin, 0.0)
+
+def correct_spot_drift(symbol, position_side, delta, follower_qty, client_oid):
+    """Send a corrective spot market order of `delta` base units (already in follower size)"""
+    bitget_symbol = SYMBOL_MAP[symbol]
+    amount = sizer.round_amount(bitget_symbol, abs(delta))
+    if amount <= 0:
+        return False
+    side = "buy" if delta > 0 else "sell"
+    # ccxt turns a market buy of `amount` base units into its quote cost with the price
+    price = sizer.price(bitget_symbol.split("/")[0]) if side == "buy" else None
+    if side == "buy" and not price:
+        print(f"❌ [Reconcile] No price for {bitget_symbol}, corrective buy not sent")
+        return False
     try:
-        import future_copier
-        asyncio.run(future_copier.user_data_ws(shutdown_event))
-    except KeyboardInterrupt:
-        print("[Main] Exiting...")
-        shutdown_event.set()
-        sys.exit(0)
\ No newline at end of file
+        submit_order(bitget, symbol=bitget_symbol, order_type="market", side=side, amount=amount, price=price, client_oid=client_oid)
+        return True
+    except Exception as e:
+        print(f"❌ [Reconcile] Corrective {side} {amount} {bitget_symbol} failed: {e}")
+        return False
+
+reconciler.register_market(
+    "spot",
+    fetch_follower=fetch_follower_spot,
+    correct=correct_spot_drift,
+    price=lambda symbol: sizer.price(SYMBOL_MAP[symbol].split("/")[0]) if symbol in SYMBOL_MAP else None,
+    leader=leader_spot_change,
+    bitget_symbol=SYMBOL_MAP.get,
+)
+
+def replay_spot_intent(client_oid, payload):
+    """Replay a journaled spot intent, the clientOid makes this a no-op if the order already landed"""
+    return place_bitget_order(payload["symbol"], payload["side"], payload["quantity"], payload["price"], client_oid=client_oid,
+                              account=payload.get("account", DEFAULT_ACCOUNT), market_type=payload.get("market", "spot"))
+
+pipeline.register(SpotAdapter())
+
+if __name__ == "__main__":
+    # Same as `python -m mirror`, kept for existing deployments
+    sys.exit(pipeline.run())
@@ -0,0 +1,17 @@
+"""
+Entry point of the bot: `python -m mirror` runs it in one process, `python -m mirror --sharded` runs
+the sharded deployment (see sharded.py). `python main.py` still starts the single-process bot.
+"""
+import sys
+
+def run(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--sharded" in argv:
+        import sharded
+        return sharded.main()
+    import main, future_copier  # register the spot/margin and USD-M adapters
+    from pipeline import pipeline
+    return pipeline.run()
+
+if __name__ == "__main__":
+    sys.exit(run())
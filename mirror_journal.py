@@ -0,0 +1,163 @@
+import os,json,time,threading,atexit,traceback
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MIRROR_JOURNAL_FILE = os.getenv("MIRROR_JOURNAL_FILE", "mirror_journal.jsonl")
+# Records written within this window share one fsync
+JOURNAL_FSYNC_MS = float(os.getenv("JOURNAL_FSYNC_MS", "5"))
+# Past this size the journal is compacted to its unfinished intents while running
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(16 * 1024 * 1024)))
+# Unfinished intents older than this are marked failed at startup instead of replayed into a moved market
+JOURNAL_MAX_REPLAY_AGE_SECONDS = float(os.getenv("JOURNAL_MAX_REPLAY_AGE_SECONDS", "300"))
+
+RECEIVED = "received"
+SUBMITTED = "submitted"
+ACKED = "acked"
+FAILED = "failed"
+TERMINAL_STATES = {ACKED, FAILED}
+
+class MirrorJournal:
+    """
+    Append-only journal of mirror intents. Each line is one state transition of an intent, keyed by
+    the intent's clientOid, so a replay after a crash is resolved by Bitget instead of double-filling.
+    Writes are buffered and fsync'ed in batches by a background thread. `received` waits for its
+    batch to reach the disk, so an intent is durable before the trade is marked processed.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._synced_cond = threading.Condition(self._lock)
+        self._seq = 0       # records written
+        self._synced = 0    # records fsync'ed
+        self._dirty = threading.Event()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def record(self, intent_id, state, **fields):
+        line = json.dumps({"id": intent_id, "state": state, "ts": time.time(), **fields}, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._seq += 1
+            seq = self._seq
+        self._dirty.set()
+        return seq
+
+    def wait_durable(self, seq, timeout=1.0):
+        """Block until record `seq` is fsync'ed by the flusher's group commit, or fsync inline after `timeout`"""
+        with self._lock:
+            if self._synced_cond.wait_for(lambda: self._synced >= seq, timeout):
+                return
+        self.flush()
+
+    def received(self, intent_id, market, payload):
+        self.wait_durable(self.record(intent_id, RECEIVED, market=market, payload=payload))
+
+    def submitted(self, intent_id):
+        self.record(intent_id, SUBMITTED)
+
+    def acked(self, intent_id):
+        self.record(intent_id, ACKED)
+
+    def failed(self, intent_id, reason=""):
+        self.record(intent_id, FAILED, reason=str(reason)[:200])
+
+    def flush(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            seq = self._seq
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._synced = seq
+            self._synced_cond.notify_all()
+
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            # Let concurrent writers pile into the same fsync
+            time.sleep(JOURNAL_FSYNC_MS / 1000)
+            self._dirty.clear()
+            try:
+                self.flush()
+                if self._file.tell() > JOURNAL_COMPACT_BYTES:
+                    self._compact(None)
+            except Exception as e:
+                print(f"[Journal] fsync failed: {e}")
+
+    def _load_unfinished(self):
+        intents = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                if "payload" in rec:
+                    # A received record, or a compacted one carrying its latest state
+                    intents[rec["id"]] = rec
+                elif rec["id"] in intents:
+                    if rec["state"] in TERMINAL_STATES:
+                        del intents[rec["id"]]
+                    else:
+                        intents[rec["id"]]["state"] = rec["state"]
+        return list(intents.values())
+
+    def _compact(self, unfinished):
+        """
+        Rewrite the journal with only the unfinished intents so it doesn't grow forever. With
+        `unfinished` None they are read from the file under the lock, so no concurrent record is lost.
+        """
+        with self._lock:
+            if unfinished is None:
+                self._file.flush()
+                unfinished = self._load_unfinished()
+            self._file.close()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for rec in unfinished:
+                    f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._synced = self._seq
+            self._synced_cond.notify_all()
+
+    def recover(self, replay_handlers):
+        """
+        Replay every intent without a terminal state. `replay_handlers` maps market -> fn(intent_id, payload)
+        returning True when the mirror succeeded. Intents older than JOURNAL_MAX_REPLAY_AGE_SECONDS
+        are marked failed instead, the leader's fill is stale by then.
+        """
+        self.flush()
+        unfinished = self._load_unfinished()
+        self._compact(unfinished)
+        if not unfinished:
+            return 0
+        print(f"[Journal] Recovering {len(unfinished)} unfinished mirror intent(s)...")
+        for rec in unfinished:
+            age = time.time() - rec.get("ts", 0)
+            if age > JOURNAL_MAX_REPLAY_AGE_SECONDS:
+                print(f"⚠️ [Journal] Not replaying {rec['id']}, received {age:.0f}s ago")
+                self.failed(rec["id"], f"too old to replay ({age:.0f}s)")
+                continue
+            handler = replay_handlers.get(rec.get("market"))
+            if handler is None:
+                self.failed(rec["id"], f"no replay handler for market {rec.get('market')}")
+                continue
+            try:
+                ok = handler(rec["id"], rec["payload"])
+            except Exception:
+                traceback.print_exc()
+                ok = False
+            if ok:
+                self.acked(rec["id"])
+            else:
+                self.failed(rec["id"], "replay failed")
+        self.flush()
+        return len(unfinished)
+
+journal = MirrorJournal(MIRROR_JOURNAL_FILE)
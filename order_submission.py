@@ -0,0 +1,167 @@
+import os,time,random
+import ccxt
+from dotenv import load_dotenv
+from position_sizing import DEFAULT_ACCOUNT
+from bitget_ws_trade import trade_socket, ORDER_TRANSPORT
+import bitget_errors
+
+load_dotenv()
+
+ORDER_MAX_RETRIES = int(os.getenv("ORDER_MAX_RETRIES", "3"))
+ORDER_RETRY_BASE_MS = float(os.getenv("ORDER_RETRY_BASE_MS", "50"))
+ORDER_RETRY_MAX_MS = float(os.getenv("ORDER_RETRY_MAX_MS", "1000"))
+
+# transport -> [acked orders, total ack latency in ms], to compare ORDER_TRANSPORT settings
+transport_stats = {"rest": [0, 0.0], "ws": [0, 0.0]}
+
+def _record_latency(transport, started):
+    stats = transport_stats[transport]
+    stats[0] += 1
+    stats[1] += (time.perf_counter() - started) * 1000
+
+def average_latency_ms(transport):
+    count, total = transport_stats[transport]
+    return total / count if count else None
+
+def make_client_oid(market, symbol, trade_id, leg=0, account=DEFAULT_ACCOUNT):
+    """
+    Deterministic Bitget clientOid for a mirrored leader fill. Binance trade IDs are only unique per
+    symbol (and account), so both are part of the ID. `leg` distinguishes several follower orders for one fill.
+    """
+    client_oid = f"bb{market[0]}{symbol}{trade_id}"
+    if account != DEFAULT_ACCOUNT:
+        client_oid = f"{account[:12]}-{client_oid}"
+    return f"{client_oid}L{leg}" if leg else client_oid
+
+def find_order_by_client_oid(exchange, symbol, client_oid):
+    """Look an order up by clientOid, returns None if Bitget does not know it (or can't be reached)"""
+    try:
+        return exchange.fetch_order(None, symbol, params={"clientOid": client_oid})
+    except ccxt.OrderNotFound:
+        return None
+    except Exception as e:
+        print(f"⚠️ [Order] Could not resolve clientOid {client_oid}: {e}")
+        return None
+
+def _backoff(attempt):
+    delay_ms = min(ORDER_RETRY_BASE_MS * (2 ** attempt), ORDER_RETRY_MAX_MS)
+    time.sleep(random.uniform(delay_ms / 2, delay_ms) / 1000)
+
+def submit_order(exchange, symbol, order_type, side, amount, price=None, params=None, client_oid=None):
+    """
+    create_order with a clientOid and safe retries. Failures are classified (bitget_errors): only
+    transient ones are retried, everything else is raised at once for the caller to act on. When the
+    outcome is unknown (timeout, dropped connection) the order is first resolved by clientOid and
+    only resent if Bitget never saw it, so a retry can't double-fill. Bitget also rejects a reused
+    clientOid, which is resolved the same way. Without a clientOid nothing can resolve an unknown
+    outcome, so it is raised instead of retried.
+    """
+    params = dict(params or {})
+    if client_oid:
+        params["clientOid"] = client_oid
+    if ORDER_TRANSPORT == "ws" and trade_socket.ready.is_set() and not getattr(exchange, "paper", False):
+        started = time.perf_counter()
+        try:
+            order = trade_socket.place_order(exchange, symbol, order_type, side, amount, price, params)
+            _record_latency("ws", started)
+            return order
+        except ccxt.NetworkError as e:
+            if not client_oid:
+                raise
+            # Outcome unknown: the REST path below resends with the same clientOid, which Bitget dedupes
+            print(f"⚠️ [Order] Trade socket failed ({e}), falling back to REST")
+        except ccxt.ExchangeError as e:
+            if not (client_oid and bitget_errors.classify(e).action == bitget_errors.RESOLVE):
+                raise
+            order = find_order_by_client_oid(exchange, symbol, client_oid)
+            if order:
+                return order
+            raise
+    attempt = 0
+    while True:
+        try:
+            started = time.perf_counter()
+            order = exchange.create_order(symbol=symbol, type=order_type, side=side, amount=amount, price=price, params=params)
+            _record_latency("rest", started)
+            return order
+        except ccxt.BaseError as e:
+            error = bitget_errors.classify(e)
+            if error.action == bitget_errors.RESOLVE and client_oid:
+                order = find_order_by_client_oid(exchange, symbol, client_oid)
+                if order:
+                    return order
+                raise
+            if error.action != bitget_errors.RETRY:
+                raise
+            # A rate limit rejects the request outright, anything else may have reached Bitget
+            if isinstance(e, ccxt.NetworkError) and not isinstance(e, (ccxt.DDoSProtection, ccxt.RateLimitExceeded)):
+                if not client_oid:
+                    raise
+                order = find_order_by_client_oid(exchange, symbol, client_oid)
+                if order:
+                    print(f"✅ [Order] {client_oid} landed despite '{type(e).__name__}', not resending")
+                    return order
+            if attempt >= ORDER_MAX_RETRIES:
+                raise
+            print(f"⚠️ [Order] {bitget_errors.describe(error)} on {side} {amount} {symbol}, retry {attempt + 1}/{ORDER_MAX_RETRIES}")
+            _backoff(attempt)
+            attempt += 1
+
+def _batch_client_oid(order):
+    return order.get("clientOrderId") or (order.get("info") or {}).get("clientOid")
+
+def submit_orders(exchange, symbol, orders, resize=None):
+    """
+    Send several orders of one symbol in one request (Bitget batch place-order through ccxt
+    create_orders). `orders` are dicts with order_type, side, amount, price, params and client_oid,
+    every one with a clientOid: results come back per clientOid and are returned in input order, an
+    order dict or None for a rejected order. If the batch outcome is unknown the orders are resolved
+    by clientOid, and anything Bitget never saw is resent one by one through submit_order.
+    `resize(order)` is the amount to resend an order rejected for insufficient balance or position
+    with (0 gives up), under a derived clientOid.
+    """
+    requests = []
+    for o in orders:
+        params = dict(o.get("params") or {}, clientOid=o["client_oid"])
+        requests.append({"symbol": symbol, "type": o["order_type"], "side": o["side"], "amount": o["amount"], "price": o.get("price"), "params": params})
+    started = time.perf_counter()
+    try:
+        results = {_batch_client_oid(r): r for r in exchange.create_orders(requests)}
+        _record_latency("rest", started)
+    except (ccxt.NetworkError, ccxt.ExchangeError) as e:
+        print(f"⚠️ [Order] Batch of {len(orders)} {symbol} orders failed ({type(e).__name__}: {e}), sending them one by one")
+        results = {}
+    placed = []
+    for o in orders:
+        result = results.get(o["client_oid"])
+        if result is not None and result.get("status") != "rejected":
+            placed.append(result)
+            continue
+        if result is not None:
+            info = result.get("info") or {}
+            error = bitget_errors.classify_code(str(info.get("errorCode") or ""), info.get("errorMsg"))
+            if error.action not in (bitget_errors.RESOLVE, bitget_errors.RETRY):
+                print(f"❌ [Order] {o['client_oid']} rejected in batch: {bitget_errors.describe(error)}")
+                placed.append(_resend_resized(exchange, symbol, o, error, resize))
+                continue
+        # Unknown outcome, transient rejection or a duplicate clientOid: submit_order resolves by clientOid before resending
+        try:
+            placed.append(submit_order(exchange, symbol, o["order_type"], o["side"], o["amount"], o.get("price"), o.get("params"), o["client_oid"]))
+        except Exception as e:
+            print(f"❌ [Order] {o['client_oid']} failed: {e}")
+            placed.append(_resend_resized(exchange, symbol, o, bitget_errors.classify(e), resize))
+    return placed
+
+def _resend_resized(exchange, symbol, order, error, resize):
+    """submit_orders recovery of a failed order: resend it for the resized amount, else record the failure. Returns the order or None."""
+    amount = resize(order) if resize and error.action == bitget_errors.RESIZE else 0
+    if not 0 < amount < order["amount"]:
+        bitget_errors.note_failure(order["client_oid"], bitget_errors.describe(error))
+        return None
+    print(f"⚠️ [Order] {order['client_oid']}: {bitget_errors.describe(error)}, resending for {amount} instead of {order['amount']}")
+    try:
+        return submit_order(exchange, symbol, order["order_type"], order["side"], amount, order.get("price"), order.get("params"), f"{order['client_oid']}R")
+    except Exception as e:
+        print(f"❌ [Order] {order['client_oid']}R failed: {e}")
+        bitget_errors.note_failure(order["client_oid"], bitget_errors.describe(bitget_errors.classify(e)))
+        return None
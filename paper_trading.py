@@ -0,0 +1,280 @@
+import os,time,random,threading,itertools
+import ccxt
+from dotenv import load_dotenv
+from book_cache import book_cache
+from bounded import LRUDict
+from bitget_errors import error_code
+from clock_sync import clock
+from warm_state import warm_state
+
+load_dotenv()
+
+BITGET_API_KEY = os.getenv("BITGET_API_KEY")
+BITGET_API_SECRET = os.getenv("BITGET_API_SECRET")
+BITGET_PASSPHRASE = os.getenv("BITGET_PASSPHRASE")
+
+# PAPER_TRADING=1 keeps every Bitget order local: fills are simulated against the cached Bitget book
+PAPER_TRADING = os.getenv("PAPER_TRADING", "0") == "1"
+PAPER_LATENCY_MS = float(os.getenv("PAPER_LATENCY_MS", "40"))         # simulated order round trip
+PAPER_LATENCY_JITTER_MS = float(os.getenv("PAPER_LATENCY_JITTER_MS", "20"))
+PAPER_FEE_BPS = float(os.getenv("PAPER_FEE_BPS", "10"))
+PAPER_SPOT_BALANCES = os.getenv("PAPER_SPOT_BALANCES", "USDT=10000")     # "USDT=10000,BTC=0.1"
+PAPER_FUTURES_USDT = float(os.getenv("PAPER_FUTURES_USDT", "10000"))
+PAPER_ORDERS_MAX = int(os.getenv("PAPER_ORDERS_MAX", "10000"))        # simulated orders kept for fetch_order
+
+def _parse_balances(value):
+    balances = {}
+    for item in value.split(","):
+        if "=" in item:
+            asset, qty = item.split("=", 1)
+            balances[asset.strip().upper()] = float(qty)
+    return balances
+
+class PaperAccount:
+    """Simulated follower account shared by every paper client: spot balances, USDT-M positions and orders"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spot = _parse_balances(PAPER_SPOT_BALANCES)
+        self.futures_usdt = PAPER_FUTURES_USDT
+        self.positions = {}     # (symbol, 'long' | 'short') -> [contracts, entry price]
+        self.leverage = {}      # symbol -> leverage
+        self.orders = LRUDict(PAPER_ORDERS_MAX)         # order id -> ccxt order dict
+        self.by_client_oid = LRUDict(PAPER_ORDERS_MAX)
+        self._ids = itertools.count(int(time.time() * 1000))
+
+    def next_id(self):
+        return str(next(self._ids))
+
+paper_account = PaperAccount()
+
+class PaperExchange:
+    """
+    Stand-in for a private ccxt.bitget client. Public data (markets, precision, tickers) comes from
+    the wrapped client; orders, balances and positions are simulated in `paper_account`, so the
+    mirroring code runs unchanged without touching the real account.
+    """
+    paper = True
+
+    def __init__(self, exchange, account=paper_account):
+        self._exchange = exchange
+        self.account = account
+
+    def __getattr__(self, name):
+        return getattr(self._exchange, name)
+
+    @property
+    def _default_type(self):
+        return self._exchange.options.get("defaultType", "spot")
+
+    # --- Prices ---
+
+    def _fill_price(self, market, side):
+        inst_type = "SPOT" if market["spot"] else "USDT-FUTURES"
+        book_cache.ensure_subscribed(inst_type, market["id"])
+        top = book_cache.top(inst_type, market["id"])
+        if top is not None:
+            return top[1] if side == "buy" else top[0]
+        ticker = self._exchange.fetch_ticker(market["symbol"])
+        return float((ticker.get("ask") if side == "buy" else ticker.get("bid")) or ticker["last"])
+
+    # --- Orders ---
+
+    def _round_trip(self):
+        delay = PAPER_LATENCY_MS + random.uniform(0, PAPER_LATENCY_JITTER_MS)
+        time.sleep(delay / 1000)
+        return delay
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        return self._place(symbol, type, side, amount, price, params, self._round_trip())
+
+    def create_orders(self, orders, params=None):
+        """Batch place-order: one simulated round trip, rejected orders come back like Bitget's failureList"""
+        delay = self._round_trip()
+        results = []
+        for o in orders:
+            try:
+                results.append(self._place(o["symbol"], o["type"], o["side"], o["amount"], o.get("price"), o.get("params"), delay))
+            except ccxt.ExchangeError as e:
+                client_oid = (o.get("params") or {}).get("clientOid")
+                results.append({"id": None, "clientOrderId": None, "status": "rejected",
+                                "info": {"clientOid": client_oid, "errorCode": error_code(e), "errorMsg": str(e)}})
+        return results
+
+    def _place(self, symbol, type, side, amount, price, params, delay):
+        params = params or {}
+        market = self._exchange.market(symbol)
+        client_oid = params.get("clientOid")
+        acct = self.account
+        amount = float(amount)
+        # Hedge-mode closes name the position side, the trade itself goes the other way
+        taker_side = side if params.get("tradeSide") != "close" else ("sell" if side == "buy" else "buy")
+        # Priced before taking the account lock, a ticker fallback is a REST round trip
+        fill_price = self._fill_price(market, taker_side)
+        if market["spot"] and type == "market" and side == "buy":
+            # Bitget fills spot market buys by quote cost, which ccxt sends as amount * price
+            if params.get("createMarketBuyOrderRequiresPrice", True) is False:
+                cost = amount
+            elif price is None:
+                raise ccxt.InvalidOrder("bitget createOrder() requires the price argument for market buy orders on spot markets")
+            else:
+                cost = amount * float(price)
+            amount = cost / fill_price
+        with acct.lock:
+            if client_oid and client_oid in acct.by_client_oid:
+                raise ccxt.DuplicateOrderId(f'bitget {{"code":"40786","msg":"Duplicate clientOid {client_oid}"}}')
+            crosses = type == "market" or (taker_side == "buy" and fill_price <= float(price)) or (taker_side == "sell" and fill_price >= float(price))
+            filled = amount if crosses else 0.0
+            if filled and market["spot"]:
+                self._fill_spot(market, side, filled, fill_price)
+            elif filled:
+                self._fill_futures(market, side, filled, fill_price, params)
+            order_id = acct.next_id()
+            order = {"id": order_id, "clientOrderId": client_oid, "symbol": symbol, "type": type, "side": side,
+                     "amount": amount, "price": float(price) if price else fill_price, "average": fill_price if filled else None,
+                     "filled": filled, "remaining": amount - filled, "cost": filled * fill_price,
+                     "status": "closed" if filled else "canceled", "timestamp": int(time.time() * 1000),
+                     "fee": {"currency": market["quote"], "cost": filled * fill_price * PAPER_FEE_BPS / 10000},
+                     "info": {"orderId": order_id, "clientOid": client_oid, "paper": True, "tradeSide": params.get("tradeSide", "-"),
+                              "marginMode": params.get("marginMode", "-"), "leverage": acct.leverage.get(symbol, "-")}}
+            acct.orders[order_id] = order
+            if client_oid:
+                acct.by_client_oid[client_oid] = order
+        print(f"[Paper] {side.upper()} {filled}/{amount} {symbol} @ {fill_price} ({type}, {delay:.0f} ms)")
+        return dict(order)
+
+    def _fill_spot(self, market, side, qty, price):
+        balances = self.account.spot
+        cost = qty * price
+        fee = cost * PAPER_FEE_BPS / 10000
+        if side == "buy":
+            if balances.get(market["quote"], 0.0) < cost + fee:
+                raise ccxt.InsufficientFunds('bitget {"code":"43012","msg":"Insufficient balance"}')
+            balances[market["quote"]] -= cost + fee
+            balances[market["base"]] = balances.get(market["base"], 0.0) + qty
+        else:
+            if balances.get(market["base"], 0.0) < qty:
+                raise ccxt.InsufficientFunds('bitget {"code":"43012","msg":"Insufficient balance"}')
+            balances[market["base"]] -= qty
+            balances[market["quote"]] = balances.get(market["quote"], 0.0) + cost - fee
+
+    def _fill_futures(self, market, side, qty, price, params):
+        acct = self.account
+        symbol = market["symbol"]
+        trade_side = params.get("tradeSide")
+        if trade_side:
+            # Hedge mode: side names the position, tradeSide opens or closes it
+            pos_side = "long" if side == "buy" else "short"
+            closing = trade_side == "close"
+        else:
+            # One-way mode: a fill against the open position reduces it first
+            long_qty = acct.positions.get((symbol, "long"), [0.0, 0.0])[0]
+            short_qty = acct.positions.get((symbol, "short"), [0.0, 0.0])[0]
+            closing = (side == "sell" and long_qty > 0) or (side == "buy" and short_qty > 0)
+            pos_side = ("long" if side == "sell" else "short") if closing else ("long" if side == "buy" else "short")
+            if params.get("reduceOnly") and not closing:
+                raise ccxt.InvalidOrder('bitget {"code":"22002","msg":"No position to close"}')
+        if closing and acct.positions.get((symbol, pos_side), [0.0])[0] <= 0:
+            raise ccxt.InvalidOrder('bitget {"code":"22002","msg":"No position to close"}')
+        acct.futures_usdt -= qty * price * PAPER_FEE_BPS / 10000
+        position = acct.positions.setdefault((symbol, pos_side), [0.0, 0.0])
+        if closing:
+            closed = min(qty, position[0])
+            pnl = (price - position[1]) * closed * (1 if pos_side == "long" else -1)
+            acct.futures_usdt += pnl
+            position[0] -= closed
+            if position[0] <= 0:
+                acct.positions.pop((symbol, pos_side), None)
+        else:
+            position[1] = (position[0] * position[1] + qty * price) / (position[0] + qty)
+            position[0] += qty
+
+    def fetch_order(self, id, symbol=None, params=None):
+        params = params or {}
+        with self.account.lock:
+            order = self.account.orders.get(id) if id else self.account.by_client_oid.get(params.get("clientOid"))
+        if order is None:
+            raise ccxt.OrderNotFound(f"bitget paper order {id or params.get('clientOid')} not found")
+        return dict(order)
+
+    def cancel_order(self, id, symbol=None, params=None):
+        return self.fetch_order(id, symbol, params)  # paper orders are filled or canceled immediately
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        return []
+
+    def set_leverage(self, leverage, symbol=None, params=None):
+        self.account.leverage[symbol] = int(leverage)
+        return {"leverage": int(leverage), "symbol": symbol}
+
+    def set_margin_mode(self, marginMode, symbol=None, params=None):
+        return {"marginMode": marginMode, "symbol": symbol}
+
+    # --- Account ---
+
+    def fetch_balance(self, params=None):
+        acct = self.account
+        with acct.lock:
+            if self._default_type == "spot":
+                totals = dict(acct.spot)
+            else:
+                unrealized = 0.0
+                for (symbol, side), (qty, entry) in acct.positions.items():
+                    top = book_cache.top("USDT-FUTURES", self._exchange.market(symbol)["id"])
+                    if top is not None:
+                        unrealized += ((top[0] + top[1]) / 2 - entry) * qty * (1 if side == "long" else -1)
+                totals = {"USDT": acct.futures_usdt + unrealized}
+        balance = {"info": {"paper": True}, "free": dict(totals), "used": {a: 0.0 for a in totals}, "total": dict(totals)}
+        for asset, qty in totals.items():
+            balance[asset] = {"free": qty, "used": 0.0, "total": qty}
+        return balance
+
+    def fetch_positions(self, symbols=None, params=None):
+        with self.account.lock:
+            return [{"symbol": symbol, "side": side, "contracts": qty, "entryPrice": entry, "leverage": self.account.leverage.get(symbol),
+                     "info": {"paper": True}}
+                    for (symbol, side), (qty, entry) in self.account.positions.items() if not symbols or symbol in symbols]
+
+def bitget_client(default_type=None):
+    """
+    Private Bitget ccxt client for the follower account. USE_DEMO=1 switches to Bitget's demo
+    environment, PAPER_TRADING=1 returns a PaperExchange that never sends orders.
+    """
+    config = {
+        "apiKey": BITGET_API_KEY,
+        "secret": BITGET_API_SECRET,
+        "password": BITGET_PASSPHRASE,
+        "enableRateLimit": True,
+    }
+    if default_type:
+        config["options"] = {"defaultType": default_type}
+    exchange = ccxt.bitget(config)
+    exchange.set_sandbox_mode(os.getenv("USE_DEMO", "0") == "1")
+    # ccxt signs with its own clock minus timeDifference, keep that on the synced Bitget clock
+    clock.on_sync("bitget", lambda c: exchange.options.__setitem__("timeDifference", c.wall_difference_ms("bitget")))
+    if PAPER_TRADING:
+        return PaperExchange(exchange)
+    return exchange
+
+def load_markets(exchange, name, on_load=None):
+    """
+    Markets of `exchange`, restored from the warm-state snapshot and refreshed from Bitget in the
+    background, or loaded from Bitget when there is no snapshot. `on_load(exchange)` runs with the
+    markets in place and again after every refresh, for tables derived from them.
+    """
+    def refresh():
+        try:
+            exchange.load_markets(reload=True)
+            if on_load:
+                on_load(exchange)
+        except Exception as e:
+            print(f"[Markets] Refresh of {name} failed, keeping the snapshot: {e}")
+
+    restored = warm_state.register(name, lambda: exchange.markets, exchange.set_markets)
+    if not restored:
+        exchange.load_markets()
+    if on_load:
+        on_load(exchange)
+    if restored:
+        threading.Thread(target=refresh, name=f"{name}-refresh", daemon=True).start()
+    return exchange.markets
+
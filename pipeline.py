@@ -0,0 +1,240 @@
+"""
+Mirroring core shared by every market: ingest -> normalize -> route -> size -> execute -> confirm.
+
+Leader events come in through one StreamManager and one ingest queue per adapter; the consumer runs
+them through the stages below. What differs between markets lives in a MarketAdapter: SpotAdapter
+(main.py, spot and margin) and FuturesAdapter (future_copier.py, USD-M). Startup, health checks,
+journal recovery, speculation and routing are done here once for all of them.
+"""
+import os,sys,time,threading
+from collections import namedtuple
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from rich import box
+from position_sizing import DEFAULT_ACCOUNT, SIZING_MODE
+from position_reconciler import reconciler
+from order_submission import average_latency_ms, transport_stats
+from mirror_journal import journal
+from ingest_queue import get_queue, queues, INGEST_MAX_LAG_MS
+from stream_manager import StreamManager, LEADERS
+from bitget_ws_trade import trade_socket, ORDER_TRANSPORT
+from audit_store import audit
+from book_cache import book_cache
+from routing import router
+from speculative import speculator
+from clock_sync import clock
+from warm_state import warm_state
+from paper_trading import PAPER_TRADING
+import health, profiler
+from profiler import hot
+
+load_dotenv()
+
+# KEEP_AWAKE=1 keeps Windows from going to sleep while the bot runs
+KEEP_AWAKE = os.getenv("KEEP_AWAKE", "0") == "1"
+
+console = Console()
+
+# A completed leader fill. `ref` is the base clientOid of its follower orders, `detail` is adapter specific.
+Fill = namedtuple("Fill", "account market symbol side qty price trade_id order_id ts_ms ref data detail")
+
+def fill_panel(title, rows, border_style="green"):
+    """Panel of (label, value) rows, the console rendering of every mirrored fill"""
+    table = Table(show_header=False, box=box.SQUARE, expand=False)
+    for label, value in rows:
+        table.add_row(f"[cyan]{label}", f"[white]{value}")
+    return Panel(table, title=title, border_style=border_style, expand=False)
+
+class MarketAdapter:
+    """
+    The market-specific stages. `name` keys the ingest queue, the journal and the routing target,
+    `markets` are the Binance user data streams the adapter mirrors.
+    """
+    name = None
+    markets = ()
+
+    def normalize(self, data, account, market):
+        """Fill for a completed leader fill, None for any other event"""
+        return None
+
+    def update(self, data, account, market):
+        """Bookkeeping events that are not fills: balances, positions"""
+
+    def is_new(self, fill):
+        """Dedup, False for a fill that was already mirrored"""
+        return True
+
+    def not_mirrored(self, fill):
+        """Called for a fill the routing table excludes or sends to another adapter"""
+
+    def render(self, fill):
+        """Panel printed for the fill, or None"""
+        return None
+
+    def execute(self, fill, route, prepared=None):
+        """Size, submit and confirm (journal, audit, reconciler) the follower orders of a fill"""
+        raise NotImplementedError
+
+    def execute_routed(self, fill, route):
+        """Mirror a fill of another market that the routing table sends here, journaled before it returns"""
+        raise NotImplementedError
+
+    def replay(self, client_oid, payload):
+        """Resend a journaled intent that was not confirmed before a restart"""
+        raise NotImplementedError
+
+    def seed(self):
+        """One-off snapshots at startup (equity, leader positions)"""
+
+    def stats(self):
+        return {}
+
+class Pipeline:
+    def __init__(self):
+        self.adapters = {}      # Binance market -> adapter
+        self.shutdown_event = threading.Event()
+
+    def register(self, adapter):
+        for market in adapter.markets:
+            self.adapters[market] = adapter
+
+    def unique_adapters(self):
+        return list({a.name: a for a in self.adapters.values()}.values())
+
+    # --- Stages ---
+
+    def enqueue(self, data, account, market):
+        """Ingest: StreamManager handler, tags the event with its leader pipeline and queues it for its adapter"""
+        data["_account"] = account
+        data["_market"] = market
+        get_queue(self.adapters[market].name.upper()).put(data)
+
+    @hot
+    def handle(self, data):
+        """Consumer: take one queued event through the stages of its market adapter"""
+        account = data.get("_account", DEFAULT_ACCOUNT)
+        market = data.get("_market", "spot")
+        adapter = self.adapters[market]
+        speculator.on_event(market, data, account)
+        fill = adapter.normalize(data, account, market)
+        if fill is None:
+            adapter.update(data, account, market)
+            return
+        if not adapter.is_new(fill):
+            return
+        route = router.route(market, fill.symbol)
+        if not route.enabled:
+            adapter.not_mirrored(fill)
+            console.print(f"[yellow]{fill.symbol} {market} is excluded by the routing table, not mirrored.[/yellow]")
+            return
+        audit.leader_fill(fill.ref, fill.ts_ms or clock.now_ms("binance"), account, market, fill.symbol, fill.side, fill.qty, fill.price, fill.trade_id)
+        if route.target != adapter.name:
+            console.print(f"🔄 Routing {market.upper()} {fill.side} {fill.qty} {fill.symbol} to Bitget {route.target}...")
+            self.adapters[route.target].execute_routed(fill, route)
+            # Processed only once the target adapter journaled the routed order, a crash before is mirrored again
+            adapter.not_mirrored(fill)
+            return
+        prepared = speculator.take(market, account, fill.order_id, fill.symbol)
+        panel = adapter.render(fill)
+        if panel is not None and prepared is None:
+            console.print(panel)
+        adapter.execute(fill, route, prepared)
+        if panel is not None and prepared is not None:
+            console.print(panel)  # rendered after the orders are out when the fill was prepared
+
+    # --- Health ---
+
+    def queue_health(self):
+        stats = {name: q.stats() for name, q in list(queues.items())}
+        return all(st["oldest_age_ms"] <= INGEST_MAX_LAG_MS for st in stats.values()), stats
+
+    def bitget_health(self):
+        """Bitget sockets and order ack latency; the trade socket only matters when it carries orders"""
+        info = {"trade_socket": trade_socket.ready.is_set(), "book_feed": book_cache.connected.is_set(),
+                "avg_ack_ms": {t: round(average_latency_ms(t) or 0, 1) for t in transport_stats}}
+        for adapter in self.unique_adapters():
+            info.update(adapter.stats())
+        return ORDER_TRANSPORT != "ws" or info["trade_socket"], info
+
+    # --- Startup ---
+
+    def start(self, port=health.HEALTH_PORT):
+        """Start every service and the consumers of all adapters; the leader streams are started separately"""
+        if not PAPER_TRADING and (ORDER_TRANSPORT == "ws" or SIZING_MODE == "equity"):
+            # Order transport and/or live follower equity for the sizer
+            trade_socket.start(self.shutdown_event)
+            trade_socket.ready.wait(5)
+        clock.start(self.shutdown_event)
+        book_cache.start(self.shutdown_event)
+        router.start(self.shutdown_event)
+        health.register_check("queues", self.queue_health)
+        health.register_check("bitget", self.bitget_health)
+        health.register_check("clock", clock.health)
+        health.register_check("warm_state", warm_state.health)
+        health.register_check("speculative", lambda: (True, speculator.stats()))
+        health.start(self.shutdown_event, port=port)
+        profiler.install()
+        adapters = self.unique_adapters()
+        replays = {adapter.name: adapter.replay for adapter in adapters}
+        if warm_state.restored:
+            # Mirror on the restored state right away, the seeds refresh it in the background
+            journal.recover(replays)
+            self._start_consumers(adapters)
+            threading.Thread(target=self._seed, args=(adapters,), name="warm-reconcile", daemon=True).start()
+        else:
+            # Replayed intents are sized too: recover once the seeds have set the equity ratios
+            self._seed(adapters)
+            journal.recover(replays)
+            self._start_consumers(adapters)
+        warm_state.start(self.shutdown_event)
+
+    def _start_consumers(self, adapters):
+        for adapter in adapters:
+            queue = get_queue(adapter.name.upper())
+            health.watch_thread(f"{queue.name}-consumer", queue.start_consumer(self.handle, self.shutdown_event))
+
+    def _seed(self, adapters):
+        """Startup snapshots, then the reconciler: it compares against the seeded balances and positions"""
+        started = time.monotonic()
+        for adapter in adapters:
+            adapter.seed()
+        reconciler.start(self.shutdown_event)
+        if warm_state.restored:
+            print(f"[WarmState] Delta reconcile with Bitget and Binance done in {time.monotonic() - started:.1f}s")
+
+    def start_streams(self, leaders=None):
+        """Run the user data streams of every leader market an adapter is registered for"""
+        manager = StreamManager(self.shutdown_event)
+        for market in self.adapters:
+            manager.register_handler(market, self.enqueue)
+        for leader in (leaders or LEADERS).values():
+            for market in leader.get("markets", ["spot"]):
+                if market in self.adapters:
+                    manager.add_pipeline(leader["name"], market, leader["api_key"])
+        manager.start()
+        return manager
+
+    def run(self):
+        """Single-process bot: all services and all leader streams, until Ctrl+C"""
+        print("[Main] Binance to Bitget CopyTrading New Bot (SPOT and FUTURE) is running. Press Ctrl+C to exit.")
+        keep_awake()
+        if PAPER_TRADING:
+            print("[Main] PAPER TRADING: orders are simulated against the Bitget book, nothing is sent to Bitget")
+        self.start()
+        self.start_streams()
+        try:
+            while not self.shutdown_event.wait(1):
+                pass
+        except KeyboardInterrupt:
+            print("[Main] Exiting...")
+            self.shutdown_event.set()
+        return 0
+
+def keep_awake():
+    if KEEP_AWAKE and sys.platform.startswith("win"):
+        import ctypes
+        ctypes.windll.kernel32.SetThreadExecutionState(0x80000002)  # ES_CONTINUOUS | ES_SYSTEM_REQUIRED
+
+pipeline = Pipeline()
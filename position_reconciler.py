@@ -0,0 +1,201 @@
+import os,time,threading,traceback
+from collections import OrderedDict
+from dotenv import load_dotenv
+from position_sizing import sizer, DEFAULT_ACCOUNT
+from order_submission import make_client_oid
+from routing import router
+from warm_state import warm_state
+
+load_dotenv()
+
+# "off" disables the loop, "report" only logs drift, "correct" also sends corrective orders
+RECONCILE_MODE = os.getenv("RECONCILE_MODE", "report").lower()
+RECONCILE_INTERVAL = float(os.getenv("RECONCILE_INTERVAL", "10"))  # seconds between passes
+RECONCILE_SYMBOLS_PER_PASS = int(os.getenv("RECONCILE_SYMBOLS_PER_PASS", "5"))
+RECONCILE_DRIFT_PCT = float(os.getenv("RECONCILE_DRIFT_PCT", "0.05"))  # relative to the target size
+RECONCILE_MIN_NOTIONAL = float(os.getenv("RECONCILE_MIN_NOTIONAL", "6"))  # USDT, Bitget rejects tiny orders anyway
+RECONCILE_FOLLOWER_TTL = float(os.getenv("RECONCILE_FOLLOWER_TTL", "60"))  # seconds a cached follower position is trusted
+
+class PositionReconciler:
+    """
+    Compares leader positions (fed from the Binance streams) with follower positions on Bitget and
+    corrects drift. Only symbols marked dirty are checked each pass, plus a small round-robin slice
+    of the tracked symbols, so a pass never sweeps the whole account.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._markets = {}            # market -> {"fetch", "correct", "price", "leader", "bitget_symbol", "persist"}, see register_market
+        self._leader = {}             # (market, symbol, ps) -> leader qty
+        self._follower = {}           # (market, symbol, ps) -> (follower qty, monotonic time cached)
+        self._dirty = OrderedDict()   # (market, symbol, ps) -> monotonic time the key became dirty
+        self._tracked = []            # keys eligible for the round-robin slice
+        self._cursor = 0
+        self._restored = {}           # market -> [[symbol, ps, leader qty]] from the warm-state snapshot
+        self.last_correction_ms = None
+        self.max_correction_ms = 0.0
+        self.corrections = 0
+
+    def register_market(self, market, fetch_follower, correct, price, leader, bitget_symbol, persist=False):
+        """
+        fetch_follower(symbol, ps) returns the Bitget position, correct(symbol, ps, delta, follower_qty,
+        client_oid) sends a corrective order, price(symbol) is the last price, leader(symbol, ps) the
+        current leader quantity (read when a symbol starts being tracked) and bitget_symbol(symbol)
+        maps to the Bitget symbol for sizing. `persist` keeps the market's tracked positions across
+        restarts. Only for markets whose leader quantities are absolute, spot tracks balance changes
+        since startup.
+        """
+        self._markets[market] = {"fetch": fetch_follower, "correct": correct, "price": price, "leader": leader,
+                                 "bitget_symbol": bitget_symbol, "persist": persist}
+        if persist:
+            # Restored positions are checked against Bitget first, the delta since the last run
+            for symbol, position_side, qty in self._restored.pop(market, []):
+                self.track(market, symbol, position_side)
+                self.update_leader(market, symbol, position_side, qty)
+
+    # --- Warm state ---
+
+    def snapshot(self):
+        state = {}
+        with self._lock:
+            for key in self._tracked:
+                if self._markets.get(key[0], {}).get("persist"):
+                    state.setdefault(key[0], []).append([key[1], key[2], self._leader.get(key, 0.0)])
+        return state
+
+    def restore(self, state):
+        self._restored = state
+
+    # --- Feeds from the mirroring paths ---
+
+    def track(self, market, symbol, position_side="BOTH"):
+        """
+        Start reconciling a symbol. Its leader quantity is read from the market's leader feed, the
+        position may predate tracking and account updates before the first fill are not seen here.
+        """
+        key = (market, symbol, position_side)
+        with self._lock:
+            if key in self._tracked:
+                return
+        qty = None
+        try:
+            qty = self._markets[market]["leader"](symbol, position_side)
+        except Exception as e:
+            print(f"[Reconcile] Could not read the leader position of {market} {symbol} {position_side}: {e}")
+        with self._lock:
+            if key not in self._leader:
+                if qty is None:
+                    return  # tracked once the leader position is known, rather than reconciled towards 0
+                self._leader[key] = qty
+            if key not in self._tracked:
+                self._tracked.append(key)
+
+    def update_leader(self, market, symbol, position_side, qty):
+        key = (market, symbol, position_side)
+        with self._lock:
+            if key not in self._tracked:
+                return
+            if self._leader.get(key) != qty:
+                self._leader[key] = qty
+                self._dirty.setdefault(key, time.monotonic())
+
+    def note_follower_fill(self, market, symbol, position_side, delta):
+        """Apply an acknowledged follower order to the cached position instead of refetching it"""
+        key = (market, symbol, position_side)
+        with self._lock:
+            cached = self._follower.get(key)
+            if cached is not None:
+                qty = cached[0] + delta
+                # Hedge-mode legs are unsigned sizes, one-way (BOTH) positions are signed
+                self._follower[key] = (qty if position_side == "BOTH" else max(qty, 0.0), cached[1])
+
+    def mark_dirty(self, market, symbol, position_side="BOTH", refetch=True):
+        key = (market, symbol, position_side)
+        with self._lock:
+            self._dirty.setdefault(key, time.monotonic())
+            if refetch:
+                self._follower.pop(key, None)
+
+    # --- Loop ---
+
+    def _next_batch(self):
+        with self._lock:
+            batch = []
+            while self._dirty and len(batch) < RECONCILE_SYMBOLS_PER_PASS:
+                batch.append(self._dirty.popitem(last=False))
+            if self._tracked and len(batch) < RECONCILE_SYMBOLS_PER_PASS:
+                key = self._tracked[self._cursor % len(self._tracked)]
+                self._cursor += 1
+                if all(key != k for k, _ in batch):
+                    batch.append((key, time.monotonic()))
+            return batch
+
+    def _follower_qty(self, key):
+        cached = self._follower.get(key)
+        if cached is not None and time.monotonic() - cached[1] < RECONCILE_FOLLOWER_TTL:
+            return cached[0]
+        qty = self._markets[key[0]]["fetch"](key[1], key[2])
+        with self._lock:
+            self._follower[key] = (qty, time.monotonic())
+        return qty
+
+    def _target_qty(self, market, symbol, leader_qty, route):
+        """Follower size for the leader position: ratio and multipliers only, the notional caps limit single orders"""
+        amount = sizer.scale_position(DEFAULT_ACCOUNT, market, self._markets[market]["bitget_symbol"](symbol), abs(leader_qty), route.multiplier)
+        if amount is None:
+            return None
+        return amount if leader_qty >= 0 else -amount
+
+    def check(self, key, dirty_since):
+        market, symbol, position_side = key
+        adapter = self._markets.get(market)
+        if adapter is None:
+            return
+        route = router.route(market, symbol)
+        if not route.enabled:
+            return  # excluded by the routing table, not mirrored so not reconciled either
+        price = adapter["price"](symbol) or 0.0
+        follower_qty = self._follower_qty(key)
+        target_qty = self._target_qty(market, symbol, self._leader.get(key, 0.0), route)
+        if target_qty is None:
+            return  # equity mode without an equity ratio yet, the leader can't be scaled
+        delta = target_qty - follower_qty
+        if abs(delta) * price < RECONCILE_MIN_NOTIONAL:
+            return
+        if target_qty and abs(delta) / abs(target_qty) < RECONCILE_DRIFT_PCT:
+            return
+        print(f"⚠️ [Reconcile] {market} {symbol} {position_side} drift: leader target {target_qty:.6f}, follower {follower_qty:.6f}, delta {delta:+.6f}")
+        if RECONCILE_MODE != "correct":
+            return
+        # One clientOid per correction, so submit_order's retries can't send it twice
+        client_oid = make_client_oid(market, symbol, f"RC{position_side[0]}{int(time.time() * 1000)}")
+        if adapter["correct"](symbol, position_side, delta, follower_qty, client_oid):
+            latency_ms = (time.monotonic() - dirty_since) * 1000
+            self.last_correction_ms = latency_ms
+            self.max_correction_ms = max(self.max_correction_ms, latency_ms)
+            self.corrections += 1
+            with self._lock:
+                # The corrective order may have been capped or rounded, refetch on the next check
+                self._follower.pop(key, None)
+            print(f"✅ [Reconcile] Corrected {market} {symbol} {position_side} by {delta:+.6f} in {latency_ms:.0f} ms")
+        else:
+            self.mark_dirty(market, symbol, position_side)
+
+    def run(self, shutdown_event):
+        if RECONCILE_MODE == "off":
+            return
+        print(f"[Reconcile] Running every {RECONCILE_INTERVAL}s in '{RECONCILE_MODE}' mode")
+        while not shutdown_event.wait(RECONCILE_INTERVAL):
+            for key, dirty_since in self._next_batch():
+                try:
+                    self.check(key, dirty_since)
+                except Exception as e:
+                    print(f"[Reconcile] Error checking {key}: {e}")
+                    traceback.print_exc()
+
+    def start(self, shutdown_event):
+        t = threading.Thread(target=self.run, args=(shutdown_event,), daemon=True)
+        t.start()
+        return t
+
+reconciler = PositionReconciler()
+warm_state.register("reconciler", reconciler.snapshot, reconciler.restore)
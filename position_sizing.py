@@ -0,0 +1,206 @@
+import os,threading
+from decimal import Decimal, ROUND_DOWN
+from dotenv import load_dotenv
+from warm_state import warm_state
+
+load_dotenv()
+
+# "mirror" copies the leader quantity as-is, "equity" scales it by follower/leader equity
+SIZING_MODE = os.getenv("SIZING_MODE", "mirror").lower()
+SIZING_MULTIPLIER = float(os.getenv("SIZING_MULTIPLIER", "1"))
+# Upper bound on the equity ratio so a bad balance snapshot can't blow up order sizes
+SIZING_MAX_RATIO = float(os.getenv("SIZING_MAX_RATIO", "10"))
+# Max follower notional per order in USDT, 0 disables the cap
+SIZING_MAX_NOTIONAL = float(os.getenv("SIZING_MAX_NOTIONAL", "0"))
+
+def _parse_symbol_caps(raw):
+    """Parse 'BTCUSDT=0.05,ETHUSDT=1' into {'BTCUSDT': 0.05, 'ETHUSDT': 1.0}"""
+    caps = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        symbol, value = item.split("=", 1)
+        caps[symbol.strip().upper()] = float(value)
+    return caps
+
+# Max follower quantity per Binance symbol
+SIZING_SYMBOL_CAPS = _parse_symbol_caps(os.getenv("SIZING_SYMBOL_CAPS", ""))
+
+STABLE_ASSETS = {"USDT", "USDC", "FDUSD", "BUSD"}
+
+# Account name used for the single leader configured through BINANCE_API_KEY
+DEFAULT_ACCOUNT = "default"
+
+# Bitget balances that back each leader market (margin fills are mirrored on Bitget spot)
+FOLLOWER_MARKETS = {"spot": "spot", "margin": "spot", "futures": "futures"}
+
+class PositionSizer:
+    """
+    Keeps a cached follower/leader equity ratio per (account, market) and turns leader fill
+    quantities into Bitget order amounts. Equity is fed from the account streams, so scale()
+    never touches the network.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leader_balances = {}    # (account, market) -> {asset: qty}
+        self._follower_balances = {}  # market -> {asset: qty}
+        self._ratios = {}             # (account, market) -> float
+        self._allocations = {}        # account -> share of the follower equity, see set_allocations
+        self._prices = {}             # asset -> last USDT price
+        self._steps = {}              # bitget symbol -> Decimal amount step
+        self._min_amounts = {}        # bitget symbol -> float
+
+    # --- Precision table ---
+
+    def register_markets(self, exchange):
+        """Build the amount precision table from an exchange whose markets are already loaded"""
+        import ccxt
+        tick_size = exchange.precisionMode == ccxt.TICK_SIZE
+        for symbol, market in (exchange.markets or {}).items():
+            precision = (market.get("precision") or {}).get("amount")
+            if precision is None:
+                continue
+            step = Decimal(str(precision)) if tick_size else Decimal(1).scaleb(-int(precision))
+            self._steps[symbol] = step
+            min_amount = ((market.get("limits") or {}).get("amount") or {}).get("min")
+            if min_amount:
+                self._min_amounts[symbol] = float(min_amount)
+
+    def round_amount(self, bitget_symbol, amount):
+        """Round an amount down to the Bitget step size, returns 0.0 below the minimum"""
+        step = self._steps.get(bitget_symbol)
+        if step is None or step <= 0:
+            return float(amount)
+        rounded = float((Decimal(str(amount)) / step).to_integral_value(rounding=ROUND_DOWN) * step)
+        if rounded < self._min_amounts.get(bitget_symbol, 0.0):
+            return 0.0
+        return rounded
+
+    # --- Equity feeds ---
+
+    def note_price(self, asset, price):
+        price = float(price or 0)
+        if price > 0:
+            self._prices[asset] = price
+
+    def price(self, asset):
+        return self._prices.get(asset)
+
+    def set_prices_from_tickers(self, tickers):
+        """Seed asset prices from a ccxt fetch_tickers() result"""
+        for symbol, ticker in tickers.items():
+            if symbol.endswith("/USDT") and ticker.get("last"):
+                self.note_price(symbol.split("/")[0], ticker["last"])
+
+    def update_leader_balances(self, account, market, balances, replace=False):
+        """
+        Apply leader balances {asset: qty}. Binance account events only carry the assets that
+        changed, so by default this merges into the cached snapshot.
+        """
+        with self._lock:
+            key = (account, market)
+            cached = {} if replace else dict(self._leader_balances.get(key, {}))
+            cached.update(balances)
+            self._leader_balances[key] = cached
+            self._recompute(key)
+
+    def update_follower_balances(self, market, balances, replace=False):
+        with self._lock:
+            cached = {} if replace else dict(self._follower_balances.get(market, {}))
+            cached.update(balances)
+            self._follower_balances[market] = cached
+            for key in list(self._leader_balances):
+                if FOLLOWER_MARKETS.get(key[1], key[1]) == market:
+                    self._recompute(key)
+
+    def _equity(self, balances):
+        total = 0.0
+        for asset, qty in balances.items():
+            if asset in STABLE_ASSETS:
+                total += qty
+            else:
+                total += qty * self._prices.get(asset, 0.0)
+        return total
+
+    def set_allocations(self, leaders):
+        """
+        Split the follower equity between the leaders: each leader is sized against its
+        "allocation" (share of the follower account, leaders.json), leaders without one split what
+        is left equally. A single leader gets all of it.
+        """
+        fixed = {name: float(leader["allocation"]) for name, leader in leaders.items() if leader.get("allocation") is not None}
+        rest = [name for name in leaders if name not in fixed]
+        share = max(1.0 - sum(fixed.values()), 0.0) / len(rest) if rest else 0.0
+        with self._lock:
+            self._allocations = {**{name: share for name in rest}, **fixed}
+            for key in list(self._leader_balances):
+                self._recompute(key)
+
+    def _recompute(self, key):
+        leader = self._equity(self._leader_balances.get(key, {}))
+        follower = self._equity(self._follower_balances.get(FOLLOWER_MARKETS.get(key[1], key[1]), {})) * self._allocations.get(key[0], 1.0)
+        if leader > 0 and follower > 0:
+            self._ratios[key] = min(follower / leader, SIZING_MAX_RATIO)
+
+    def leader_balance(self, account, market, asset):
+        return self._leader_balances.get((account, market), {}).get(asset, 0.0)
+
+    def equity_ratio(self, account, market):
+        return self._ratios.get((account, market))
+
+    # --- Warm state ---
+
+    def snapshot(self):
+        with self._lock:
+            return {"leader": [[account, market, balances] for (account, market), balances in self._leader_balances.items()],
+                    "follower": dict(self._follower_balances), "prices": dict(self._prices)}
+
+    def restore(self, state):
+        """Balances and prices of the previous run; the startup seeds replace them with fresh snapshots"""
+        with self._lock:
+            self._prices.update(state["prices"])
+            self._follower_balances.update(state["follower"])
+            for account, market, balances in state["leader"]:
+                self._leader_balances[(account, market)] = balances
+                self._recompute((account, market))
+
+    # --- Hot path ---
+
+    def scale(self, account, market, binance_symbol, bitget_symbol, quantity, price=None, multiplier=1.0, max_notional=0):
+        """
+        Convert a leader fill quantity into a precision-rounded Bitget amount. `multiplier` and
+        `max_notional` are per-symbol routing overrides on top of the global settings.
+        Returns 0.0 when the scaled amount falls below Bitget's minimum, and in equity mode until
+        both equities of the leader are known: the raw leader quantity may be far off the follower's size.
+        """
+        amount = float(quantity) * SIZING_MULTIPLIER * multiplier
+        if SIZING_MODE == "equity":
+            ratio = self._ratios.get((account, market))
+            if ratio is None:
+                print(f"⚠️ [Sizing] No equity ratio yet for {account}/{market}, not mirroring {quantity} {binance_symbol}")
+                return 0.0
+            amount *= ratio
+        cap = SIZING_SYMBOL_CAPS.get(binance_symbol)
+        if cap is not None:
+            amount = min(amount, cap)
+        if SIZING_MAX_NOTIONAL > 0 and price:
+            amount = min(amount, SIZING_MAX_NOTIONAL / float(price))
+        if max_notional and price:
+            amount = min(amount, max_notional / float(price))
+        return self.round_amount(bitget_symbol, amount)
+
+    def scale_position(self, account, market, bitget_symbol, quantity, multiplier=1.0):
+        """
+        Follower size of a whole leader position: the ratio and multipliers of scale() without its
+        per-order notional caps. None in equity mode until the equity ratio is known.
+        """
+        amount = float(quantity) * SIZING_MULTIPLIER * multiplier
+        if SIZING_MODE == "equity":
+            ratio = self._ratios.get((account, market))
+            if ratio is None:
+                return None
+            amount *= ratio
+        return self.round_amount(bitget_symbol, amount)
+
+sizer = PositionSizer()
+warm_state.register("sizing", sizer.snapshot, sizer.restore)
@@ -0,0 +1,144 @@
+import os,io,time,signal,pstats,cProfile,functools,threading,tracemalloc,datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SECONDS = float(os.getenv("PROFILE_SECONDS", "30"))
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "1"))  # profile every Nth call of a hot function
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
+
+class Capture:
+    """One time-boxed profiling window: merged cProfile stats of sampled hot calls plus wall times"""
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.stats = None
+        self.calls = {}     # function name -> [calls seen, calls profiled, total wall ms, max wall ms]
+
+    def add(self, name, profile, wall_ms):
+        with self.lock:
+            c = self.calls.setdefault(name, [0, 0, 0.0, 0.0])
+            c[2] += wall_ms
+            c[3] = max(c[3], wall_ms)
+            if profile is not None:
+                try:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+                    c[1] += 1
+                except TypeError:
+                    pass  # the profile recorded nothing
+
+_capture = None
+_capture_lock = threading.Lock()
+# cProfile is one profiler per interpreter on Python 3.12+ (sys.monitoring): only one call is profiled at a time
+_profiler_lock = threading.Lock()
+
+def hot(fn):
+    """
+    Mark a hot-path function. Outside a capture this costs one global lookup; during one every call
+    is timed and every PROFILE_SAMPLE_EVERY-th call runs under its own cProfile.Profile (cProfile
+    only sees the calling thread, so profiles are per call and merged afterwards). Only one call in
+    the process is profiled at a time, as Python 3.12+ rejects a second active profiler: calls on
+    other threads and hot calls nested in a profiled one are only timed. A profiler error never
+    keeps the wrapped call from running.
+    """
+    name = fn.__qualname__
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        capture = _capture
+        if capture is None:
+            return fn(*args, **kwargs)
+        with capture.lock:
+            entry = capture.calls.setdefault(name, [0, 0, 0.0, 0.0])
+            entry[0] += 1
+            sampled = entry[0] % PROFILE_SAMPLE_EVERY == 0
+        profile = None
+        if sampled and _profiler_lock.acquire(blocking=False):
+            try:
+                profile = cProfile.Profile()
+                profile.enable()
+            except ValueError as e:
+                # Another profiling tool is active (a debugger, coverage, an external profiler)
+                print(f"[Profile] Not profiling {name}: {e}")
+                profile = None
+                _profiler_lock.release()
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            if profile is not None:
+                profile.disable()
+                _profiler_lock.release()
+            try:
+                capture.add(name, profile, wall_ms)
+            except Exception as e:
+                print(f"[Profile] Could not record {name}: {e}")
+    return wrapper
+
+def run_capture(seconds=PROFILE_SECONDS):
+    """Profile the hot functions for `seconds` and write the results to PROFILE_DIR. Returns the file prefix."""
+    global _capture
+    with _capture_lock:
+        if _capture is not None:
+            print("[Profile] A capture is already running")
+            return None
+        capture = _capture = Capture(seconds)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    before = tracemalloc.take_snapshot()
+    print(f"[Profile] Capturing for {seconds:.0f}s...")
+    try:
+        time.sleep(seconds)
+    finally:
+        _capture = None
+        after = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prefix = os.path.join(PROFILE_DIR, f"profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    with open(prefix + ".txt", "w", encoding="utf-8") as f:
+        f.write(f"Capture of {seconds:.0f}s started {datetime.datetime.fromtimestamp(capture.started)}\n\n")
+        f.write(f"{'Function':<40}{'Calls':>10}{'Profiled':>10}{'Avg ms':>10}{'Max ms':>10}\n")
+        for name, (calls, profiled, total, worst) in sorted(capture.calls.items()):
+            f.write(f"{name:<40}{calls:>10}{profiled:>10}{total / max(calls, 1):>10.2f}{worst:>10.2f}\n")
+        if capture.stats is not None:
+            capture.stats.dump_stats(prefix + ".prof")
+            out = io.StringIO()
+            pstats.Stats(prefix + ".prof", stream=out).sort_stats("cumulative").print_stats(60)
+            f.write("\n" + out.getvalue())
+    with open(prefix + "-alloc.txt", "w", encoding="utf-8") as f:
+        f.write("Top allocation growth during the capture (tracemalloc diff by line)\n\n")
+        for stat in after.compare_to(before, "lineno")[:50]:
+            f.write(f"{stat}\n")
+    print(f"[Profile] Written to {prefix}.txt / .prof / -alloc.txt")
+    return prefix
+
+def trigger(seconds=PROFILE_SECONDS):
+    """Start a capture in the background, for signal handlers and HTTP requests"""
+    if _capture is not None:
+        return False
+    threading.Thread(target=run_capture, args=(seconds,), name="profile-capture", daemon=True).start()
+    return True
+
+def _http_profile(handler, query):
+    # Local callers only, the health port may be exposed publicly
+    if handler.client_address[0] not in ("127.0.0.1", "::1"):
+        return 403, {"error": "profiling is only available from localhost"}
+    seconds = float(query.get("seconds", [PROFILE_SECONDS])[0])
+    if not trigger(seconds):
+        return 409, {"error": "a capture is already running"}
+    return 202, {"profiling_seconds": seconds, "dir": os.path.abspath(PROFILE_DIR)}
+
+def install():
+    """Enable the triggers: SIGUSR1 where the platform has it, and GET /profile?seconds=N on the health server"""
+    import health
+    health.register_route("/profile", _http_profile)
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda signum, frame: trigger())
+        print(f"[Profile] kill -USR1 {os.getpid()} captures a {PROFILE_SECONDS:.0f}s profile")
@@ -0,0 +1,96 @@
+import os,json,threading,collections
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# JSON routing rules, per leader market:
+# {"spot": {"allow": ["BTCUSDT", ...], "deny": ["LUNAUSDT"], "multiplier": 1.0, "max_notional": 0,
+#           "symbols": {"ETHUSDT": {"multiplier": 0.5, "max_notional": 500, "target": "futures", "leverage": 2}}},
+#  "futures": {...}}
+# "allow" (optional) restricts mirroring to the listed symbols, "deny" always wins. Only spot/margin
+# fills can be retargeted, to "futures" (a buy opens/grows a long, a sell reduces it).
+ROUTING_FILE = os.getenv("ROUTING_FILE", "routing.json")
+ROUTING_CHECK_SECONDS = float(os.getenv("ROUTING_CHECK_SECONDS", "2"))
+
+Route = collections.namedtuple("Route", "enabled multiplier max_notional target leverage margin_mode")
+
+def _route(market, rules, overrides=None, enabled=True):
+    overrides = overrides or {}
+    own = "futures" if market == "futures" else "spot"
+    target = overrides.get("target", rules.get("target", own))
+    if target == "margin":
+        target = "spot"
+    if target != own and (market == "futures" or target != "futures"):
+        print(f"⚠️ [Routing] Unsupported target {target!r} for {market} fills, mirroring to {own}")
+        target = own
+    return Route(enabled, float(overrides.get("multiplier", rules.get("multiplier", 1.0))),
+                 float(overrides.get("max_notional", rules.get("max_notional", 0)) or 0), target,
+                 int(overrides.get("leverage", rules.get("leverage", 1))), overrides.get("margin_mode", rules.get("margin_mode", "cross")))
+
+def compile_rules(config):
+    """
+    Flatten the rules into {(market, symbol): Route} plus one default Route per market, so the
+    per-event check is a single dict lookup.
+    """
+    table = {}
+    defaults = {}
+    for market, rules in config.items():
+        allow = set(rules.get("allow") or [])
+        deny = set(rules.get("deny") or [])
+        symbols = rules.get("symbols", {})
+        defaults[market] = _route(market, rules, enabled=not allow)
+        for symbol in allow | deny | set(symbols):
+            table[(market, symbol)] = _route(market, rules, symbols.get(symbol), enabled=symbol not in deny and (not allow or symbol in allow))
+    return table, defaults
+
+DEFAULT_ROUTE = {market: _route(market, {}) for market in ("spot", "margin", "futures")}
+
+class Router:
+    """Routing table compiled from ROUTING_FILE, swapped in whole when the file's mtime changes"""
+    def __init__(self, path=ROUTING_FILE):
+        self.path = path
+        self._rules = ({}, dict(DEFAULT_ROUTE))  # (table, defaults), replaced in one assignment on reload
+        self._mtime = None
+        self._thread = None
+        self.reload()
+
+    def route(self, market, symbol):
+        table, defaults = self._rules
+        route = table.get((market, symbol))
+        if route is None:
+            route = defaults.get(market) or DEFAULT_ROUTE["spot"]
+        return route
+
+    def reload(self):
+        """Recompile if the file changed; a file that fails to parse keeps the previous table"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        if mtime is None:
+            table, defaults = {}, {}
+        else:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    table, defaults = compile_rules(json.load(f))
+            except Exception as e:
+                print(f"❌ [Routing] Could not load {self.path}, keeping the previous rules: {e}")
+                return False
+        self._rules = (table, dict(DEFAULT_ROUTE, **defaults))
+        print(f"[Routing] Loaded {len(table)} symbol rule(s) from {self.path}" if mtime else "[Routing] No routing file, mirroring every symbol")
+        return True
+
+    def _watch_loop(self, shutdown_event):
+        while not shutdown_event.wait(ROUTING_CHECK_SECONDS):
+            self.reload()
+
+    def start(self, shutdown_event):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch_loop, args=(shutdown_event,), name="routing-watch", daemon=True)
+            self._thread.start()
+        return self._thread
+
+router = Router()
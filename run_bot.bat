@@ -1,4 +1,4 @@
 @echo off
-REM Batch file to run main.py using the default Python interpreter
-python main.py
+REM Batch file to run the bot (python -m mirror) using the default Python interpreter
+python -m mirror
 pause
@@ -0,0 +1,143 @@
+"""
+Sharded deployment mode: `python -m mirror --sharded` instead of `python -m mirror`.
+
+One ingest process per leader reads that leader's Binance user data streams and routes every fill to
+one of SHARD_WORKERS worker processes by a stable hash of its symbol, so all fills of a symbol are
+mirrored in order by the same worker. Account/balance events go to every worker. Each worker owns its
+Bitget sessions, trade socket, book cache, journal and log file. A supervisor restarts any process that dies;
+events for a dead worker wait in its queue until the replacement picks them up. Workers run the same
+pipeline core as the single-process bot, only the leader streams live in the ingest processes.
+"""
+import os,sys,time,zlib,threading,multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "4"))
+SHARD_RESTART_DELAY = float(os.getenv("SHARD_RESTART_DELAY", "5"))  # seconds between restarts of the same process
+MIRROR_JOURNAL_FILE = os.getenv("MIRROR_JOURNAL_FILE", "mirror_journal.jsonl")
+WARM_STATE_FILE = os.getenv("WARM_STATE_FILE", "warm_state.json")
+PROCESSED_TRADES_FILE = os.getenv("PROCESSED_TRADES_FILE", "processed_trades_ccxt.txt")
+LOG_FILE = os.getenv("LOG_FILE", "log.txt")
+
+def shard_of(symbol, workers):
+    """Stable across processes and restarts, unlike hash()"""
+    return zlib.crc32(symbol.encode()) % workers
+
+def event_symbol(data):
+    if data.get("e") == "executionReport":
+        return data.get("s")
+    if data.get("e") == "ORDER_TRADE_UPDATE":
+        return data["o"].get("s")
+    return None
+
+################################# Processes ###################################
+
+def ingest_main(account, inboxes):
+    """Run one leader's user data streams and fan its events out to the worker inboxes"""
+    from stream_manager import StreamManager, LEADERS
+    import health
+    shutdown_event = threading.Event()
+
+    def route(data, account, market):
+        data["_account"] = account
+        data["_market"] = market
+        symbol = event_symbol(data)
+        if symbol is None:
+            for inbox in inboxes:
+                inbox.put((market, data))
+        else:
+            inboxes[shard_of(symbol, len(inboxes))].put((market, data))
+
+    manager = StreamManager(shutdown_event)
+    for market in ("spot", "margin", "futures"):
+        manager.register_handler(market, route)
+    leader = LEADERS[account]
+    for market in leader.get("markets", ["spot"]):
+        manager.add_pipeline(account, market, leader["api_key"])
+    manager.start()
+    health.start(shutdown_event, port=0)  # stream watchdog only, ports are not shared between processes
+    print(f"[Shard] Ingest for leader {account} running ({', '.join(leader.get('markets', ['spot']))})")
+    shutdown_event.wait()
+
+def take_spot_baseline():
+    """
+    Default leader and follower spot balances, taken once by the supervisor so every worker (and a
+    restarted one) reconciles spot balance changes from the same starting point
+    """
+    from stream_manager import LEADERS
+    from position_sizing import DEFAULT_ACCOUNT
+    from paper_trading import bitget_client
+    from binance_signer import get_signer
+    if "spot" not in LEADERS.get(DEFAULT_ACCOUNT, {}).get("markets", []):
+        return None
+    try:
+        follower = {a: float(q or 0) for a, q in bitget_client("spot").fetch_balance().get("total", {}).items()}
+        snapshot = get_signer(DEFAULT_ACCOUNT, "spot").request("GET", "/api/v3/account", {"omitZeroBalances": "true"})
+    except Exception as e:
+        print(f"[Shard] Could not take the spot baseline, each worker takes its own: {e}")
+        return None
+    leader = {b['asset']: float(b['free']) + float(b['locked']) for b in snapshot.get("balances", [])}
+    return {"leader": leader, "follower": follower}
+
+def worker_main(index, inbox, spot_baseline=None):
+    """Mirror the events of one shard with this process' own Bitget sessions"""
+    # Each worker logs, journals, dedups and snapshots to its own files, set before those modules are first imported
+    for name, path in (("MIRROR_JOURNAL_FILE", MIRROR_JOURNAL_FILE), ("WARM_STATE_FILE", WARM_STATE_FILE),
+                       ("PROCESSED_TRADES_FILE", PROCESSED_TRADES_FILE), ("LOG_FILE", LOG_FILE)):
+        root, ext = os.path.splitext(path)
+        os.environ[name] = f"{root}.w{index}{ext}"
+    import main, future_copier  # register the spot/margin and USD-M adapters
+    from pipeline import pipeline
+    if spot_baseline:
+        main.set_spot_baseline(spot_baseline["leader"], spot_baseline["follower"])
+    pipeline.start(port=0)  # ports are not shared between processes
+    print(f"[Shard] Worker {index} running")
+    while not pipeline.shutdown_event.is_set():
+        market, data = inbox.get()
+        pipeline.enqueue(data, data["_account"], market)
+
+################################# Supervisor ###################################
+
+def supervise(specs):
+    """Start every (name, target, args) spec as a process and restart the ones that exit"""
+    ctx = multiprocessing.get_context("spawn")  # same behaviour on Windows and Linux
+    procs = {}
+    started = {}
+    def launch(name, target, args):
+        p = ctx.Process(target=target, args=args, name=name, daemon=True)
+        p.start()
+        procs[name] = p
+        started[name] = time.monotonic()
+    for name, target, args in specs:
+        launch(name, target, args)
+    try:
+        while True:
+            time.sleep(1)
+            for name, target, args in specs:
+                p = procs[name]
+                if p.is_alive():
+                    continue
+                if time.monotonic() - started[name] < SHARD_RESTART_DELAY:
+                    continue
+                print(f"[Shard] {name} exited with code {p.exitcode}, restarting")
+                launch(name, target, args)
+    except KeyboardInterrupt:
+        print("[Shard] Exiting...")
+        for p in procs.values():
+            p.terminate()
+
+def main():
+    from stream_manager import LEADERS
+    from pipeline import keep_awake
+    keep_awake()
+    ctx = multiprocessing.get_context("spawn")
+    inboxes = [ctx.Queue() for _ in range(SHARD_WORKERS)]
+    spot_baseline = take_spot_baseline()
+    specs = [(f"worker-{i}", worker_main, (i, inboxes[i], spot_baseline)) for i in range(SHARD_WORKERS)]
+    specs += [(f"ingest-{name}", ingest_main, (name, inboxes)) for name in LEADERS]
+    print(f"[Shard] Binance to Bitget CopyTrading: {len(LEADERS)} leader(s), {SHARD_WORKERS} worker(s). Press Ctrl+C to exit.")
+    supervise(specs)
+
+if __name__ == "__main__":
+    sys.exit(main())
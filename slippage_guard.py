@@ -0,0 +1,36 @@
+import os
+from dotenv import load_dotenv
+from book_cache import book_cache
+
+load_dotenv()
+
+# What to do when Bitget's price is further than MAX_SLIPPAGE_BPS from the leader fill:
+# "market" sends anyway (guard only logs), "limit" sends an IOC limit capped at the max slippage, "skip" drops the order
+SLIPPAGE_ACTION = os.getenv("SLIPPAGE_ACTION", "market").lower()
+MAX_SLIPPAGE_BPS = float(os.getenv("MAX_SLIPPAGE_BPS", "50"))
+# Books older than this are not trusted and the order goes out as a market order
+BOOK_MAX_AGE_MS = float(os.getenv("BOOK_MAX_AGE_MS", "3000"))
+
+MARKET = "market"
+LIMIT = "limit"
+SKIP = "skip"
+
+def decide(inst_type, inst_id, side, leader_price, reduce_only=False):
+    """
+    Pre-trade check against the cached Bitget top of book. Returns (action, limit_price, deviation_bps)
+    with action 'market', 'limit' or 'skip'. Orders that reduce a position are never skipped, at worst
+    they become a capped IOC limit.
+    """
+    book_cache.ensure_subscribed(inst_type, inst_id)
+    top = book_cache.top(inst_type, inst_id)
+    if not leader_price or top is None or top[2] > BOOK_MAX_AGE_MS:
+        return MARKET, None, None
+    bid, ask, _ = top
+    buy = side.lower() == "buy"
+    deviation_bps = ((ask - leader_price) if buy else (leader_price - bid)) / leader_price * 10000
+    if deviation_bps <= MAX_SLIPPAGE_BPS or SLIPPAGE_ACTION == MARKET:
+        return MARKET, None, deviation_bps
+    if SLIPPAGE_ACTION == SKIP and not reduce_only:
+        return SKIP, None, deviation_bps
+    cap = MAX_SLIPPAGE_BPS / 10000
+    return LIMIT, leader_price * (1 + cap if buy else 1 - cap), deviation_bps
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dotenv import load_dotenv
+from bounded import LRUDict
+
+load_dotenv()
+
+# Opt-in list of Binance symbols ("BTCUSDT,ETHUSDT", or "*" for all) whose leader MARKET orders are
+# prepared on the NEW event, so the mirror only has to send the order when the fill arrives
+SPECULATIVE_SYMBOLS = {s.strip().upper() for s in os.getenv("SPECULATIVE_SYMBOLS", "").split(",") if s.strip()}
+# Preparations for leader orders that never fill are dropped after this long
+SPECULATIVE_TTL_SECONDS = float(os.getenv("SPECULATIVE_TTL_SECONDS", "30"))
+# How long a fill waits for a preparation that is still in flight before going the normal way
+SPECULATIVE_WAIT_SECONDS = float(os.getenv("SPECULATIVE_WAIT_SECONDS", "2"))
+
+CANCEL_TYPES = {"CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"}
+
+def opted_in(symbol):
+    return bool(SPECULATIVE_SYMBOLS) and (symbol in SPECULATIVE_SYMBOLS or "*" in SPECULATIVE_SYMBOLS)
+
+def order_fields(data):
+    """(symbol, execution type, order type, order id) of a spot executionReport or futures ORDER_TRADE_UPDATE"""
+    o = data.get("o") if data.get("e") == "ORDER_TRADE_UPDATE" else data
+    return o.get("s"), o.get("x"), o.get("o"), o.get("i")
+
+def is_speculative(data):
+    """NEW/cancel events of opted-in symbols drive preparations and must not be shed by the ingest queue"""
+    if data.get("e") not in ("executionReport", "ORDER_TRADE_UPDATE"):
+        return False
+    symbol, execution_type, _, _ = order_fields(data)
+    return (execution_type == "NEW" or execution_type in CANCEL_TYPES) and opted_in(symbol)
+
+class Speculator:
+    """
+    Prepares the Bitget side of a leader MARKET order as soon as Binance reports it NEW: the slow
+    REST lookups (leverage and margin mode, set_leverage, free balance) run in a small pool while the
+    leader order is matching. The fill handler takes the preparation and only sends the order.
+    """
+    def __init__(self):
+        self._prepare = {}   # market -> fn(data, account) returning a dict of prepared values
+        self._prepared = LRUDict(1000, ttl=SPECULATIVE_TTL_SECONDS)  # (account, market, order id) -> Future
+        self._pool = None
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def register(self, market, prepare):
+        self._prepare[market] = prepare
+
+    def on_event(self, market, data, account):
+        """Feed every order event of `market`, only NEW/cancel events of opted-in symbols do anything"""
+        symbol, execution_type, order_type, order_id = order_fields(data)
+        if not opted_in(symbol):
+            return
+        key = (account, market, order_id)
+        if execution_type == "NEW" and order_type == "MARKET" and market in self._prepare:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative")
+            self._prepared[key] = self._pool.submit(self._prepare[market], data, account)
+        elif execution_type in CANCEL_TYPES and self._prepared.pop(key) is not None:
+            self.discarded += 1
+            print(f"[Speculative] Leader order {order_id} {symbol} {execution_type.lower()}, preparation discarded")
+
+    def take(self, market, account, order_id, symbol):
+        """Prepared values for a filled leader order, or None to go the normal way"""
+        if not opted_in(symbol):
+            return None
+        key = (account, market, order_id)
+        future = self._prepared.get(key)  # honours the TTL, an expired preparation is not used
+        self._prepared.pop(key)
+        if future is None:
+            self.misses += 1
+            return None
+        try:
+            prepared = future.result(timeout=SPECULATIVE_WAIT_SECONDS)
+        except FutureTimeout:
+            prepared = None
+        except Exception as e:
+            print(f"[Speculative] Preparation for {symbol} failed: {e}")
+            prepared = None
+        if prepared is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return prepared
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "discarded": self.discarded, "pending": len(self._prepared)}
+
+speculator = Speculator()
@@ -0,0 +1,213 @@
+import os,json,time,threading,requests,websocket
+from dotenv import load_dotenv
+from position_sizing import sizer, DEFAULT_ACCOUNT
+import health
+
+load_dotenv()
+
+# JSON list of leaders: [{"name": "alice", "api_key": "...", "api_secret": "...", "markets": ["spot", "margin", "futures"]}],
+# optionally with "allocation": the share of the follower equity the leader is sized against (see PositionSizer.set_allocations)
+LEADERS_FILE = os.getenv("LEADERS_FILE", "leaders.json")
+# Listen keys multiplexed on one combined-stream connection
+STREAM_KEYS_PER_CONNECTION = int(os.getenv("STREAM_KEYS_PER_CONNECTION", "50"))
+LISTEN_KEY_KEEPALIVE_SECONDS = 30 * 60
+LISTEN_KEY_RETRY_SECONDS = int(os.getenv("LISTEN_KEY_RETRY_SECONDS", "60"))  # retry of a failed listenKey creation
+
+MARKETS = {
+    "spot": {"rest": "https://api.binance.com", "path": "/api/v3/userDataStream", "ws": "wss://stream.binance.com:9443/stream?streams="},
+    "margin": {"rest": "https://api.binance.com", "path": "/sapi/v1/userDataStream", "ws": "wss://stream.binance.com:9443/stream?streams="},
+    "futures": {"rest": "https://fapi.binance.com", "path": "/fapi/v1/listenKey", "ws": "wss://fstream.binance.com/stream?streams="},
+}
+
+def load_leaders():
+    """
+    Leader accounts by name. The account configured through BINANCE_API_KEY is always the
+    DEFAULT_ACCOUNT leader; LEADERS_FILE adds more.
+    """
+    leaders = {}
+    if os.getenv("BINANCE_API_KEY"):
+        leaders[DEFAULT_ACCOUNT] = {"name": DEFAULT_ACCOUNT, "api_key": os.getenv("BINANCE_API_KEY"),
+                                    "api_secret": os.getenv("BINANCE_API_SECRET"), "markets": ["spot", "futures"]}
+    if os.path.exists(LEADERS_FILE):
+        with open(LEADERS_FILE, "r", encoding="utf-8") as f:
+            for leader in json.load(f):
+                leaders[leader["name"]] = leader
+    return leaders
+
+LEADERS = load_leaders()
+sizer.set_allocations(LEADERS)
+
+def leader_accounts(market):
+    """Names of the leaders whose `market` is mirrored"""
+    return [name for name, leader in LEADERS.items() if market in leader.get("markets", ["spot"])]
+
+def leader_credentials(account):
+    """API key and secret of a leader; never another leader's, requests signed for the wrong account would mix them up"""
+    leader = LEADERS.get(account)
+    if leader is None:
+        raise KeyError(f"No credentials for leader account {account!r}")
+    return leader.get("api_key"), leader.get("api_secret")
+
+class StreamManager:
+    """
+    Runs many leader user data streams over few sockets. Listen keys of one market are packed onto
+    Binance combined-stream connections (/stream?streams=<key1>/<key2>/...), every frame carries its
+    listen key in "stream" and is routed to the handler of that (account, market) pipeline. One
+    keepalive thread serves all keys and retries the ones that could not be created.
+    """
+    def __init__(self, shutdown_event):
+        self.shutdown_event = shutdown_event
+        self._lock = threading.Lock()
+        self._handlers = {}     # market -> fn(data, account, market)
+        self._pipelines = []    # [{"account", "market", "api_key", "listen_key", "slot"}]
+        self._routes = {}       # listen key -> pipeline
+        self._sockets = {}      # (market, slot) -> WebSocketApp
+
+    def register_handler(self, market, handler):
+        self._handlers[market] = handler
+
+    def add_pipeline(self, account, market, api_key):
+        self._pipelines.append({"account": account, "market": market, "api_key": api_key, "listen_key": None, "slot": None})
+
+    # --- Listen keys ---
+
+    def _create_listen_key(self, pipeline):
+        cfg = MARKETS[pipeline["market"]]
+        resp = requests.post(cfg["rest"] + cfg["path"], headers={"X-MBX-APIKEY": pipeline["api_key"]})
+        resp.raise_for_status()
+        listen_key = resp.json()["listenKey"]
+        with self._lock:
+            if pipeline["listen_key"]:
+                self._routes.pop(pipeline["listen_key"], None)
+            pipeline["listen_key"] = listen_key
+            pipeline["created"] = pipeline["kept_alive"] = time.time()
+            self._routes[listen_key] = pipeline
+        return listen_key
+
+    def _renew_listen_key(self, pipeline):
+        """
+        Create the listenKey of a pipeline that has none or whose key was rejected (e.g. -1125,
+        expired). Its connection reconnects when the key changed, the key is part of the URL.
+        """
+        old_key = pipeline["listen_key"]
+        try:
+            listen_key = self._create_listen_key(pipeline)
+        except Exception as e:
+            print(f"[Streams] Could not get listenKey for {pipeline['account']}/{pipeline['market']}: {e}")
+            return False
+        ws = self._sockets.get(pipeline["slot"])
+        if listen_key != old_key and ws is not None:
+            ws.close()
+        return True
+
+    def _keepalive_loop(self):
+        while not self.shutdown_event.wait(LISTEN_KEY_RETRY_SECONDS):
+            for pipeline in list(self._pipelines):
+                if not pipeline["listen_key"]:
+                    self._renew_listen_key(pipeline)
+                    continue
+                if time.time() - pipeline["kept_alive"] < LISTEN_KEY_KEEPALIVE_SECONDS:
+                    continue
+                cfg = MARKETS[pipeline["market"]]
+                try:
+                    resp = requests.put(cfg["rest"] + cfg["path"], headers={"X-MBX-APIKEY": pipeline["api_key"]},
+                                        params={"listenKey": pipeline["listen_key"]})
+                    resp.raise_for_status()
+                    pipeline["kept_alive"] = time.time()
+                except Exception as e:
+                    print(f"[Streams] Error keeping {pipeline['account']}/{pipeline['market']} listenKey alive: {e}, recreating it")
+                    self._renew_listen_key(pipeline)
+
+    def listen_key_health(self):
+        """Health check: every pipeline has a listen key, and a listen key expires 60 minutes after its last successful keepalive"""
+        now = time.time()
+        ages = {f"{p['account']}/{p['market']}": {"age_s": round(now - p["created"]), "since_keepalive_s": round(now - p["kept_alive"])}
+                for p in self._pipelines if p.get("created")}
+        missing = [f"{p['account']}/{p['market']}" for p in self._pipelines if not p["listen_key"]]
+        return not missing and all(a["since_keepalive_s"] < 3600 for a in ages.values()), {"listen_keys": ages, "missing": missing}
+
+    # --- Connections ---
+
+    def _slots(self):
+        """Group pipelines into connections: same market (same endpoint), at most STREAM_KEYS_PER_CONNECTION keys each"""
+        slots = {}
+        by_market = {}
+        for pipeline in self._pipelines:
+            by_market.setdefault(pipeline["market"], []).append(pipeline)
+        for market, pipelines in by_market.items():
+            for i in range(0, len(pipelines), STREAM_KEYS_PER_CONNECTION):
+                slots[(market, i // STREAM_KEYS_PER_CONNECTION)] = pipelines[i:i + STREAM_KEYS_PER_CONNECTION]
+        return slots
+
+    def _on_message(self, ws, message):
+        try:
+            frame = json.loads(message)
+            pipeline = self._routes.get(frame.get("stream"))
+            if pipeline is None:
+                return
+            data = frame["data"]
+            if data.get("e") == "listenKeyExpired":
+                print(f"[Streams] listenKey expired for {pipeline['account']}/{pipeline['market']}, renewing")
+                self._renew_listen_key(pipeline)
+                ws.close()  # reconnect with the new key in the URL, the reconnect retries the key if that failed
+                return
+            self._handlers[pipeline["market"]](data, pipeline["account"], pipeline["market"])
+        except Exception as e:
+            print(f"[Streams] Error routing message: {e}")
+
+    def _run_connection(self, slot, pipelines):
+        label = f"{slot[0].upper()}#{slot[1]}"
+        backoff = 2
+        reconnect = False
+        while not self.shutdown_event.is_set():
+            if reconnect:
+                # The key may have expired while disconnected, creating it again returns the active one or a new one
+                for pipeline in pipelines:
+                    self._renew_listen_key(pipeline)
+            reconnect = True
+            keys = [p["listen_key"] for p in pipelines if p["listen_key"]]
+            if not keys:
+                print(f"[{label}] No listenKey yet, retrying in {backoff} seconds...")
+                self.shutdown_event.wait(backoff)
+                backoff = min(backoff * 2, 60)
+                continue
+            opened = threading.Event()
+            ws = websocket.WebSocketApp(MARKETS[slot[0]]["ws"] + "/".join(keys),
+                                        on_message=lambda ws, message: (health.note_frame(label), self._on_message(ws, message)),
+                                        on_pong=lambda ws, data: health.note_frame(label),
+                                        on_error=lambda ws, error: print(f"[{label}] WebSocket error: {error}"),
+                                        on_open=lambda ws: (opened.set(), print(f"[{label}] Connected, {len(keys)} leader stream(s)")))
+            self._sockets[slot] = ws
+            health.register_stream(label, reconnect=ws.close)
+            try:
+                ws.run_forever(ping_interval=health.STREAM_PING_INTERVAL, ping_timeout=health.STREAM_PING_TIMEOUT)
+            except Exception as e:
+                print(f"[{label}] WebSocket run_forever() error: {e}")
+            if self.shutdown_event.is_set():
+                break
+            if opened.is_set():
+                backoff = 2  # the connection was up, this is a fresh disconnect
+            print(f"[{label}] WebSocket disconnected. Reconnecting in {backoff} seconds...")
+            self.shutdown_event.wait(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def start(self):
+        for pipeline in self._pipelines:
+            self._renew_listen_key(pipeline)  # a failed one is retried by the keepalive thread
+        slots = self._slots()
+        for slot, pipelines in slots.items():
+            for pipeline in pipelines:
+                pipeline["slot"] = slot
+        keepalive = threading.Thread(target=self._keepalive_loop, name="listenkey-keepalive", daemon=True)
+        keepalive.start()
+        health.watch_thread("listenkey-keepalive", keepalive)
+        health.register_check("stream_manager", self.listen_key_health)
+        for slot, pipelines in slots.items():
+            t = threading.Thread(target=self._run_connection, args=(slot, pipelines), name=f"stream-{slot[0]}-{slot[1]}", daemon=True)
+            t.start()
+            health.watch_thread(t.name, t)
+        print(f"[Streams] {len(self._pipelines)} leader stream(s) on {len(slots)} connection(s)")
+
+    def stop(self):
+        for ws in list(self._sockets.values()):
+            ws.close()
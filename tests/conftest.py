@@ -0,0 +1,21 @@
+import os,sys,tempfile
+import pytest
+
+# The bot is a set of top-level scripts; keep test runs away from the state files of a real run
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WARM_STATE_FILE", os.path.join(tempfile.mkdtemp(), "warm_state.json"))
+os.environ.setdefault("MIRROR_JOURNAL_FILE", os.path.join(tempfile.mkdtemp(), "mirror_journal.jsonl"))
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", help="also run the tests marked slow (the million-event RSS soak)")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running test, only run with --runslow")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip = pytest.mark.skip(reason="slow, run with --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,13 @@
+import ccxt
+import bitget_errors
+
+def test_classify_by_code_then_type():
+    assert bitget_errors.classify(ccxt.ExchangeError('{"code":"43012","msg":"Insufficient balance"}')).action == bitget_errors.RESIZE
+    assert bitget_errors.classify(ccxt.RequestTimeout("timed out")).action == bitget_errors.RETRY
+    assert bitget_errors.classify(ccxt.RateLimitExceeded("slow down")).reason == "rate limited"
+
+def test_failure_reason_is_read_once():
+    bitget_errors.note_failure("oid1", "slippage guard")
+    assert bitget_errors.failure_reason("oid1") == "slippage guard"
+    assert bitget_errors.failure_reason("oid1") == "not placed"
+    assert bitget_errors.failure_reason(None) == "not placed"
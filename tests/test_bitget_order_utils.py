@@ -0,0 +1,60 @@
+import threading
+import pytest
+import bitget_order_utils
+from bitget_order_utils import OrderBatcher, place_bitget_orders
+
+class Exchange:
+    """Swap exchange whose batch endpoint rejects closes above the held position (40757)"""
+    def __init__(self, held=0.0):
+        self.held = held
+        self.batches = []
+        self.singles = []
+        self.gate = threading.Event()
+        self.gate.set()
+    def market(self, symbol):
+        return {"type": "swap", "settleId": "USDT"}
+    def set_leverage(self, leverage, symbol, params=None):
+        self.gate.wait(5)
+    def amount_to_precision(self, symbol, amount):
+        return str(amount)
+    def fetch_positions(self, symbols):
+        return [{"side": "long", "contracts": self.held}]
+    def fetch_order(self, id, symbol, params=None):
+        return {"id": id, "clientOrderId": id}
+    def reply(self, client_oid, amount, trade_side):
+        if trade_side == "close" and amount > self.held:
+            return {"clientOrderId": client_oid, "status": "rejected", "info": {"clientOid": client_oid, "errorCode": "40757", "errorMsg": "position"}}
+        return {"id": client_oid, "clientOrderId": client_oid, "amount": amount}
+    def create_orders(self, orders):
+        self.batches.append([o["params"]["clientOid"] for o in orders])
+        return [self.reply(o["params"]["clientOid"], o["amount"], o["params"].get("tradeSide")) for o in reversed(orders)]
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.singles.append((params["clientOid"], amount))
+        return self.reply(params["clientOid"], amount, params.get("tradeSide"))
+
+def order(client_oid, amount=1.0, side="buy", trade_side="open"):
+    return {"order_type": "market", "side": side, "amount": amount, "price": None, "leverage": 5, "margin_mode": "cross",
+            "trade_side": trade_side, "client_oid": client_oid}
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    monkeypatch.setattr(bitget_order_utils, "format_bitget_order_output", lambda order: None)
+
+def test_batched_close_above_the_position_is_resent_for_what_is_held():
+    exchange = Exchange(held=0.4)
+    placed = place_bitget_orders(exchange, "BTC/USDT:USDT", [order("a"), order("b", 1.0, "buy", "close")])
+    assert [o["clientOrderId"] for o in placed] == ["a", "bR"]
+    assert exchange.singles == [("bR", 0.4)]
+
+def test_orders_queued_during_a_request_go_out_as_one_batch():
+    exchange = Exchange()
+    batcher = OrderBatcher(exchange)
+    exchange.gate.clear()
+    first = batcher.submit(symbol="BTC/USDT:USDT", **order("first"))
+    while batcher.stats()["pending"]:
+        pass  # the worker took the first order and waits on set_leverage
+    futures = [batcher.submit(symbol="BTC/USDT:USDT", **order(f"c{i}")) for i in range(3)]
+    exchange.gate.set()
+    assert first.result(5)["id"] == "first"
+    assert [f.result(5)["clientOrderId"] for f in futures] == ["c0", "c1", "c2"]
+    assert exchange.batches == [["c0", "c1", "c2"]] and batcher.stats()["batches"] == 1
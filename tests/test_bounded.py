@@ -0,0 +1,45 @@
+import io
+import pytest
+from rich.console import Console
+from rich.table import Table
+import bounded
+from bounded import LRUDict, LRUSet
+
+def test_dedup_set_keeps_the_most_recent_ids():
+    # main.processed_trades: a trade id seen again refreshes it, the oldest ids are evicted
+    processed = LRUSet(3, items=["1", "2"])
+    processed.add("3")
+    assert "1" in processed
+    processed.add("4")
+    assert "2" not in processed and "1" in processed and len(processed) == 3
+
+def test_prepared_orders_expire():
+    # speculative: a prepared order nobody took is dropped after its TTL
+    prepared = LRUDict(10, ttl=-1)
+    prepared["order"] = "prepared"
+    assert prepared.get("order") is None and len(prepared) == 0
+
+def test_consumer_state_stays_bounded_under_churn():
+    """
+    Dedup of fills and panels printed to a shared Console: nothing may grow with the number of
+    events. The ingest queue and the leader position book have their own churn tests.
+    """
+    dedup_max = 500
+    dedup = LRUSet(dedup_max)
+    console = Console(file=io.StringIO(), width=120)
+    for n in range(1, 5_001):
+        assert n not in dedup
+        dedup.add(n)
+        table = Table(show_header=False)
+        table.add_row("Symbol", f"C{n % 400}USDT")
+        table.add_row("Trade ID", str(n))
+        console.print(table)
+        console.file.seek(0)
+        console.file.truncate()
+    assert len(dedup) == dedup_max
+    assert console.file.tell() == 0
+
+@pytest.mark.slow
+def test_rss_stays_flat_over_a_million_events():
+    start, end = bounded.soak(1_000_000)
+    assert bounded.within_budget(start, end), f"RSS grew from {start:.1f} MB to {end:.1f} MB"
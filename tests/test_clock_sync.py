@@ -0,0 +1,37 @@
+import threading
+import clock_sync
+from clock_sync import ClockSync
+
+class CountingClock(ClockSync):
+    """Server time is the local clock plus 500 ms, every request counted"""
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+        self.sampled = threading.Event()
+    def _sample(self, source):
+        self.requests += 1
+        self.sampled.set()
+        return 500.0, 10.0
+
+def test_first_use_syncs_inline():
+    clock = CountingClock()
+    assert clock.now_ms("bitget") - clock.local_ms() >= 499
+    assert clock.requests == clock_sync.CLOCK_SYNC_SAMPLES
+
+def test_stale_offset_is_refreshed_in_the_background(monkeypatch):
+    clock = CountingClock()
+    clock.sync("bitget")
+    clock.sampled.clear()
+    monkeypatch.setattr(clock_sync, "CLOCK_SYNC_SECONDS", -1)
+    started = clock.requests
+    clock.now_ms("bitget")
+    assert clock.sampled.wait(5)
+    assert clock.requests > started
+
+def test_fresh_offset_does_not_sync():
+    clock = CountingClock()
+    clock.sync("bitget")
+    started = clock.requests
+    for _ in range(100):
+        clock.now_ms("bitget")
+    assert clock.requests == started
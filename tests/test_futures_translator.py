@@ -0,0 +1,93 @@
+from futures_translator import LeaderPositionBook, translate_fill, apply_partial_fill, correction_leg
+
+def order(side, z, l=None, ps="BOTH", t=1000, reduce_only=False, status="FILLED"):
+    return {"s": "BTCUSDT", "S": side, "ps": ps, "q": str(z), "z": str(z), "l": str(l if l is not None else z),
+            "T": t, "R": reduce_only, "X": status, "x": "TRADE"}
+
+def book_with(qty, ps="BOTH", t=0):
+    book = LeaderPositionBook()
+    book.set("BTCUSDT", ps, qty, t)
+    return book
+
+def test_one_way_open_close_and_flip():
+    book = LeaderPositionBook()
+    legs, direction = translate_fill(order("BUY", 2, t=1), book, "hedge")
+    assert direction == "OPEN" and [(l["side"], l["trade_side"], l["qty"]) for l in legs] == [("buy", "open", 2.0)]
+    legs, direction = translate_fill(order("SELL", 3, t=2), book, "hedge")
+    assert direction == "FLIP"
+    assert [(l["side"], l["trade_side"], l["qty"]) for l in legs] == [("buy", "close", 2.0), ("sell", "open", 1.0)]
+    assert book.get("BTCUSDT") == -1.0
+
+def test_partial_fill_snapshot_before_final_fill():
+    # ACCOUNT_UPDATE of the first partial fill moves the book 2 -> 1 before the FILLED event (z=2, l=1)
+    book = book_with(2.0, t=1)
+    book.set("BTCUSDT", "BOTH", 1.0, 10)
+    legs, direction = translate_fill(order("SELL", 2, l=1, t=20), book, "hedge")
+    assert direction == "CLOSE"
+    assert [(l["side"], l["trade_side"], l["qty"]) for l in legs] == [("buy", "close", 2.0)]
+    assert book.get("BTCUSDT") == 0.0
+
+def test_partial_fill_events_then_late_snapshot():
+    book = book_with(2.0, t=1)
+    apply_partial_fill(order("SELL", 1, l=1, t=10, status="PARTIALLY_FILLED"), book)
+    legs, direction = translate_fill(order("SELL", 2, l=1, t=20), book, "hedge")
+    assert direction == "CLOSE" and legs[0]["qty"] == 2.0
+    book.set("BTCUSDT", "BOTH", 1.0, 10)  # the partial fill's ACCOUNT_UPDATE, older than the applied fill
+    assert book.get("BTCUSDT") == 0.0
+
+def test_snapshot_with_same_time_before_fill():
+    # ACCOUNT_UPDATE of the fill itself arrives first and moves the book 1 -> 0
+    book = book_with(1.0, t=1)
+    book.set("BTCUSDT", "BOTH", 0.0, 20)
+    legs, direction = translate_fill(order("SELL", 1, t=20), book, "hedge")
+    assert direction == "CLOSE"
+    assert [(l["side"], l["trade_side"], l["qty"]) for l in legs] == [("buy", "close", 1.0)]
+    assert book.get("BTCUSDT") == 0.0
+
+def test_snapshot_after_fill_does_not_double_count():
+    book = book_with(1.0, t=1)
+    translate_fill(order("SELL", 1, t=20), book, "hedge")
+    book.set("BTCUSDT", "BOTH", 0.0, 20)
+    legs, direction = translate_fill(order("SELL", 1, t=30), book, "hedge")
+    assert direction == "OPEN" and book.get("BTCUSDT") == -1.0
+
+def test_two_fills_in_the_same_millisecond_are_both_applied():
+    book = LeaderPositionBook()
+    translate_fill(order("BUY", 1, t=20), book, "hedge")
+    translate_fill(order("BUY", 1, t=20), book, "hedge")
+    assert book.get("BTCUSDT") == 2.0
+
+def test_hedge_mode_partial_close():
+    book = book_with(2.0, ps="LONG", t=1)
+    book.set("BTCUSDT", "LONG", 1.0, 10)
+    legs, direction = translate_fill(order("SELL", 2, l=1, ps="LONG", t=20), book, "hedge")
+    assert direction == "CLOSE" and (legs[0]["side"], legs[0]["trade_side"], legs[0]["qty"]) == ("buy", "close", 2.0)
+    assert book.get("BTCUSDT", "LONG") == 0.0
+
+def test_reduce_only_without_cached_position_trusts_the_flag():
+    legs, direction = translate_fill(order("SELL", 1, reduce_only=True), LeaderPositionBook(), "hedge")
+    assert direction == "CLOSE" and legs[0]["trade_side"] == "close"
+
+def test_correction_leg_closes_before_opening():
+    leg = correction_leg("BOTH", -3.0, current=2.0, follower_mode="hedge")
+    assert (leg["side"], leg["trade_side"], leg["qty"]) == ("buy", "close", 2.0)
+
+def test_restart_seed_keeps_fills_newer_than_the_fetch():
+    # Restored book at t=1, a fill at t=50 arrives while the REST positions (fetched at t=40) are in flight
+    book = book_with(1.0, t=1)
+    translate_fill(order("BUY", 1, t=50), book, "hedge")
+    book.set("BTCUSDT", "BOTH", 1.0, 40)
+    assert book.get("BTCUSDT") == 2.0
+    # A fill the fetch already contained is not applied again
+    book = book_with(1.0, t=1)
+    book.set("BTCUSDT", "BOTH", 2.0, 40)
+    translate_fill(order("BUY", 1, t=30), book, "hedge")
+    assert book.get("BTCUSDT") == 2.0
+
+def test_book_grows_with_symbols_not_fills():
+    book = LeaderPositionBook()
+    for n in range(1, 5_001):
+        fill = order("BUY" if n % 4 else "SELL", 2, t=n)
+        fill["s"] = f"C{n % 400}USDT"
+        translate_fill(fill, book)
+    assert len(book.snapshot()) == 400
@@ -0,0 +1,49 @@
+from ingest_queue import IngestQueue
+
+def fill(n):
+    return {"e": "ORDER_TRADE_UPDATE", "n": n, "o": {"s": "BTCUSDT", "x": "TRADE", "X": "FILLED"}}
+
+def account_update(n):
+    return {"e": "ACCOUNT_UPDATE", "n": n, "a": {"B": [], "P": []}}
+
+def cosmetic(n):
+    return {"e": "ORDER_TRADE_UPDATE", "n": n, "o": {"s": "BTCUSDT", "x": "NEW", "X": "NEW"}}
+
+def drain(queue):
+    events = []
+    while True:
+        data = queue.get(timeout=0)
+        if data is None:
+            return events
+        events.append(data["n"])
+
+def test_events_are_served_in_arrival_order():
+    queue = IngestQueue("TEST")
+    for event in (account_update(1), cosmetic(2), fill(3), account_update(4)):
+        queue.put(event)
+    assert drain(queue) == [1, 2, 3, 4]
+
+def test_only_cosmetic_events_are_shed_when_full():
+    queue = IngestQueue("TEST", maxsize=2)
+    for event in (cosmetic(1), account_update(2), cosmetic(3), fill(4), cosmetic(5), {"e": "outboundAccountPosition", "n": 6}):
+        queue.put(event)
+    assert drain(queue) == [2, 3, 4, 5, 6]
+    assert queue.shed == 1
+
+def test_stale_cosmetic_events_are_shed_but_account_updates_are_not():
+    queue = IngestQueue("TEST", max_lag_ms=-1)
+    queue.put(cosmetic(1))
+    queue.put(account_update(2))
+    assert drain(queue) == [2]
+    assert queue.stats()["depth"] == 0
+
+def test_depth_stays_bounded_under_churn():
+    queue = IngestQueue("TEST", maxsize=100)
+    for n in range(5_000):
+        queue.put(fill(n) if n % 2 else cosmetic(n))
+        assert queue.get(timeout=0)["n"] == n
+    assert queue.depth() == 0
+    # A consumer that falls behind holds at most `maxsize` cosmetic events
+    for n in range(5_000):
+        queue.put(cosmetic(n))
+    assert queue.depth() == 100 and queue.shed == 4_900
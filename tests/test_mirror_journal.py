@@ -0,0 +1,33 @@
+import json
+import mirror_journal
+from mirror_journal import MirrorJournal
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_received_is_on_disk_when_it_returns(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(mirror_journal.os, "fsync", lambda fd: synced.append(fd))
+    journal = MirrorJournal(str(tmp_path / "journal.jsonl"))
+    journal.received("a", "spot", {"symbol": "BTCUSDT"})
+    assert synced
+    assert lines(journal.path)[0]["id"] == "a"
+
+def test_recover_replays_unfinished_intents(tmp_path):
+    journal = MirrorJournal(str(tmp_path / "journal.jsonl"))
+    journal.received("done", "spot", {})
+    journal.acked("done")
+    journal.received("open", "spot", {"symbol": "BTCUSDT"})
+    replayed = []
+    assert journal.recover({"spot": lambda intent_id, payload: replayed.append(intent_id) or True}) == 1
+    assert replayed == ["open"]
+
+def test_recover_fails_stale_intents(tmp_path, monkeypatch):
+    journal = MirrorJournal(str(tmp_path / "journal.jsonl"))
+    journal.received("old", "spot", {})
+    monkeypatch.setattr(mirror_journal, "JOURNAL_MAX_REPLAY_AGE_SECONDS", -1)
+    replayed = []
+    journal.recover({"spot": lambda intent_id, payload: replayed.append(intent_id) or True})
+    assert replayed == []
+    assert lines(journal.path)[-1]["state"] == mirror_journal.FAILED
@@ -0,0 +1,81 @@
+import ccxt
+import pytest
+import bitget_errors
+import order_submission
+from order_submission import submit_order, submit_orders
+
+class Exchange:
+    """create_order fails with the queued errors, then succeeds"""
+    def __init__(self, *errors, known=None):
+        self.errors = list(errors)
+        self.known = known
+        self.sent = 0
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.sent += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"id": str(self.sent), "clientOrderId": (params or {}).get("clientOid")}
+    def fetch_order(self, id, symbol, params=None):
+        if self.known is None:
+            raise ccxt.OrderNotFound("unknown")
+        return self.known
+
+class BatchExchange(Exchange):
+    """create_orders answers with `replies` (clientOid -> order, in any order), create_order as Exchange"""
+    def __init__(self, replies, known=None):
+        super().__init__(known=known)
+        self.replies = replies
+        self.singles = []
+    def create_orders(self, orders):
+        return list(self.replies.values())
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.singles.append((params["clientOid"], amount))
+        return super().create_order(symbol, type, side, amount, price, params)
+
+def batch_order(client_oid, amount=1.0, trade_side="open"):
+    return {"order_type": "market", "side": "buy", "amount": amount, "price": None, "params": {"tradeSide": trade_side}, "client_oid": client_oid}
+
+def rejected(client_oid, code):
+    return {"clientOrderId": client_oid, "status": "rejected", "info": {"clientOid": client_oid, "errorCode": code, "errorMsg": "rejected"}}
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(order_submission, "_backoff", lambda attempt: None)
+
+def test_unknown_outcome_without_client_oid_is_raised():
+    exchange = Exchange(ccxt.RequestTimeout("timed out"))
+    with pytest.raises(ccxt.RequestTimeout):
+        submit_order(exchange, "BTC/USDT", "market", "buy", 1)
+    assert exchange.sent == 1
+
+def test_rate_limit_without_client_oid_is_retried():
+    exchange = Exchange(ccxt.RateLimitExceeded("slow down"))
+    assert submit_order(exchange, "BTC/USDT", "market", "buy", 1)["id"] == "2"
+
+def test_unknown_outcome_resolved_by_client_oid():
+    exchange = Exchange(ccxt.RequestTimeout("timed out"), known={"id": "landed"})
+    assert submit_order(exchange, "BTC/USDT", "market", "buy", 1, client_oid="x")["id"] == "landed"
+    assert exchange.sent == 1
+
+def test_unknown_outcome_resent_when_bitget_never_saw_it():
+    exchange = Exchange(ccxt.RequestTimeout("timed out"))
+    assert submit_order(exchange, "BTC/USDT", "market", "buy", 1, client_oid="x")["clientOrderId"] == "x"
+    assert exchange.sent == 2
+
+def test_batch_results_are_matched_by_client_oid():
+    exchange = BatchExchange({"b": {"id": "2", "clientOrderId": "b"}, "a": {"id": "1", "info": {"clientOid": "a"}}})
+    assert [o["id"] for o in submit_orders(exchange, "BTC/USDT:USDT", [batch_order("a"), batch_order("b")])] == ["1", "2"]
+    assert exchange.singles == []
+
+def test_rejected_batch_items_fail_and_missing_ones_are_resent():
+    exchange = BatchExchange({"a": rejected("a", "45111"), "c": {"id": "3", "clientOrderId": "c"}})
+    placed = submit_orders(exchange, "BTC/USDT:USDT", [batch_order("a"), batch_order("b"), batch_order("c")])
+    assert placed[0] is None and placed[1]["clientOrderId"] == "b" and placed[2]["id"] == "3"
+    assert exchange.singles == [("b", 1.0)]
+    assert bitget_errors.failure_reason("a") == "below the minimum order quantity (45111)"
+
+def test_batch_item_rejected_for_the_position_size_is_resent_resized():
+    exchange = BatchExchange({"a": rejected("a", "40757")})
+    placed = submit_orders(exchange, "BTC/USDT:USDT", [batch_order("a", 2.0, "close")], resize=lambda o: 0.5)
+    assert placed[0]["clientOrderId"] == "aR"
+    assert exchange.singles == [("aR", 0.5)]
@@ -0,0 +1,44 @@
+import time
+import position_sizing
+import position_reconciler
+from position_reconciler import PositionReconciler
+from routing import Route
+
+def reconciler_for(monkeypatch, leader, follower, route=Route(True, 1.0, 0.0, "futures", 1, "cross")):
+    monkeypatch.setattr(position_reconciler, "RECONCILE_MODE", "correct")
+    monkeypatch.setattr(position_reconciler.router, "route", lambda market, symbol: route)
+    reconciler = PositionReconciler()
+    corrections = []
+    reconciler.register_market("futures", fetch_follower=lambda symbol, ps: follower,
+                               correct=lambda *args: corrections.append(args) or True,
+                               price=lambda symbol: 100.0, leader=lambda symbol, ps: leader,
+                               bitget_symbol=lambda symbol: "BTC/USDT:USDT")
+    return reconciler, corrections
+
+def test_tracking_starts_from_the_leader_position(monkeypatch):
+    reconciler, corrections = reconciler_for(monkeypatch, leader=2.0, follower=2.0)
+    reconciler.track("futures", "BTCUSDT", "LONG")
+    reconciler.check(("futures", "BTCUSDT", "LONG"), time.monotonic())
+    assert corrections == []
+
+def test_target_scales_the_position_without_per_order_caps(monkeypatch):
+    # The route and symbol caps bound single orders, the target is the whole leader position times the multiplier
+    monkeypatch.setitem(position_sizing.SIZING_SYMBOL_CAPS, "BTCUSDT", 0.5)
+    reconciler, corrections = reconciler_for(monkeypatch, leader=2.0, follower=1.0, route=Route(True, 1.5, 100.0, "futures", 1, "cross"))
+    reconciler.track("futures", "BTCUSDT", "LONG")
+    reconciler.check(("futures", "BTCUSDT", "LONG"), time.monotonic())
+    (symbol, ps, delta, follower_qty, client_oid), = corrections
+    assert (symbol, ps, delta, follower_qty) == ("BTCUSDT", "LONG", 2.0, 1.0)
+
+def test_corrections_carry_a_client_oid(monkeypatch):
+    reconciler, corrections = reconciler_for(monkeypatch, leader=2.0, follower=0.0)
+    reconciler.track("futures", "BTCUSDT", "LONG")
+    reconciler.check(("futures", "BTCUSDT", "LONG"), time.monotonic())
+    (symbol, ps, delta, follower_qty, client_oid), = corrections
+    assert (symbol, ps, delta) == ("BTCUSDT", "LONG", 2.0) and client_oid.startswith("bbfBTCUSDTRCL")
+
+def test_excluded_symbols_are_not_corrected(monkeypatch):
+    reconciler, corrections = reconciler_for(monkeypatch, leader=2.0, follower=0.0, route=Route(False, 1.0, 0.0, "futures", 1, "cross"))
+    reconciler.track("futures", "BTCUSDT", "LONG")
+    reconciler.check(("futures", "BTCUSDT", "LONG"), time.monotonic())
+    assert corrections == []
@@ -0,0 +1,28 @@
+import position_sizing
+from position_sizing import PositionSizer
+
+def test_follower_equity_is_split_between_leaders():
+    sizer = PositionSizer()
+    sizer.set_allocations({"alice": {"allocation": 0.5}, "bob": {}, "carol": {}})
+    sizer.update_follower_balances("futures", {"USDT": 1000.0})
+    for account in ("alice", "bob", "carol"):
+        sizer.update_leader_balances(account, "futures", {"USDT": 100.0})
+    assert sizer.equity_ratio("alice", "futures") == 5.0
+    assert sizer.equity_ratio("bob", "futures") == 2.5
+    assert sizer.equity_ratio("carol", "futures") == 2.5
+
+def test_single_leader_gets_the_whole_follower_account():
+    sizer = PositionSizer()
+    sizer.set_allocations({"default": {}})
+    sizer.update_follower_balances("spot", {"USDT": 300.0})
+    sizer.update_leader_balances("default", "margin", {"USDT": 100.0})
+    assert sizer.equity_ratio("default", "margin") == 3.0
+
+def test_equity_mode_skips_orders_until_the_ratio_is_known(monkeypatch):
+    monkeypatch.setattr(position_sizing, "SIZING_MODE", "equity")
+    sizer = PositionSizer()
+    sizer.set_allocations({"default": {}})
+    assert sizer.scale("default", "futures", "BTCUSDT", "BTC/USDT:USDT", 2.0) == 0.0
+    sizer.update_follower_balances("futures", {"USDT": 50.0})
+    sizer.update_leader_balances("default", "futures", {"USDT": 100.0})
+    assert sizer.scale("default", "futures", "BTCUSDT", "BTC/USDT:USDT", 2.0) == 1.0
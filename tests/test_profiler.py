@@ -0,0 +1,49 @@
+import threading
+import profiler
+from profiler import hot, Capture
+
+@hot
+def inner():
+    return 1
+
+@hot
+def outer():
+    return inner() + 1
+
+def test_nested_hot_calls_profile_only_the_outermost(monkeypatch):
+    capture = Capture(1)
+    monkeypatch.setattr(profiler, "_capture", capture)
+    assert outer() == 2
+    assert capture.calls["outer"][:2] == [1, 1]
+    assert capture.calls["inner"][:2] == [1, 0]
+
+def test_concurrent_hot_calls_all_run(monkeypatch):
+    capture = Capture(1)
+    monkeypatch.setattr(profiler, "_capture", capture)
+    inside, release = threading.Barrier(3), threading.Event()
+    ran = []
+
+    @hot
+    def consumer(i):
+        inside.wait(5)
+        release.wait(5)
+        ran.append(i)
+
+    threads = [threading.Thread(target=consumer, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert sorted(ran) == [0, 1, 2]
+    calls, profiled = capture.calls[consumer.__qualname__][:2]
+    assert calls == 3 and profiled == 1
+
+def test_profiler_errors_do_not_skip_the_call(monkeypatch):
+    class Busy:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+    monkeypatch.setattr(profiler, "_capture", Capture(1))
+    monkeypatch.setattr(profiler.cProfile, "Profile", Busy)
+    assert outer() == 2
+    assert not profiler._profiler_lock.locked()
@@ -0,0 +1,119 @@
+import os,json,time,atexit,threading,traceback
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WARM_STATE_FILE = os.getenv("WARM_STATE_FILE", "warm_state.json")
+WARM_STATE_SECONDS = float(os.getenv("WARM_STATE_SECONDS", "30"))            # between snapshots
+WARM_STATE_MAX_AGE_SECONDS = float(os.getenv("WARM_STATE_MAX_AGE_SECONDS", "900"))  # older snapshots are ignored at boot
+
+class WarmState:
+    """
+    Periodic snapshot of the state that is slow to rebuild at startup (Bitget markets, equity feeds,
+    leader positions, reconciler tracking). Each module registers a provider: `save()` returns its
+    state as JSON-able data, `restore(state)` is called with the previous run's state as soon as the
+    provider registers, so restored values are in place before the module is first used. The
+    startup seeds then run as a delta reconcile over the restored state.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._providers = {}    # name -> save fn
+        self._sections = None   # name -> state, read from the snapshot on first use
+        self._encoded = {}      # name -> (state object, its JSON), reused while a provider returns the same object
+        self._lock = threading.Lock()
+        self.restored = []
+        self.saved_at = None
+        self.save_ms = None
+        self.size = 0
+        self.error = None
+
+    def _load(self):
+        if self._sections is not None:
+            return self._sections
+        self._sections = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return self._sections
+        except (OSError, ValueError) as e:
+            print(f"[WarmState] Ignoring unreadable snapshot {self.path}: {e}")
+            return self._sections
+        age = time.time() - snapshot.get("ts", 0)
+        if age > WARM_STATE_MAX_AGE_SECONDS:
+            print(f"[WarmState] Snapshot is {age:.0f}s old, starting cold")
+        else:
+            self._sections = snapshot.get("sections", {})
+        return self._sections
+
+    def register(self, name, save, restore=None):
+        """Add a provider; returns True when its state was restored from the last snapshot"""
+        self._providers[name] = save
+        state = self._load().pop(name, None)
+        if state is None or restore is None:
+            return False
+        started = time.perf_counter()
+        try:
+            restore(state)
+        except Exception as e:
+            print(f"[WarmState] Could not restore {name}: {e}")
+            return False
+        self.restored.append(name)
+        print(f"[WarmState] Restored {name} in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return True
+
+    def save(self):
+        """Write every provider's state to the snapshot file, atomically"""
+        started = time.perf_counter()
+        sections = []
+        for name, save in list(self._providers.items()):
+            try:
+                state = save()
+                cached = self._encoded.get(name)
+                if cached is None or cached[0] is not state:
+                    # Large, rarely replaced state (markets) is only encoded again when the object changes
+                    cached = self._encoded[name] = (state, json.dumps(state, separators=(",", ":")))
+                sections.append(f"{json.dumps(name)}:{cached[1]}")
+            except Exception as e:
+                print(f"[WarmState] Could not snapshot {name}: {e}")
+        data = '{"ts":%r,"sections":{%s}}' % (time.time(), ",".join(sections))
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)  # a crash mid-write leaves the previous snapshot intact
+        self.saved_at = time.monotonic()
+        self.save_ms = (time.perf_counter() - started) * 1000
+        self.size = len(data)
+
+    def _save_loop(self, shutdown_event):
+        while not shutdown_event.wait(WARM_STATE_SECONDS):
+            try:
+                self.save()
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                print(f"[WarmState] Snapshot failed: {e}")
+                traceback.print_exc()
+
+    def _save_on_exit(self):
+        try:
+            self.save()
+        except Exception as e:
+            print(f"[WarmState] Snapshot on exit failed: {e}")
+
+    def start(self, shutdown_event):
+        atexit.register(self._save_on_exit)
+        t = threading.Thread(target=self._save_loop, args=(shutdown_event,), name="warm-state", daemon=True)
+        t.start()
+        return t
+
+    def health(self):
+        info = {"restored": self.restored, "bytes": self.size, "error": self.error,
+                "saved_s_ago": round(time.monotonic() - self.saved_at) if self.saved_at else None,
+                "save_ms": round(self.save_ms, 1) if self.save_ms is not None else None}
+        return self.error is None, info
+
+warm_state = WarmState(WARM_STATE_FILE)